@@ -1,25 +1,49 @@
-from flask import Flask, render_template, redirect, url_for, session, jsonify, request, flash
+from flask import Flask, Response, redirect, url_for, session, jsonify, request, flash
 import os
 import time
 
 # Import services dan controllers
-from services.database_service import DatabaseService
+from services.database_service import DatabaseService, conditional_headers, relay_response
 from services.auth_service import AuthService
 from services.security_service import SecurityService
+from services.cache import VersionedCache
+from services.log_service import setup_logging, get_logger
+from services.metrics import FALLBACKS, REGISTRY, instrument_app, metrics_response
+from services.json_codec import JSONProvider
+from services.static_assets import AssetManifest
+from services.page_cache import PageCache
+from services.rate_limiter import RateLimiter, policy_from_env
 from controllers.auth_controller import AuthController
 from controllers.admin_controller import AdminController
+from controllers.ticket_controller import TicketController
+
+setup_logging('web')
+log = get_logger('app')
 
 app = Flask(__name__)
+app.json = JSONProvider(app)
+instrument_app(app)
 app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key-here')
 app.config['PERMANENT_SESSION_LIFETIME'] = 3600
 
+# Hashed, precompressed copies of static/ (python scripts/build_assets.py)
+assets = AssetManifest(app.static_folder)
+app.add_template_global(assets.url, 'asset_url')
+app.add_template_global(assets.srcset, 'asset_srcset')
+
+# Rendered page shells; a new deploy (or asset build) starts a fresh cache
+page_cache = PageCache(
+    max_entries=int(os.getenv('PAGE_CACHE_SIZE', 128)),
+    deploy_id=os.getenv('DEPLOY_ID') or assets.version
+)
+
 # ==========================
 #   INITIALIZE SERVICES - DOCKER VERSION
 # ==========================
 
 # Dapatkan environment variables untuk Docker
 DATABASE_API_URL = os.getenv('DATABASE_API_URL', 'http://localhost:8000')
-print(f"🔗 Database API URL: {DATABASE_API_URL}")
+log.info("Database API configured", database_api_url=DATABASE_API_URL)
 
 # Initialize services
 security_service = SecurityService()
@@ -28,9 +52,28 @@ database_service.api_url = DATABASE_API_URL  # ← OVERRIDE UNTUK DOCKER
 
 auth_service = AuthService(database_service, security_service)
 
+# Short-lived catalog cache; serves the last good copy if the API hiccups
+concert_cache = VersionedCache(
+    ttl=int(os.getenv('CONCERT_CACHE_TTL', 10)),
+    stale_ttl=int(os.getenv('CONCERT_CACHE_STALE_TTL', 120))
+)
+
+# Token-bucket admission control on login/registration and checkout, shared by
+# every worker on the host; bursts get an immediate 429 instead of a worker
+limiter = RateLimiter(
+    'web',
+    os.getenv('RATE_LIMIT_DB'),
+    enabled=os.getenv('RATE_LIMIT_ENABLED', '1') == '1',
+    # Reverse proxies in front of the gateway that set X-Forwarded-For
+    trusted_proxies=os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '127.0.0.1,::1').split(',')
+)
+AUTH_LIMIT = policy_from_env('AUTH_LIMIT', rate=0.5, burst=10, global_rate=100, global_burst=200)
+CHECKOUT_LIMIT = policy_from_env('CHECKOUT_LIMIT', rate=2, burst=10, global_rate=500, global_burst=1000)
+
 # Initialize controllers
-auth_controller = AuthController(auth_service)
+auth_controller = AuthController(auth_service, page_cache)
 admin_controller = AdminController(auth_service, database_service)
+ticket_controller = TicketController(auth_service, database_service)
 
 # ==========================
 #        ROUTES
@@ -43,10 +86,12 @@ def homepage():
     return auth_controller.homepage()
 
 @app.route("/register", methods=["GET", "POST"])
+@limiter.limit('auth', AUTH_LIMIT)
 def register():
     return auth_controller.register()
 
 @app.route("/login", methods=["GET", "POST"])
+@limiter.limit('auth', AUTH_LIMIT)
 def login():
     return auth_controller.login()
 
@@ -65,10 +110,12 @@ def auth_check():
     return auth_controller.auth_check()
 
 @app.route("/api/auth/login", methods=["POST"])
+@limiter.limit('auth', AUTH_LIMIT)
 def api_login():
     return auth_controller.api_login()
 
 @app.route("/api/auth/register", methods=["POST"])
+@limiter.limit('auth', AUTH_LIMIT)
 def api_register():
     return auth_controller.api_register()
 
@@ -76,51 +123,133 @@ def api_register():
 def admin_stats():
     return admin_controller.admin_stats()
 
+@app.route("/api/admin/dashboard")
+def admin_dashboard():
+    return admin_controller.admin_dashboard()
+
 @app.route("/api/admin/users")
 def admin_users():
     return admin_controller.admin_users()
 
+@app.route("/api/admin/users/import", methods=["POST"])
+def admin_import_users():
+    return admin_controller.import_users()
+
+@app.route("/api/admin/users/export")
+def admin_export_users():
+    return admin_controller.export_users()
+
+@app.route("/api/admin/transactions")
+def admin_transactions():
+    return admin_controller.admin_transactions()
+
+@app.route("/api/admin/analytics/sales")
+def admin_sales_analytics():
+    return admin_controller.sales_analytics()
+
+@app.route("/api/admin/users/<int:user_id>", methods=["PUT"])
+def admin_update_user_role(user_id):
+    return admin_controller.update_user_role(user_id)
+
+@app.route("/api/admin/users/<int:user_id>", methods=["DELETE"])
+def admin_delete_user(user_id):
+    return admin_controller.delete_user(user_id)
+
+def load_concerts(token):
+    """Fetch the catalog from the database API as raw JSON bytes plus its
+    ETag / Last-Modified (raises if unavailable)"""
+    response = database_service.get_concerts(token)
+    if not response or response.status_code != 200:
+        raise ConnectionError('Concert catalog unavailable')
+    validators = {name: response.headers[name] for name in ('ETag', 'Last-Modified')
+                  if response.headers.get(name)}
+    return response.content, validators
+
 @app.route("/api/concerts")
 def concerts():
     token = session.get('token')
-    response = database_service.get_concerts(token)
-    
-    if response and response.status_code == 200:
-        return jsonify(response.json())
-    else:
+    if request.args:
+        # Filtered / paginated listing is not cached, pass the bytes through
+        response = database_service.get_concerts(token, params=request.args.to_dict(), stream=True,
+                                                 headers=conditional_headers(request.headers))
+        if response is None:
+            return jsonify({'error': 'Database API unavailable'}), 502
+        return relay_response(response)
+    try:
+        # Cached as the API's encoded body; served without parsing it
+        (catalog, validators), version = concert_cache.get('catalog', lambda: load_concerts(token))
+        response = Response(catalog, mimetype='application/json', headers=validators)
+        if validators:
+            # Revalidated here against the cached copy's own ETag, no API call
+            response.cache_control.no_cache = True
+            response = response.make_conditional(request)
+        return response
+    except ConnectionError:
+        FALLBACKS.inc('concerts')
         return jsonify([
             {'id': 1, 'name': 'The Mystic Symphony', 'artist': 'Coldplay', 'date': '2024-12-15', 'venue': 'GBK Stadium', 'price': 750000, 'available_tickets': 1000},
             {'id': 2, 'name': 'Blackpink Show', 'artist': 'Blackpink', 'date': '2024-11-20', 'venue': 'Istora Senayan', 'price': 1200000, 'available_tickets': 500}
         ])
 
+@app.route("/api/admin/init-concerts", methods=["POST"])
+def admin_init_concerts():
+    result = admin_controller.init_concerts()
+    concert_cache.invalidate()
+    return result
+
+# Ticket routes
+@app.route("/api/tickets/reserve", methods=["POST"])
+@limiter.limit('checkout', CHECKOUT_LIMIT)
+def reserve_tickets():
+    return ticket_controller.reserve()
+
+@app.route("/api/tickets/purchase", methods=["POST"])
+@limiter.limit('checkout', CHECKOUT_LIMIT)
+def purchase_tickets():
+    return ticket_controller.purchase()
+
+@app.route("/api/tickets/holds/<hold_id>/confirm", methods=["POST"])
+@limiter.limit('checkout', CHECKOUT_LIMIT)
+def confirm_hold(hold_id):
+    return ticket_controller.confirm(hold_id)
+
+@app.route("/api/tickets/holds/<hold_id>", methods=["DELETE"])
+def release_hold(hold_id):
+    return ticket_controller.release(hold_id)
+
 # User routes
 @app.route("/concert")
 def concert():
     user = auth_service.get_current_user()
     if not user.is_authenticated() or user.role != 'user':
         return redirect(url_for("login"))
-    return render_template("user/concert.html")
+    return page_cache.render("user/concert.html")
 
 @app.route("/account")
 def account():
     user = auth_service.get_current_user()
     if not user.is_authenticated() or user.role != 'user':
         return redirect(url_for("login"))
-    return render_template("user/account.html", username=user.username, email=user.email)
+    return page_cache.render("user/account.html", {'username': user.username, 'email': user.email})
 
 @app.route("/payment")
 def payment():
     user = auth_service.get_current_user()
     if not user.is_authenticated() or user.role != 'user':
         return redirect(url_for("login"))
-    return render_template("user/payment.html")
+    return page_cache.render("user/payment.html")
 
 @app.route("/success")
 def success():
     user = auth_service.get_current_user()
     if not user.is_authenticated() or user.role != 'user':
         return redirect(url_for("login"))
-    return render_template("user/success.html")
+    return page_cache.render("user/success.html")
+
+# Fingerprinted static assets; more specific than Flask's own /static route
+@app.route("/static/dist/<path:filename>")
+def static_dist(filename):
+    return assets.send(filename)
 
 # Health check endpoint
 @app.route("/health")
@@ -140,24 +269,62 @@ def health_check():
             "error": str(e)
         }), 500
 
+@app.route("/live")
+def liveness():
+    """Process is up and serving requests"""
+    return jsonify({"status": "alive"})
+
+@app.route("/ready")
+def readiness():
+    """Ready when the database API reports ready"""
+    response = database_service.request('GET', '/api/ready', timeout=2)
+    if response is not None and response.status_code == 200:
+        return jsonify({"status": "ready"})
+    return jsonify({"status": "unavailable", "database_api_url": DATABASE_API_URL}), 503
+
+REGISTRY.add_collector(lambda: [
+    ('cache_events', 'Gateway catalog cache counters',
+     {(('cache', 'concerts'), ('event', key)): value for key, value in concert_cache.stats().items()}),
+    ('page_cache_events', 'Rendered page cache counters',
+     {(('event', key),): value for key, value in page_cache.stats().items() if key != 'size'}),
+    ('page_cache_entries', 'Rendered page shells held', {(): page_cache.stats()['size']}),
+])
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus text exposition"""
+    return metrics_response()
+
 # ==========================
 #   APPLICATION STARTUP
 # ==========================
 
-def wait_for_services():
-    """Tunggu services lain siap (untuk Docker)"""
-    print("⏳ Waiting for backend services to be ready...")
-    time.sleep(15)  # Tunggu lebih lama
-    print("✅ Starting web application...")
+STARTUP_TIMEOUT = float(os.getenv('STARTUP_TIMEOUT', 60))
+STARTUP_MAX_BACKOFF = float(os.getenv('STARTUP_MAX_BACKOFF', 5))
+
+def wait_for_services(timeout=STARTUP_TIMEOUT):
+    """Poll the database API readiness with exponential backoff.
+
+    Gives up after ``timeout`` seconds and starts anyway; the routes
+    already degrade gracefully while the API is unavailable.
+    """
+    log.info("Waiting for backend services to be ready")
+    started = time.monotonic()
+    delay = 0.1
+    while time.monotonic() - started < timeout:
+        response = database_service.request('GET', '/api/ready', timeout=2)
+        if response is not None and response.status_code == 200:
+            log.info("Database API ready", waited_s=round(time.monotonic() - started, 3))
+            return True
+        time.sleep(delay)
+        delay = min(delay * 2, STARTUP_MAX_BACKOFF)
+    log.warning("Database API not ready, starting anyway", waited_s=timeout)
+    return False
 
 if __name__ == "__main__":
     # Tunggu services siap sebelum start
     wait_for_services()
     
-    print("🚀 Server starting...")
-    print("📊 Database: MySQL (Docker)")
-    print("🔗 Database API URL:", DATABASE_API_URL)
-    print("🔒 Security: Enhanced with SHA-256 hashing & input sanitization")
-    print("🏠 Host: 0.0.0.0:5000")
+    log.info("Server starting", host='0.0.0.0', port=5000, database_api_url=DATABASE_API_URL)
     
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""Per-hop latency of gateway -> database API calls.
+
+Compares the old connect-per-call ``requests.get`` against the keep-alive
+session in ``DatabaseService``, first called directly and then through a
+threaded Werkzeug gateway like app.py's, where every request runs on a new
+thread. A tiny HTTP/1.1 server on localhost stands in for database_api.py
+so no other services are needed; it counts the connections it accepts.
+
+    python benchmarks/bench_database_service.py [iterations]
+"""
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from flask import Flask
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.database_service import DatabaseService
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        _Handler.connections += 1
+
+    def do_GET(self):
+        body = json.dumps([{'id': 1, 'name': 'Coldplay Tour'}]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _measure(call, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean_ms': statistics.mean(samples),
+        'p50_ms': samples[len(samples) // 2],
+        'p99_ms': samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+def _gateway(call):
+    """Threaded dev server (one thread per request) whose only route runs ``call``"""
+    gateway = Flask('bench_gateway')
+    gateway.add_url_rule('/concerts', 'concerts', lambda: call().content)
+    server = make_server('127.0.0.1', 0, gateway, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/concerts'
+
+
+def _through_gateway(call, iterations):
+    """Latency via the gateway and upstream connections it opened per request"""
+    server, url = _gateway(call)
+    opened = _Handler.connections
+    result = _measure(lambda: requests.get(url, timeout=10), iterations)
+    result['connections'] = (_Handler.connections - opened) / iterations
+    server.shutdown()
+    return result
+
+
+def main(iterations=2000):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    service = DatabaseService()
+    service.api_url = url
+
+    def connect_per_call():
+        return requests.get(f'{url}/api/concerts', timeout=10)
+
+    def keep_alive():
+        return service.request('GET', '/api/concerts')
+
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        results = [
+            ('requests.get (new connection)', _measure(connect_per_call, iterations)),
+            ('DatabaseService (keep-alive)', _measure(keep_alive, iterations)),
+            ('gateway + requests.get', _through_gateway(connect_per_call, iterations)),
+            ('gateway + DatabaseService', _through_gateway(keep_alive, iterations)),
+        ]
+
+    server.shutdown()
+
+    for label, result in results:
+        line = (f"{label:32} mean {result['mean_ms']:.3f} ms  "
+                f"p50 {result['p50_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms")
+        if 'connections' in result:
+            line += f"  upstream connections/request {result['connections']:.3f}"
+        print(line)
+    print(f"speedup (mean, direct): {results[0][1]['mean_ms'] / results[1][1]['mean_ms']:.2f}x")
+    print(f"speedup (mean, via gateway): {results[2][1]['mean_ms'] / results[3][1]['mean_ms']:.2f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
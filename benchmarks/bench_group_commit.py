@@ -0,0 +1,133 @@
+"""Transaction rows per second: one commit per row vs group commit.
+
+Creates the transactions table in a temporary SQLite database and has
+``threads`` checkout threads record ``rows`` transactions in total, first
+each committing its own row on its own connection (the old way), then
+through services.group_commit.GroupCommitWriter, where every caller
+still waits for its commit but one writer commits many rows at once.
+Each is run with synchronous=NORMAL (the API's setting) and FULL (an
+fsync per commit, closer to MySQL with innodb_flush_log_at_trx_commit=1).
+
+    python benchmarks/bench_group_commit.py [rows] [threads]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.group_commit import GroupCommitWriter
+from services.storage import SQLiteBackend
+
+DDL = '''
+    CREATE TABLE transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        transaction_id VARCHAR(64) UNIQUE NOT NULL,
+        user_id INT, username VARCHAR(255), event_id INT, event_name VARCHAR(255),
+        amount BIGINT NOT NULL, payment_method VARCHAR(50),
+        status VARCHAR(20) NOT NULL DEFAULT 'completed', created_at DATETIME NOT NULL
+    )'''
+INSERT = ('INSERT INTO transactions (transaction_id, user_id, username, event_id, event_name, '
+          'amount, payment_method, status, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)')
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def new_row(i):
+    return (uuid.uuid4().hex, i, f'user_{i}', 1, 'Bench Flash Sale', 750000, 'QR',
+            'completed', datetime.now())
+
+
+def connect(backend, synchronous):
+    conn = backend.connect()
+    cursor = conn.cursor()
+    cursor.execute(f'PRAGMA synchronous={synchronous}')
+    cursor.close()
+    return conn
+
+
+def run(threads, rows, record):
+    """Latencies of ``rows`` calls to ``record(i)`` spread over ``threads``"""
+    latencies = [[] for _ in range(threads)]
+
+    def worker(n):
+        for i in range(n, rows, threads):
+            started = time.perf_counter()
+            record(i)
+            latencies[n].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - started, [x for per_thread in latencies for x in per_thread]
+
+
+def per_row(backend, synchronous, threads, rows):
+    local = threading.local()
+    connections = []
+
+    def record(i):
+        if not hasattr(local, 'conn'):
+            local.conn = connect(backend, synchronous)
+            connections.append(local.conn)
+        cursor = local.conn.cursor()
+        cursor.execute(INSERT, new_row(i))
+        local.conn.commit()
+        cursor.close()
+
+    try:
+        return run(threads, rows, record), None
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+def grouped(backend, synchronous, threads, rows):
+    conn = connect(backend, synchronous)
+
+    def write_batch(items):
+        cursor = conn.cursor()
+        cursor.executemany(INSERT, items)
+        conn.commit()
+        cursor.close()
+
+    writer = GroupCommitWriter(write_batch, max_pending=rows)
+    writer.start()
+    try:
+        return run(threads, rows, lambda i: writer.write(new_row(i))), writer.stats()
+    finally:
+        writer.stop()
+        conn.close()
+
+
+def main(rows=20000, threads=32):
+    backend = SQLiteBackend(os.path.join(tempfile.mkdtemp(prefix='guardiantix-bench-'), 'tx.db'))
+    conn = backend.connect()
+    conn.cursor().execute(DDL)
+    conn.commit()
+    conn.close()
+    print(f"{rows} transactions from {threads} threads")
+
+    for synchronous in ('NORMAL', 'FULL'):
+        for label, strategy in (('commit per row', per_row), ('group commit', grouped)):
+            (elapsed, latencies), stats = strategy(backend, synchronous, threads, rows)
+            line = (f"  synchronous={synchronous:<6} {label:<15} {rows / elapsed:9.0f} rows/s  "
+                    f"p50 {percentile(latencies, 50) * 1000:6.2f} ms  "
+                    f"p99 {percentile(latencies, 99) * 1000:7.2f} ms")
+            if stats:
+                line += f"  ({rows / stats['batches']:.0f} rows/commit)"
+            print(line)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,98 @@
+"""Single-event hold+confirm throughput: in-memory inventory vs direct SQL.
+
+The in-memory run needs nothing else; sales are flushed to a stub that
+only counts them. Pass ``--sql`` to also run the conditional-UPDATE path
+from database_api.py against the MySQL configured by MYSQL_* variables.
+
+    python benchmarks/bench_inventory.py [--sql] [orders] [threads]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.inventory import InventoryManager
+
+
+def bench_memory(orders, threads):
+    flushed = []
+    manager = InventoryManager(
+        lambda ids: {1: orders},
+        lambda batch, settled: (flushed.extend(batch), settled.extend(batch)),
+        shards=16
+    )
+    manager.recover()
+    manager.start()
+
+    def order(user_id):
+        manager.hold(1, user_id, 1, f'key-{user_id}', confirm=True)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(order, range(orders)))
+    elapsed = time.perf_counter() - start
+    manager.stop()
+
+    assert manager.remaining(1) == 0 and len(flushed) == orders
+    return elapsed
+
+
+def bench_sql(orders, threads):
+    os.environ.setdefault('DB_POOL_SIZE', str(threads))
+    import database_api
+    database_api.ready.wait()
+
+    conn = database_api.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        'INSERT INTO concerts (name, artist, date, venue, price, available_tickets) '
+        'VALUES (%s, %s, %s, %s, %s, %s)',
+        ('Inventory Bench', 'Load Generator', '2099-01-01', 'Localhost Arena', 1, orders)
+    )
+    concert_id = cursor.lastrowid
+    conn.commit()
+
+    def order(user_id):
+        worker_conn = database_api.get_db_connection()
+        try:
+            _, _, transaction = database_api.reserve_tickets(
+                worker_conn, concert_id, user_id, 1, f'bench-{concert_id}-{user_id}', confirm=True
+            )
+        finally:
+            worker_conn.close()
+        database_api.record_transaction(transaction)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(order, range(orders)))
+    elapsed = time.perf_counter() - start
+
+    cursor.execute('DELETE FROM ticket_holds WHERE concert_id = %s', (concert_id,))
+    cursor.execute('DELETE FROM transactions WHERE event_id = %s', (concert_id,))
+    cursor.execute('DELETE FROM sales_daily WHERE concert_id = %s', (concert_id,))
+    cursor.execute('DELETE FROM concerts WHERE id = %s', (concert_id,))
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return elapsed
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != '--sql']
+    orders = int(args[0]) if args else 20000
+    threads = int(args[1]) if len(args) > 1 else 32
+
+    results = {'memory': bench_memory(orders, threads)}
+    if '--sql' in sys.argv:
+        results['sql'] = bench_sql(orders, threads)
+
+    for name, elapsed in results.items():
+        print(f"{name:7} {orders} orders in {elapsed:.2f}s -> {orders / elapsed:,.0f} orders/s")
+    if 'sql' in results:
+        print(f"speedup: {results['sql'] / results['memory']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Per-request logging overhead: print() vs the queue-backed logger.
+
+The old DatabaseService.request printed two lines per call straight to
+stdout. This measures the time the calling thread spends on that,
+against the single structured ``log.debug`` call that replaced them
+(off at the default INFO level) and the same call with LOG_LEVEL=DEBUG,
+where the record is only enqueued for the writer thread. Output goes to a pipe drained by a reader thread,
+like a container's stdout; the "slow" run throttles the reader the way
+a busy log collector does, which is where print() starts to stall.
+
+    python benchmarks/bench_logging.py [iterations]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.log_service import (DroppingQueueHandler, get_logger, setup_logging,
+                                  shutdown_logging)
+
+URL = 'http://database:8000/api/concerts'
+
+
+def open_pipe(throttle):
+    read_fd, write_fd = os.pipe()
+
+    def drain():
+        while os.read(read_fd, 4096):
+            if throttle:
+                time.sleep(throttle)
+
+    threading.Thread(target=drain, daemon=True).start()
+    return os.fdopen(write_fd, 'w', buffering=1)
+
+
+def bench_print(iterations, throttle):
+    pipe = open_pipe(throttle)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        print(f"🔗 API CALL: GET {URL}", file=pipe)
+        print("📡 RESPONSE: 200", file=pipe)
+    elapsed = time.perf_counter() - start
+    pipe.close()
+    return elapsed / iterations
+
+
+def bench_logger(iterations, throttle, level):
+    pipe = open_pipe(throttle)
+    setup_logging('bench', level=level, stream=pipe)
+    log = get_logger('bench')
+    start = time.perf_counter()
+    for _ in range(iterations):
+        log.debug("API call", method='GET', endpoint='/api/concerts', status=200)
+    elapsed = time.perf_counter() - start
+    shutdown_logging()
+    pipe.close()
+    return elapsed / iterations
+
+
+def main(iterations=20000):
+    for label, throttle in (('fast reader', 0), ('slow reader', 0.005)):
+        printed = bench_print(iterations, throttle)
+        default = bench_logger(iterations, throttle, 'INFO')
+        debug = bench_logger(iterations, throttle, 'DEBUG')
+        print(f"{label}: print() {printed * 1e6:8.2f}   logger at INFO {default * 1e6:6.2f}   "
+              f"logger at DEBUG {debug * 1e6:8.2f}   us/request "
+              f"(dropped so far: {DroppingQueueHandler.dropped})")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
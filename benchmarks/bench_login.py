@@ -0,0 +1,77 @@
+"""Login lookup latency as the users table grows.
+
+Seeds synthetic users into the MySQL configured by MYSQL_* variables and,
+at each size, times the old two-query lookup (SELECT * by email, then by
+username) against ``find_login_user`` from database_api.py for both
+email and username logins. Seeded rows are removed afterwards.
+
+    python benchmarks/bench_login.py [sizes...]      e.g. 1000 10000 100000
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database_api
+
+BENCH_DOMAIN = '@bench-login.test'
+
+
+def legacy_lookup(cursor, identifier):
+    cursor.execute('SELECT * FROM users WHERE email = %s', (identifier,))
+    user = cursor.fetchone()
+    if not user:
+        cursor.execute('SELECT * FROM users WHERE username = %s', (identifier,))
+        user = cursor.fetchone()
+    return user
+
+
+def seed(cursor, conn, start, stop):
+    for chunk in range(start, stop, 5000):
+        rows = [(f'bench_user_{i}', f'bench{i}{BENCH_DOMAIN}', 'Password1', 'user')
+                for i in range(chunk, min(chunk + 5000, stop))]
+        cursor.executemany(
+            'INSERT INTO users (username, email, password_hash, role) VALUES (%s, %s, %s, %s)',
+            rows
+        )
+        conn.commit()
+
+
+def timed(lookup, cursor, identifiers):
+    samples = []
+    for identifier in identifiers:
+        start = time.perf_counter()
+        lookup(cursor, identifier)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(sizes):
+    database_api.ready.wait()
+    conn = database_api.get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    seeded = 0
+    try:
+        for size in sizes:
+            seed(cursor, conn, seeded, size)
+            seeded = max(seeded, size)
+            probes = range(0, size, max(size // 200, 1))
+            emails = [f'bench{i}{BENCH_DOMAIN}' for i in probes]
+            usernames = [f'bench_user_{i}' for i in probes]
+
+            print(f"users={size:>8}  "
+                  f"email: legacy {timed(legacy_lookup, cursor, emails):.3f} ms / "
+                  f"new {timed(database_api.find_login_user, cursor, emails):.3f} ms  "
+                  f"username: legacy {timed(legacy_lookup, cursor, usernames):.3f} ms / "
+                  f"new {timed(database_api.find_login_user, cursor, usernames):.3f} ms")
+    finally:
+        cursor.execute('DELETE FROM users WHERE email LIKE %s', ('%' + BENCH_DOMAIN,))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,116 @@
+"""Memory and speed of 100k listing rows: dict rows vs slotted models.
+
+Fills a temporary SQLite database with synthetic users and concerts,
+then for each table compares the old path (dictionary cursor, rows
+kept as dicts, encoded with Flask's default JSON provider) with the new
+one (tuple cursor mapped to User / Concert via from_row, encoded with
+services.json_codec, through orjson when installed and through the
+standard library otherwise). Reports the memory held by the fetched
+rows (tracemalloc) and fetch / encode times.
+
+    python benchmarks/bench_models.py [rows]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from models.concert import Concert
+from models.user import User
+from services import json_codec
+from services.storage import SQLiteBackend
+
+TABLES = {
+    'users': (User, '''
+        CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(100), email VARCHAR(255),
+                            role VARCHAR(10), phone VARCHAR(20), join_date TIMESTAMP)'''),
+    'concerts': (Concert, '''
+        CREATE TABLE concerts (id INTEGER PRIMARY KEY, name VARCHAR(255), artist VARCHAR(255),
+                               date VARCHAR(100), venue VARCHAR(255), price INT,
+                               available_tickets INT)'''),
+}
+
+
+def fill(backend, rows):
+    conn = backend.connect()
+    cursor = conn.cursor()
+    for table, (_, ddl) in TABLES.items():
+        cursor.execute(ddl)
+    joined = datetime(2024, 1, 1, 12, 0, 0)
+    cursor.executemany(
+        'INSERT INTO users (username, email, role, phone, join_date) VALUES (%s, %s, %s, %s, %s)',
+        [(f'user_{i}', f'user{i}@bench-models.test', 'user', '081234567890', joined)
+         for i in range(rows)]
+    )
+    cursor.executemany(
+        'INSERT INTO concerts (name, artist, date, venue, price, available_tickets) '
+        'VALUES (%s, %s, %s, %s, %s, %s)',
+        [(f'Concert {i}', f'Artist {i % 500}', '2025-06-01', 'GBK Stadium', 750000, 1000)
+         for i in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def fetch(backend, table, model, as_models):
+    """``(rows, bytes held, seconds)`` for one full-table fetch"""
+    conn = backend.connect()
+    cursor = conn.cursor(dictionary=not as_models)
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    cursor.execute(f"SELECT {', '.join(model.FIELDS)} FROM {table}")
+    rows = cursor.fetchall()
+    if as_models:
+        rows = list(map(model.from_row, rows))
+    elapsed = time.perf_counter() - started
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cursor.close()
+    conn.close()
+    return rows, held, elapsed
+
+
+def timed(encode, rows):
+    started = time.perf_counter()
+    body = encode(rows)
+    return time.perf_counter() - started, len(body)
+
+
+def main(rows=100000):
+    backend = SQLiteBackend(os.path.join(tempfile.mkdtemp(prefix='guardiantix-bench-'), 'models.db'))
+    fill(backend, rows)
+    flask_json = DefaultJSONProvider(Flask(__name__))
+    std_encoder = json_codec.json.JSONEncoder(default=json_codec._default, sort_keys=True,
+                                              separators=(',', ':'))
+    print(f"{rows} rows per table, fast encoder: {json_codec.BACKEND}")
+
+    for table, (model, _) in TABLES.items():
+        dicts, dict_bytes, dict_fetch = fetch(backend, table, model, as_models=False)
+        models, model_bytes, model_fetch = fetch(backend, table, model, as_models=True)
+        encodes = [
+            ('dict rows + flask json', timed(lambda r: flask_json.dumps(r).encode(), dicts)),
+            ('models + stdlib json', timed(
+                lambda r: std_encoder.encode([m.to_record() for m in r]).encode(), models)),
+            (f'models + {json_codec.BACKEND}', timed(json_codec.dumps_records, models)),
+        ]
+        print(f"\n{table}")
+        print(f"  held in memory   dicts {dict_bytes / 2 ** 20:7.1f} MiB   "
+              f"models {model_bytes / 2 ** 20:7.1f} MiB")
+        print(f"  fetch            dicts {dict_fetch * 1000:7.1f} ms    "
+              f"models {model_fetch * 1000:7.1f} ms")
+        for label, (seconds, size) in encodes:
+            print(f"  encode  {label:<26} {seconds * 1000:8.1f} ms  "
+                  f"{rows / seconds / 1000:7.1f}k rows/s  ({size / 2 ** 20:.1f} MiB)")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
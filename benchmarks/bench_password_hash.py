@@ -0,0 +1,74 @@
+"""Login throughput against password KDF cost.
+
+Runs concurrent POST /api/login requests through database_api.py's
+Flask routes on a temporary SQLite database. For each cost setting
+it compares hashing inline in the request threads with hashing on the
+worker-process pool. Throughput is bounded by cores x 1/KDF time, so
+the table is the input for choosing SCRYPT_N / PBKDF2_ITERATIONS.
+
+    python benchmarks/bench_password_hash.py [logins] [threads]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('STORAGE_BACKEND', 'sqlite')
+os.environ.setdefault('SQLITE_PATH', os.path.join(tempfile.mkdtemp(), 'bench.db'))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('DB_POOL_SIZE', '32')
+
+import database_api
+from services.password_hasher import PBKDF2, SCRYPT, PasswordHasher
+
+COSTS = [
+    (SCRYPT, {'scrypt_n': 2 ** 12}),
+    (SCRYPT, {'scrypt_n': 2 ** 14}),
+    (SCRYPT, {'scrypt_n': 2 ** 15}),
+    (PBKDF2, {'pbkdf2_iterations': 100000}),
+    (PBKDF2, {'pbkdf2_iterations': 600000}),
+]
+
+
+def measure(client, email, logins, threads):
+    def login(_):
+        started = time.perf_counter()
+        response = client.post('/api/login', json={'identifier': email, 'password': 'BenchPass1!'})
+        return response.status_code, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for _, latency in results)
+    failed = sum(1 for status, _ in results if status != 200)
+    return logins / elapsed, latencies[int(len(latencies) * 0.95) - 1] * 1000, failed
+
+
+def main(logins=200, threads=16):
+    database_api.ready.wait()
+    client = database_api.app.test_client()
+    cpus = os.cpu_count() or 1
+    print(f"{cpus} CPU(s), {logins} logins on {threads} threads")
+
+    for n, (algorithm, cost) in enumerate(COSTS):
+        label = f"{algorithm} {list(cost.values())[0]}"
+        email = f'cost{n}@bench-hash.test'
+        for mode, workers in (('inline', 0), ('process pool', cpus)):
+            hasher = PasswordHasher(algorithm=algorithm, workers=workers, max_pending=threads, **cost)
+            hasher.start()
+            database_api.password_hasher = hasher
+            if mode == 'inline':
+                client.post('/api/users', json={'username': email, 'email': email,
+                                                'password': 'BenchPass1!'})
+            rate, p95, failed = measure(client, email, logins, threads)
+            hasher.shutdown()
+            print(f"{label:<22} {mode:<13} {rate:8.1f} logins/s   p95 {p95:8.1f} ms"
+                  + (f"   {failed} failed" if failed else ''))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
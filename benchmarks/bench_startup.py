@@ -0,0 +1,59 @@
+"""Cold-start time of the database API and the gateway.
+
+Launches ``database_api.py`` and ``app.py`` as subprocesses against the
+MySQL configured by MYSQL_* variables and measures how long each takes
+to answer 200 on its readiness endpoint. Before readiness probing the
+containers slept for a fixed 40s (API) and 55s (gateway) before they
+even started initializing.
+
+    python benchmarks/bench_startup.py
+"""
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXED_SLEEPS = {'database_api.py': 30 + 10, 'app.py': 40 + 15}
+
+
+def wait_ready(url, timeout=120):
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.monotonic() - started
+        except OSError:
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(f'{url} not ready after {timeout}s')
+
+
+def main():
+    env = dict(os.environ, DATABASE_API_URL='http://localhost:8000')
+    processes = []
+    try:
+        results = {}
+        for script, url in (('database_api.py', 'http://localhost:8000/api/ready'),
+                            ('app.py', 'http://localhost:5000/ready')):
+            started = time.monotonic()
+            processes.append(subprocess.Popen(
+                [sys.executable, script], cwd=ROOT, env=env,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            ))
+            wait_ready(url)
+            results[script] = time.monotonic() - started
+
+        for script, elapsed in results.items():
+            print(f"{script:16} ready in {elapsed:6.2f}s "
+                  f"(fixed sleeps alone used to take {FIXED_SLEEPS[script]}s)")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Peak memory of a large listing, buffered vs streamed.
+
+Boots the API and the gateway in this process (see suite.py), inserts
+synthetic users straight into a temporary SQLite database and fetches
+GET /api/admin/users?limit=N through the gateway as an admin, reading
+the body in chunks like a browser does. tracemalloc measures the peak
+Python allocation across both servers while the request runs. In
+buffered mode (STREAM_MIN_ROWS above N) the page is held as rows, as the
+API's JSON and as the gateway's copy; streamed, the peak should stay
+flat as N grows.
+
+    python benchmarks/bench_streaming.py [rows ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('MAX_PAGE_SIZE', '1000000')
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+import requests
+from suite import BENCH_DOMAIN, Stack
+
+
+def insert_users(stack, count):
+    conn = stack.api.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute('DELETE FROM users WHERE email LIKE %s', ('%@bench-stream.test',))
+        cursor.executemany(
+            'INSERT INTO users (username, email, password_hash, role, phone) VALUES (%s, %s, %s, %s, %s)',
+            [(f'stream_user_{i}', f'user{i}@bench-stream.test', 'x', 'user', '0812345678')
+             for i in range(count)]
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def measure(stack, session, rows, streamed):
+    stack.api.STREAM_MIN_ROWS = 1 if streamed else rows + 1
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = session.get(f'{stack.web_url}/api/admin/users', params={'limit': rows}, stream=True)
+    received = sum(len(chunk) for chunk in response.iter_content(64 * 1024))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert response.status_code == 200, response.status_code
+    return peak / 2 ** 20, received / 2 ** 20, elapsed * 1000
+
+
+def main(sizes=(1000, 10000, 50000)):
+    stack = Stack()
+    stack.seed(0, 1)
+    session = requests.Session()
+    if not stack.login(session, f'admin{BENCH_DOMAIN}'):
+        raise SystemExit('admin login failed')
+    try:
+        for rows in sizes:
+            insert_users(stack, rows)
+            for streamed in (False, True):
+                peak, size, ms = measure(stack, session, rows, streamed)
+                mode = 'streamed' if streamed else 'buffered'
+                print(f"{rows:>7} rows  {mode:<9} body {size:6.1f} MiB  "
+                      f"peak {peak:7.1f} MiB  {ms:8.1f} ms")
+    finally:
+        insert_users(stack, 0)
+        stack.cleanup()
+
+
+if __name__ == '__main__':
+    main(*([[int(arg) for arg in sys.argv[1:]]] if sys.argv[1:] else []))
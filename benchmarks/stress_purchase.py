@@ -0,0 +1,108 @@
+"""Flash-sale stress test for the ticket purchase engine.
+
+Many threads buy from one small concert through the real Flask routes
+in database_api.py, with some of them retrying the same idempotency key.
+Afterwards the script checks that no seat was oversold or double-booked,
+and that the sale really sold out (every seat, or one per buyer if there
+are fewer buyers than seats).
+It needs the MySQL instance configured by the usual MYSQL_* variables.
+
+    python benchmarks/stress_purchase.py [buyers] [threads] [seats]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DB_POOL_SIZE', '64')
+os.environ.setdefault('DB_POOL_ACQUIRE_TIMEOUT', '10')
+# All buyers share one address; admission control would turn most of them away
+os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+
+import jwt
+
+import database_api
+
+
+def main(buyers=2000, threads=64, seats=100):
+    database_api.ready.wait()
+    conn = database_api.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        'INSERT INTO concerts (name, artist, date, venue, price, available_tickets) '
+        'VALUES (%s, %s, %s, %s, %s, %s)',
+        ('Stress Test Show', 'Load Generator', '2099-01-01', 'Localhost Arena', 1, seats)
+    )
+    concert_id = cursor.lastrowid
+    conn.commit()
+
+    client = database_api.app.test_client()
+    issued_at = int(time.time())
+    tokens = {
+        user_id: jwt.encode({'user_id': user_id, 'username': f'buyer{user_id}',
+                             'iat': issued_at, 'exp': issued_at + 3600},
+                            database_api.SECRET_KEY, algorithm='HS256')
+        for user_id in range(1, buyers + 1)
+    }
+
+    def buy(user_id):
+        headers = {
+            'Authorization': f'Bearer {tokens[user_id]}',
+            'Idempotency-Key': f'stress-{concert_id}-{user_id}'
+        }
+        statuses = []
+        # Every tenth buyer retries, as a flaky mobile client would
+        for _ in range(2 if user_id % 10 == 0 else 1):
+            response = client.post(f'/api/concerts/{concert_id}/purchase',
+                                   json={'quantity': 1}, headers=headers)
+            statuses.append(response.status_code)
+        return statuses
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(buy, range(1, buyers + 1)))
+    elapsed = time.perf_counter() - start
+
+    flat = [status for statuses in results for status in statuses]
+    booked = sum(1 for statuses in results if 201 in statuses)
+
+    cursor.execute('SELECT available_tickets FROM concerts WHERE id = %s', (concert_id,))
+    remaining = cursor.fetchone()[0]
+    cursor.execute(
+        'SELECT COALESCE(SUM(quantity), 0), COUNT(*), COUNT(DISTINCT user_id) '
+        'FROM ticket_holds WHERE concert_id = %s AND status = %s',
+        (concert_id, 'confirmed')
+    )
+    sold, rows, distinct_buyers = cursor.fetchone()
+
+    print(f"requests: {len(flat)} in {elapsed:.2f}s ({len(flat) / elapsed:.0f} req/s)")
+    for status in sorted(set(flat)):
+        print(f"  HTTP {status}: {flat.count(status)}")
+    print(f"seats: {seats}  sold: {sold}  remaining: {remaining}  buyers booked: {booked}")
+
+    ok = (remaining >= 0 and sold + remaining == seats
+          and rows == distinct_buyers == booked and sold <= seats)
+    sold_out = sold == min(seats, buyers)
+
+    # Leave no trace: queued transaction rows first, then everything the sale touched
+    database_api.retry_unrecorded_transactions()
+    cursor.execute('DELETE FROM ticket_holds WHERE concert_id = %s', (concert_id,))
+    cursor.execute('DELETE FROM transactions WHERE event_id = %s', (concert_id,))
+    cursor.execute('DELETE FROM sales_daily WHERE concert_id = %s', (concert_id,))
+    cursor.execute('DELETE FROM concerts WHERE id = %s', (concert_id,))
+    database_api.stats.rebuild(cursor)
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+    print('✅ no oversell, no double booking' if ok else '❌ inventory invariant violated')
+    if not sold_out:
+        print(f'❌ sold {sold} of {min(seats, buyers)} seats; requests were turned away')
+    return 0 if ok and sold_out else 1
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:4]]
+    sys.exit(main(*args))
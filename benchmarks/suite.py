@@ -0,0 +1,358 @@
+"""Reproducible load test of the whole ticketing stack.
+
+Boots ``database_api.py`` and ``app.py`` inside this process, each on a
+threaded HTTP/1.1 server on a free localhost port, seeds synthetic users
+and a flash-sale concert through the API, then drives the gateway like
+browsers do:
+
+    login       POST /api/auth/login with random seeded users
+    browse      GET /api/concerts, cached catalog and filtered pages
+    dashboard   GET /api/admin/dashboard as a logged-in admin
+    flash_sale  every buyer POSTs /api/tickets/purchase for one small concert
+
+Each scenario reports throughput and p50/p95/p99 latency. Results are
+written to benchmarks/results/latest.json; ``--save-baseline`` stores
+them as the baseline that later runs are compared against, flagging
+changes worse than ``--threshold`` percent. By default the API runs on
+the embedded SQLite backend in a temporary file, so nothing outside this
+process is needed; STORAGE_BACKEND=mysql uses the MYSQL_* database
+instead. Seeded rows are removed afterwards.
+
+    python benchmarks/suite.py [--scenarios login,browse,...] [--requests 2000]
+                               [--concurrency 16] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('STORAGE_BACKEND', 'sqlite')
+if os.environ['STORAGE_BACKEND'] == 'sqlite':
+    os.environ.setdefault('SQLITE_PATH', os.path.join(tempfile.mkdtemp(prefix='guardiantix-bench-'),
+                                                      'bench.db'))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('DB_POOL_SIZE', '32')
+os.environ.setdefault('DB_POOL_ACQUIRE_TIMEOUT', '10')
+os.environ.setdefault('DATABASE_API_POOL_SIZE', '32')
+# Every simulated buyer comes from 127.0.0.1; admission control would shed them
+os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+
+import requests
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+BENCH_DOMAIN = '@bench-suite.test'
+BENCH_PASSWORD = 'BenchPass1!'
+SCENARIOS = ('login', 'browse', 'dashboard', 'flash_sale')
+
+
+class _Handler(WSGIRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def serve(wsgi_app):
+    """Run a WSGI app on a free localhost port, returns its base URL"""
+    server = make_server('127.0.0.1', 0, wsgi_app, threaded=True, request_handler=_Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+class Stack:
+    """The API and the gateway, running in this process"""
+
+    def __init__(self):
+        import database_api
+        self.api = database_api
+        if not database_api.ready.wait(timeout=float(os.getenv('BENCH_STARTUP_TIMEOUT', 60))):
+            raise SystemExit('database API did not become ready, is the database reachable?')
+        self.api_url = serve(database_api.app)
+
+        os.environ['DATABASE_API_URL'] = self.api_url
+        import app as gateway
+        self.web_url = serve(gateway.app)
+        self.users = []
+        self.concert_id = None
+
+    def seed(self, users, seats):
+        client = self.api.app.test_client()
+        admin = {'username': 'bench_admin', 'email': f'admin{BENCH_DOMAIN}',
+                 'password': BENCH_PASSWORD, 'role': 'admin'}
+        for body in [admin] + [
+            {'username': f'bench_user_{i}', 'email': f'user{i}{BENCH_DOMAIN}',
+             'password': BENCH_PASSWORD, 'role': 'user'}
+            for i in range(users)
+        ]:
+            response = client.post('/api/users', json=body)
+            if response.status_code != 201:
+                raise SystemExit(f"seeding {body['email']} failed: {response.get_json()}")
+        self.users = [f'user{i}{BENCH_DOMAIN}' for i in range(users)]
+
+        conn = self.api.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                'INSERT INTO concerts (name, artist, date, venue, price, available_tickets) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                ('Bench Flash Sale', 'Load Generator', '2099-01-01', 'Localhost Arena', 1, seats)
+            )
+            self.concert_id = cursor.lastrowid
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+        self.api.concert_cache.invalidate()
+
+    def sold(self):
+        conn = self.api.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('SELECT available_tickets FROM concerts WHERE id = %s', (self.concert_id,))
+            available = cursor.fetchone()[0]
+            cursor.execute(
+                'SELECT COALESCE(SUM(quantity), 0) FROM ticket_holds '
+                'WHERE concert_id = %s AND status = %s', (self.concert_id, 'confirmed')
+            )
+            return available, int(cursor.fetchone()[0])
+        finally:
+            cursor.close()
+            conn.close()
+
+    def cleanup(self):
+        conn = self.api.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            if self.concert_id is not None:
+                cursor.execute('DELETE FROM ticket_holds WHERE concert_id = %s', (self.concert_id,))
+                cursor.execute('DELETE FROM transactions WHERE event_id = %s', (self.concert_id,))
+                cursor.execute('DELETE FROM sales_daily WHERE concert_id = %s', (self.concert_id,))
+                cursor.execute('DELETE FROM concerts WHERE id = %s', (self.concert_id,))
+            cursor.execute('DELETE FROM users WHERE email LIKE %s', ('%' + BENCH_DOMAIN,))
+            self.api.stats.rebuild(cursor)
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+        self.api.concert_cache.invalidate()
+
+    def login(self, session, email):
+        response = session.post(f'{self.web_url}/api/auth/login',
+                                json={'identifier': email, 'password': BENCH_PASSWORD})
+        return response.status_code == 200
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    index = min(len(samples) - 1, max(0, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+def run(operation, requests_total, concurrency, make_state):
+    """Run ``operation(state, i)`` ``requests_total`` times on ``concurrency`` workers"""
+    counter = iter(range(requests_total))
+    lock = threading.Lock()
+
+    def worker(_):
+        state = make_state()
+        latencies, errors = [], 0
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return latencies, errors
+            started = time.perf_counter()
+            ok = operation(state, i)
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(l for worker_latencies, _ in results for l in worker_latencies)
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors for _, errors in results),
+        'seconds': round(elapsed, 3),
+        'throughput': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def scenario_login(stack, args, rng):
+    emails = [rng.choice(stack.users) for _ in range(args.requests)]
+
+    def login(session, i):
+        session.cookies.clear()
+        return stack.login(session, emails[i])
+
+    return run(login, args.requests, args.concurrency, requests.Session)
+
+
+def scenario_browse(stack, args, rng):
+    # Mostly the cached catalog, some filtered pages that reach MySQL
+    queries = [None if rng.random() < 0.8 else
+               {'limit': 20, 'price_max': rng.choice([500000, 1000000, 2000000])}
+               for _ in range(args.requests)]
+
+    def make_state():
+        session = requests.Session()
+        stack.login(session, rng.choice(stack.users))
+        return session
+
+    def browse(session, i):
+        response = session.get(f'{stack.web_url}/api/concerts', params=queries[i])
+        return response.status_code == 200
+
+    return run(browse, args.requests, args.concurrency, make_state)
+
+
+def scenario_dashboard(stack, args, rng):
+    def make_state():
+        session = requests.Session()
+        stack.login(session, f'admin{BENCH_DOMAIN}')
+        return session
+
+    def poll(session, i):
+        response = session.get(f'{stack.web_url}/api/admin/dashboard')
+        return response.status_code == 200 and response.json().get('authenticated')
+
+    return run(poll, args.requests, args.concurrency, make_state)
+
+
+def scenario_flash_sale(stack, args, rng):
+    buyers = stack.users[:args.requests]
+    sessions = {}
+
+    def login(email):
+        session = requests.Session()
+        stack.login(session, email)
+        sessions[email] = session
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(login, buyers))
+
+    def buy(_, i):
+        email = buyers[i % len(buyers)]
+        response = sessions[email].post(
+            f'{stack.web_url}/api/tickets/purchase',
+            json={'concert_id': stack.concert_id, 'quantity': 1},
+            headers={'Idempotency-Key': f'bench-{stack.concert_id}-{i}'}
+        )
+        # Sold out is an expected answer, not an error
+        return response.status_code in (201, 200, 409)
+
+    result = run(buy, len(buyers), args.concurrency, lambda: None)
+    available, confirmed = stack.sold()
+    result.update(seats=args.seats, sold=confirmed, remaining=available,
+                  oversold=confirmed > args.seats or available < 0)
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print change vs the baseline; returns the list of regressions"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        for key, higher_is_better in (('throughput', True), ('p95_ms', False), ('p99_ms', False)):
+            if not base.get(key):
+                continue
+            change = (result[key] - base[key]) / base[key] * 100
+            worse = -change if higher_is_better else change
+            marker = '  REGRESSION' if worse > threshold else ''
+            print(f'  {name:<11} {key:<10} {base[key]:>10} -> {result[key]:>10} ({change:+.1f}%){marker}')
+            if marker:
+                regressions.append((name, key, round(change, 1)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=2000, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--users', type=int, default=200, help='seeded users (and flash-sale buyers)')
+    parser.add_argument('--seats', type=int, default=50, help='seats in the flash-sale concert')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+    parser.add_argument('--baseline', default=os.path.join(RESULTS_DIR, 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    stack = Stack()
+    results = {}
+    try:
+        stack.seed(args.users, args.seats)
+        for name in names:
+            rng = random.Random(args.seed)
+            results[name] = globals()[f'scenario_{name}'](stack, args, rng)
+            r = results[name]
+            print(f"{name:<11} {r['requests']:>6} req  {r['throughput']:>8} req/s  "
+                  f"p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  p99 {r['p99_ms']:>8} ms  "
+                  f"errors {r['errors']}" + (f"  sold {r['sold']}/{r['seats']}" if 'sold' in r else ''))
+    finally:
+        stack.cleanup()
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'storage': stack.api.storage.describe()['backend'],
+        'params': {k: v for k, v in vars(args).items() if k not in ('baseline', 'save_baseline')},
+        'scenarios': results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(os.path.join(RESULTS_DIR, 'latest.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\ncompared with baseline {baseline.get('revision')} ({baseline.get('timestamp')}):")
+        regressions = compare(results, baseline, args.threshold)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nbaseline saved to {args.baseline}')
+
+    oversold = any(r.get('oversold') for r in results.values())
+    if oversold:
+        print('\nFLASH SALE OVERSOLD')
+    sys.exit(1 if regressions or oversold else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,19 @@
-from flask import render_template, redirect, url_for, flash, jsonify, session
+from flask import render_template, redirect, url_for, flash, jsonify, session, request
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+from services.database_service import conditional_headers, relay_response
+from services.metrics import FALLBACKS
 
 class AdminController:
     def __init__(self, auth_service, database_service):
         self.auth = auth_service
         self.db = database_service
+        # Dashboard sections are fetched in parallel on these threads
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('DASHBOARD_WORKERS', 8)),
+            thread_name_prefix='dashboard'
+        )
     
     def admin_panel(self):
         user = self.auth.get_current_user()
@@ -17,11 +27,12 @@ class AdminController:
             return jsonify({'error': 'Not authorized'}), 401
         
         token = session.get('token')
-        response = self.db.get_admin_stats(token)
+        response = self.db.get_admin_stats(token, headers=conditional_headers(request.headers))
         
-        if response and response.status_code == 200:
-            return jsonify(response.json())
+        if response is not None and response.status_code in (200, 304):
+            return relay_response(response)
         else:
+            FALLBACKS.inc('admin_stats')
             return jsonify({
                 'total_users': 2,
                 'total_concerts': 3,
@@ -36,12 +47,140 @@ class AdminController:
             return jsonify({'error': 'Not authorized'}), 401
         
         token = session.get('token')
-        response = self.db.get_users(token)
+        response = self.db.get_users(token, params=request.args.to_dict(), stream=True,
+                                     headers=conditional_headers(request.headers))
         
-        if response and response.status_code == 200:
-            return jsonify(response.json())
+        if response is not None and response.status_code in (200, 304, 400):
+            return relay_response(response)
         else:
+            if response is not None:
+                response.close()
+            FALLBACKS.inc('admin_users')
             return jsonify([
                 {'id': 1, 'username': 'System Admin', 'email': 'admin@guardiantix.com', 'phone': None, 'role': 'admin', 'join_date': '2024-01-01'},
                 {'id': 2, 'username': 'pai', 'email': 'pai@gmail.com', 'phone': None, 'role': 'user', 'join_date': '2024-01-01'}
-            ])
\ No newline at end of file
+            ])
+    
+    def admin_transactions(self):
+        """Relay one page of transactions (filters and cursor pass straight through)"""
+        if not self.auth.verify_admin_access():
+            return jsonify({'error': 'Not authorized'}), 401
+        
+        token = session.get('token')
+        response = self.db.get_transactions(token, params=request.args.to_dict(), stream=True,
+                                            headers=conditional_headers(request.headers))
+        if response is not None and response.status_code in (200, 304, 400):
+            return relay_response(response)
+        return self._proxy(response)
+    
+    def sales_analytics(self):
+        """Relay the daily sales rollup for the requested date range"""
+        if not self.auth.verify_admin_access():
+            return jsonify({'error': 'Not authorized'}), 401
+        
+        token = session.get('token')
+        response = self.db.get_sales_analytics(token, params=request.args.to_dict(),
+                                               headers=conditional_headers(request.headers))
+        if response is not None and response.status_code in (200, 304):
+            return relay_response(response)
+        return self._proxy(response)
+    
+    def update_user_role(self, user_id):
+        if not self.auth.verify_admin_access():
+            return jsonify({'error': 'Not authorized'}), 401
+        
+        data = request.get_json(silent=True) or {}
+        token = session.get('token')
+        response = self.db.update_user_role(user_id, data.get('role'), token)
+        return self._proxy(response)
+    
+    def delete_user(self, user_id):
+        if not self.auth.verify_admin_access():
+            return jsonify({'error': 'Not authorized'}), 401
+        
+        token = session.get('token')
+        response = self.db.delete_user(user_id, token)
+        return self._proxy(response)
+    
+    def import_users(self):
+        """Stream an NDJSON/CSV upload straight through to the database API"""
+        if not self.auth.verify_admin_access():
+            return jsonify({'error': 'Not authorized'}), 401
+        
+        token = session.get('token')
+        content_type = request.content_type or 'application/x-ndjson'
+        response = self.db.import_users(token, request.stream, content_type=content_type)
+        return self._proxy(response)
+    
+    def export_users(self):
+        """Relay the streamed export chunk by chunk without buffering it"""
+        if not self.auth.verify_admin_access():
+            return jsonify({'error': 'Not authorized'}), 401
+        
+        token = session.get('token')
+        fmt = 'csv' if request.args.get('format') == 'csv' else 'ndjson'
+        response = self.db.export_users(token, fmt)
+        if response is None or response.status_code != 200:
+            return self._proxy(response)
+        return relay_response(response)
+    
+    def admin_dashboard(self):
+        """Everything the admin panel needs on load, in one round trip.
+
+        Sections are fetched concurrently; a failing section carries its own
+        error instead of failing the whole payload.
+        """
+        if not self.auth.verify_admin_access():
+            return jsonify({'authenticated': False, 'error': 'Not authorized'}), 401
+        
+        user = self.auth.get_current_user()
+        token = session.get('token')
+        users_params = {'limit': request.args.get('users_limit', 50)}
+        calls = {
+            'stats': lambda: self.db.get_admin_stats(token),
+            'users': lambda: self.db.get_users(token, params=users_params),
+            'concerts': lambda: self.db.get_concerts(token),
+            'transactions': lambda: self.db.get_transactions(token),
+        }
+        futures = {name: self.executor.submit(call) for name, call in calls.items()}
+        
+        payload = {'authenticated': True, 'user': user.to_dict()}
+        for name, future in futures.items():
+            payload[name] = self._section(future)
+        return jsonify(payload)
+    
+    def _section(self, future):
+        try:
+            response = future.result()
+        except Exception as e:
+            return {'data': None, 'error': str(e)}
+        if response is None:
+            return {'data': None, 'error': 'Database API unavailable'}
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if response.status_code != 200:
+            error = body.get('error') if isinstance(body, dict) else None
+            return {'data': None, 'error': error or f'HTTP {response.status_code}'}
+        section = {'data': body, 'error': None}
+        if response.headers.get('X-Next-Cursor'):
+            section['next_cursor'] = response.headers['X-Next-Cursor']
+        return section
+    
+    def init_concerts(self):
+        if not self.auth.verify_admin_access():
+            return jsonify({'error': 'Not authorized'}), 401
+        
+        token = session.get('token')
+        response = self.db.init_concerts(token)
+        return self._proxy(response)
+    
+    def _proxy(self, response):
+        """Pass an API response through, or 502 if the API is unreachable"""
+        if response is None:
+            return jsonify({'error': 'Database API unavailable'}), 502
+        try:
+            return jsonify(response.json()), response.status_code
+        except ValueError:
+            return jsonify({'error': f'HTTP {response.status_code}'}), response.status_code
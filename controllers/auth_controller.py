@@ -1,26 +1,25 @@
 from flask import render_template, request, redirect, url_for, flash, jsonify, session
 from models.user import User
+from services.log_service import get_logger
+
+log = get_logger('auth_controller')
 
 class AuthController:
-    def __init__(self, auth_service):
+    def __init__(self, auth_service, page_cache):
         self.auth = auth_service
+        self.pages = page_cache
     
     def homepage(self):
         user = self.auth.get_current_user()
     
-    # DEBUG
-        print(f"🔍 User ID in session: {session.get('user_id')}")
-        print(f"🔍 User authenticated: {user.is_authenticated()}")
-        print(f"🔍 User role: {getattr(user, 'role', 'none')}")
-    
         if not user.is_authenticated():
-            print("❌ Redirecting to login - user not authenticated")
+            log.debug("Redirecting to login - user not authenticated")
             return redirect(url_for("login"))
     
         if user.is_admin():
             return redirect(url_for("admin_panel"))
     
-        return render_template("user/homepage.html", username=user.username)
+        return self.pages.render("user/homepage.html", {'username': user.username})
     
     def register(self):
         if request.method == "POST":
@@ -1,2 +1,3 @@
 from .auth_controller import AuthController
-from .admin_controller import AdminController
\ No newline at end of file
+from .admin_controller import AdminController
+from .ticket_controller import TicketController
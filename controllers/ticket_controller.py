@@ -0,0 +1,48 @@
+from flask import jsonify, request, session
+
+class TicketController:
+    def __init__(self, auth_service, database_service):
+        self.auth = auth_service
+        self.db = database_service
+    
+    def reserve(self):
+        return self._order(self.db.reserve_tickets)
+    
+    def purchase(self):
+        return self._order(self.db.purchase_tickets, 'payment_method')
+    
+    def confirm(self, hold_id):
+        user = self.auth.get_current_user()
+        if not user.is_authenticated():
+            return jsonify({'error': 'Not authenticated'}), 401
+        payment_method = (request.get_json(silent=True) or {}).get('payment_method')
+        return self._proxy(self.db.confirm_hold(hold_id, session.get('token'), payment_method))
+    
+    def release(self, hold_id):
+        user = self.auth.get_current_user()
+        if not user.is_authenticated():
+            return jsonify({'error': 'Not authenticated'}), 401
+        return self._proxy(self.db.release_hold(hold_id, session.get('token')))
+    
+    def _order(self, call, *fields):
+        user = self.auth.get_current_user()
+        if not user.is_authenticated():
+            return jsonify({'error': 'Not authenticated'}), 401
+        
+        data = request.get_json(silent=True) or {}
+        concert_id = data.get('concert_id')
+        if not isinstance(concert_id, int):
+            return jsonify({'error': 'concert_id is required'}), 400
+        
+        idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+        response = call(concert_id, data.get('quantity', 1), session.get('token'), idempotency_key,
+                        **{field: data.get(field) for field in fields})
+        return self._proxy(response)
+    
+    def _proxy(self, response):
+        if response is None:
+            return jsonify({'error': 'Ticketing is busy, please try again'}), 503
+        try:
+            return jsonify(response.json()), response.status_code
+        except ValueError:
+            return jsonify({'error': f'HTTP {response.status_code}'}), response.status_code
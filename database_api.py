@@ -1,14 +1,45 @@
-from flask import Flask, request, jsonify
-import mysql.connector
+from flask import Flask, Response, request, jsonify
 import os
 import jwt
 from functools import wraps
-from datetime import datetime
-import hashlib
-from mysql.connector import Error
+from datetime import date, datetime, timedelta
+import json
+import base64
+import csv
+import io
+import itertools
 import time
+import threading
+import uuid
+import atexit
+from collections import deque
+from werkzeug.serving import WSGIRequestHandler, is_running_from_reloader
+
+from services.connection_pool import ConnectionPool, PoolTimeout
+from services.storage import create_backend
+from services.cache import VersionedCache
+from services.inventory import InventoryManager, InventoryError
+from services.stats_service import StatsService
+from services.sales_rollup import SalesRollup
+from services.change_tracker import ChangeTracker
+from services.token_cache import TokenCache
+from services.password_hasher import HasherBusy, create_hasher
+from services.group_commit import GroupCommitWriter, WriterBusy
+from services.rate_limiter import RateLimiter, policy_from_env
+from services.security_service import SecurityService
+from services.log_service import setup_logging, get_logger, DroppingQueueHandler
+from services.metrics import REGISTRY, instrument_app, metrics_response, observe_query
+from services.json_codec import JSONProvider, dumps_records
+from models.user import User
+from models.concert import Concert
+from models.transaction import Transaction
+
+setup_logging('database-api')
+log = get_logger('database_api')
 
 app = Flask(__name__)
+app.json = JSONProvider(app)
+instrument_app(app)
 SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
 
 # MySQL configuration - DOCKER VERSION
@@ -22,39 +53,138 @@ MYSQL_CONFIG = {
     'connect_timeout': 30  # ← TAMBAH INI
 }
 
-def get_db_connection(retries=5, delay=5):
-    """Create MySQL database connection dengan retry untuk Docker"""
-    for attempt in range(retries):
-        try:
-            conn = mysql.connector.connect(**MYSQL_CONFIG)
-            print(f"✅ Connected to MySQL database: {MYSQL_CONFIG['database']}")
-            return conn
-        except Error as e:
-            print(f"❌ Attempt {attempt + 1}/{retries} failed: {e}")
-            if attempt < retries - 1:
-                print(f"🔄 Retrying in {delay} seconds...")
-                time.sleep(delay)
-            else:
-                print("❌ All connection attempts failed")
-                return None
+# Storage backend: MySQL by default, STORAGE_BACKEND=sqlite for single-node installs
+storage = create_backend(mysql_config=MYSQL_CONFIG)
+Error = storage.Error
+IntegrityError = storage.IntegrityError
 
-def init_database():
-    """Initialize database tables if they don't exist"""
-    print("🔄 Initializing database dengan retry...")
-    
-    for attempt in range(3):
+# Connection pool - bounded, health-checked, fails fast instead of sleeping
+db_pool = ConnectionPool(
+    storage.connect,
+    max_size=int(os.getenv('DB_POOL_SIZE', 10)),
+    acquire_timeout=float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', 2)),
+    max_lifetime=int(os.getenv('DB_POOL_MAX_LIFETIME', 1800)),
+    ping_interval=int(os.getenv('DB_POOL_PING_INTERVAL', 30)),
+    on_query=observe_query
+)
+
+def get_db_connection():
+    """Borrow a database connection from the pool (close() gives it back)"""
+    try:
+        return db_pool.acquire()
+    except PoolTimeout as e:
+        log.warning("Connection pool exhausted", error=str(e), pool=db_pool.stats())
+        return None
+    except Error as e:
+        log.error("Database connection failed", error=str(e), **storage.describe())
+        return None
+
+# Precomputed dashboard statistics, maintained by the write paths
+stats = StatsService(
+    get_db_connection,
+    shards=int(os.getenv('STATS_SHARDS', 16)),
+    refresh_interval=int(os.getenv('STATS_REFRESH_INTERVAL', 60)),
+    cache_ttl=float(os.getenv('STATS_CACHE_TTL', 2))
+)
+
+# Tickets and revenue per (day, concert), maintained with every transaction row
+sales = SalesRollup(
+    get_db_connection,
+    shards=int(os.getenv('SALES_ROLLUP_SHARDS', 4)),
+    compact_interval=int(os.getenv('SALES_COMPACT_INTERVAL', 3600))
+)
+
+# Per-table change counters behind ETag / Last-Modified on the read endpoints
+changes = ChangeTracker(
+    get_db_connection,
+    ('users', 'concerts', 'ticket_holds', 'transactions'),
+    shards=int(os.getenv('TABLE_VERSION_SHARDS', 8)),
+    refresh_interval=float(os.getenv('TABLE_VERSION_REFRESH_INTERVAL', 1))
+)
+for _table in changes.tables:
+    # Writes made by other workers drop the cached dashboard numbers too
+    changes.on_change(_table, stats.invalidate)
+
+def ensure_index(cursor, table, name, columns):
+    """Create an index unless it already exists (MySQL has no IF NOT EXISTS)"""
+    if not storage.index_exists(cursor, table, name):
+        cursor.execute(f'CREATE INDEX {name} ON {table} ({columns})')
+        log.info("Created index", index=name, table=table, columns=columns)
+
+# Bump whenever init_database() gains new DDL so existing databases upgrade
+SCHEMA_VERSION = 4
+STARTUP_MAX_BACKOFF = float(os.getenv('STARTUP_MAX_BACKOFF', 5))
+
+def wait_for_database(max_backoff=STARTUP_MAX_BACKOFF):
+    """Block until the database accepts a connection, backing off exponentially"""
+    delay = 0.1
+    while True:
         conn = get_db_connection()
         if conn:
-            break
-        print(f"🔄 Retry {attempt + 1}/3 in 10 seconds...")
-        time.sleep(10)
-    else:
-        print("❌ Failed to connect to MySQL after 3 attempts")
-        return
+            conn.close()
+            return
+        log.info("Database not ready, retrying", retry_in_s=delay)
+        time.sleep(delay)
+        delay = min(delay * 2, max_backoff)
+
+def read_schema_version(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_meta (
+            id INT PRIMARY KEY,
+            version INT NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    ''')
+    cursor.execute('SELECT version FROM schema_meta WHERE id = 1')
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+def write_schema_version(cursor, version):
+    cursor.execute(
+        'UPDATE schema_meta SET version = %s, applied_at = %s WHERE id = 1',
+        (version, datetime.now())
+    )
+    if cursor.rowcount == 0:
+        cursor.execute(
+            'INSERT INTO schema_meta (id, version, applied_at) VALUES (1, %s, %s)',
+            (version, datetime.now())
+        )
+
+def ensure_counters(cursor):
+    """Create the counter and rollup rows the current STATS_SHARDS /
+    TABLE_VERSION_SHARDS need; bump() only updates existing shards"""
+    if stats.ensure_seeded(cursor):
+        log.info("Dashboard statistics rebuilt", shards=stats.shards)
+    if changes.ensure_seeded(cursor):
+        log.info("Table version counters created", shards=changes.shards)
+    if sales.ensure_seeded(cursor):
+        log.info("Daily sales rollup rebuilt")
+
+def init_database():
+    """Create or upgrade the schema; the DDL is skipped when schema_meta is
+    current, but counter rows are checked on every startup.
+
+    A named lock (GET_LOCK on MySQL, the write lock on SQLite) makes
+    concurrent workers run the DDL exactly once.
+    """
+    conn = get_db_connection()
+    if not conn:
+        log.error("Database initialization skipped: no connection")
+        return False
     
     cursor = conn.cursor()
     
     try:
+        storage.acquire_lock(cursor, 'guardiantix_schema', 60)
+        current = read_schema_version(cursor)
+        if current >= SCHEMA_VERSION:
+            log.info("Schema is current, skipping DDL", schema_version=current)
+            # Shard counts are config, not schema; they can change on any deploy
+            ensure_counters(cursor)
+            conn.commit()
+            return True
+        log.info("Upgrading schema", from_version=current, to_version=SCHEMA_VERSION)
+        
         # Create users table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -81,17 +211,92 @@ def init_database():
             )
         ''')
         
+        # Create ticket holds table (seat reservations and purchases)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ticket_holds (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                hold_id VARCHAR(64) UNIQUE NOT NULL,
+                concert_id INT NOT NULL,
+                user_id INT NOT NULL,
+                quantity INT NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'held',
+                idempotency_key VARCHAR(128),
+                expires_at DATETIME NOT NULL,
+                created_at DATETIME NOT NULL,
+                CONSTRAINT uq_holds_idempotency UNIQUE (user_id, idempotency_key)
+            )
+        ''')
+        
+        # Create stats counters table (sharded rows per statistic)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_counters (
+                name VARCHAR(64) NOT NULL,
+                shard INT NOT NULL,
+                value BIGINT NOT NULL DEFAULT 0,
+                updated_at DATETIME NOT NULL,
+                PRIMARY KEY (name, shard)
+            )
+        ''')
+        
+        # Create table versions (sharded change counters per table, see ChangeTracker)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS table_versions (
+                name VARCHAR(64) NOT NULL,
+                shard INT NOT NULL,
+                version BIGINT NOT NULL DEFAULT 0,
+                updated_at DATETIME NOT NULL,
+                PRIMARY KEY (name, shard)
+            )
+        ''')
+        
+        # Create transactions table (completed checkouts, see record_transaction)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                transaction_id VARCHAR(64) UNIQUE NOT NULL,
+                user_id INT,
+                username VARCHAR(255),
+                event_id INT,
+                event_name VARCHAR(255),
+                amount BIGINT NOT NULL,
+                payment_method VARCHAR(50),
+                status VARCHAR(20) NOT NULL DEFAULT 'completed',
+                created_at DATETIME NOT NULL
+            )
+        ''')
+        
+        # Create daily sales rollup (sharded rows per day and concert, see SalesRollup)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sales_daily (
+                day DATE NOT NULL,
+                concert_id INT NOT NULL,
+                shard INT NOT NULL,
+                tickets BIGINT NOT NULL DEFAULT 0,
+                revenue BIGINT NOT NULL DEFAULT 0,
+                transactions BIGINT NOT NULL DEFAULT 0,
+                updated_at DATETIME NOT NULL,
+                PRIMARY KEY (day, concert_id, shard)
+            )
+        ''')
+        
+        # Indexes for username logins and join_date range/sort queries
+        ensure_index(cursor, 'users', 'idx_users_username', 'username')
+        ensure_index(cursor, 'users', 'idx_users_join_date', 'join_date')
+        ensure_index(cursor, 'ticket_holds', 'idx_holds_status_expires', 'status, expires_at')
+        ensure_index(cursor, 'transactions', 'idx_transactions_status_created', 'status, created_at')
+        ensure_index(cursor, 'transactions', 'idx_transactions_created', 'created_at')
+        
         # Insert admin user if not exists
         cursor.execute('SELECT id FROM users WHERE email = %s', ('admin@guardiantix.com',))
         admin_exists = cursor.fetchone()
         
         if not admin_exists:
-            password_hash = hash_password('admin123')
+            password_hash = password_hasher.hash('admin123')
             cursor.execute(
                 'INSERT INTO users (username, email, password_hash, role) VALUES (%s, %s, %s, %s)',
                 ('System Admin', 'admin@guardiantix.com', password_hash, 'admin')
             )
-            print("✅ Admin user created in database")
+            log.info("Admin user created in database")
         
         # Insert sample concerts if not exists
         cursor.execute('SELECT COUNT(*) FROM concerts')
@@ -108,27 +313,54 @@ def init_database():
                 'INSERT INTO concerts (name, artist, date, venue, price, available_tickets) VALUES (%s, %s, %s, %s, %s, %s)',
                 concerts
             )
-            print("✅ Sample concerts added to database")
+            log.info("Sample concerts added to database")
+        
+        ensure_counters(cursor)
         
+        write_schema_version(cursor, SCHEMA_VERSION)
         conn.commit()
-        print("✅ MySQL database initialized successfully")
+        log.info("Database initialized", schema_version=SCHEMA_VERSION, **storage.describe())
+        return True
         
     except Error as e:
-        print(f"❌ Error initializing database: {e}")
+        conn.rollback()
+        log.error("Error initializing database", error=str(e))
+        return False
     finally:
+        try:
+            storage.release_lock(cursor, 'guardiantix_schema')
+        except Error:
+            pass
         cursor.close()
         conn.close()
 
-# Initialize database when starting - TAMBAH DELAY
-print("⏳ Waiting for MySQL to be ready...")
-time.sleep(10)  # Tunggu MySQL container siap
-init_database()
+# Password KDF runs on worker processes; tune cost with SCRYPT_* / PBKDF2_*
+password_hasher = create_hasher()
+
+def busy_response(message):
+    response = jsonify({'error': message})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
 
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+# Verified-token cache: skips HMAC verification for tokens seen recently
+TOKEN_TTL_SECONDS = int(os.getenv('TOKEN_TTL_SECONDS', 3600))
+token_cache = TokenCache(
+    max_size=int(os.getenv('TOKEN_CACHE_SIZE', 10000)),
+    max_ttl=TOKEN_TTL_SECONDS
+)
 
-# Initialize database when starting
-init_database()
+# Token-bucket admission control on login/registration and checkout, shared by
+# every worker on the host; requests beyond it get 429 before touching MySQL
+limiter = RateLimiter(
+    'api',
+    os.getenv('RATE_LIMIT_DB'),
+    enabled=os.getenv('RATE_LIMIT_ENABLED', '1') == '1',
+    # The gateway forwards its client's address; list it here (docker-compose does)
+    trusted_proxies=os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '127.0.0.1,::1').split(',')
+)
+AUTH_LIMIT = policy_from_env('AUTH_LIMIT', rate=0.5, burst=10, global_rate=100, global_burst=200)
+CHECKOUT_LIMIT = policy_from_env('CHECKOUT_LIMIT', rate=2, burst=10, global_rate=500, global_burst=1000)
 
 # Authentication middleware
 def token_required(f):
@@ -137,48 +369,163 @@ def token_required(f):
         token = request.headers.get('Authorization')
         if not token:
             return jsonify({'error': 'Token is missing'}), 401
+        token = token.replace('Bearer ', '')  # Remove Bearer prefix
+        
+        claims = token_cache.get(token)
+        if claims is None:
+            try:
+                claims = jwt.decode(
+                    token, SECRET_KEY, algorithms=["HS256"],
+                    options={'require': ['exp', 'iat']}
+                )
+            except jwt.ExpiredSignatureError:
+                return jsonify({'error': 'Token has expired'}), 401
+            except jwt.InvalidTokenError:
+                return jsonify({'error': 'Token is invalid'}), 401
+            if 'user_id' not in claims:
+                return jsonify({'error': 'Token is invalid'}), 401
+            if token_cache.is_revoked(claims):
+                return jsonify({'error': 'Token has been revoked'}), 401
+            token_cache.put(token, claims)
+        
+        request.user_id = claims['user_id']
+        return f(*args, **kwargs)
+    return decorated
+
+def admin_required(f):
+    """Only admins get through; goes under token_required. The role is read
+    from the database, since tokens outlive role changes."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({'error': 'Database connection failed'}), 500
+        cursor = conn.cursor()
         try:
-            token = token.replace('Bearer ', '')  # Remove Bearer prefix
-            data = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-            request.user_id = data['user_id']
-        except Exception as e:
-            return jsonify({'error': 'Token is invalid', 'details': str(e)}), 401
+            cursor.execute('SELECT role FROM users WHERE id = %s', (request.user_id,))
+            row = cursor.fetchone()
+        except Error as e:
+            return jsonify({'error': f'Database error: {str(e)}'}), 500
+        finally:
+            cursor.close()
+            conn.close()
+        if not row or row[0] != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
         return f(*args, **kwargs)
     return decorated
 
+def not_modified(etag, last_modified):
+    """Whether the client's copy is current (If-None-Match wins over If-Modified-Since)"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified is not None and last_modified <= since
+
+def with_validators(response, validators, private=False):
+    """Attach ETag / Last-Modified; caches may store the body but must revalidate"""
+    etag, last_modified = validators
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    if private:
+        response.cache_control.private = True
+    return response
+
+def conditional(*tables, extra=None, private=False):
+    """Validate GETs against the change counters of ``tables`` before the view runs.
+
+    A matching If-None-Match / If-Modified-Since gets a bodyless 304 from
+    the in-process versions, without a database round trip. The versions
+    are read before the view queries, so a body is never older than its
+    ETag. ``extra()`` adds components for state that is not in a table.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            validators = changes.validators(tables, extra() if extra else ())
+            if validators is None:
+                return f(*args, **kwargs)
+            if not_modified(*validators):
+                return with_validators(Response(status=304), validators, private)
+            response = app.make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                with_validators(response, validators, private)
+            return response
+        return decorated
+    return decorator
+
 # Health check endpoint
 @app.route('/api/health', methods=['GET'])
 def health_check():
     try:
         conn = get_db_connection()
         if not conn:
-            return jsonify({'status': 'unhealthy', 'error': 'Database connection failed'}), 500
+            return jsonify({
+                'status': 'unhealthy',
+                'error': 'Database connection failed',
+                'pool': db_pool.stats()
+            }), 500
         
         cursor = conn.cursor()
         cursor.execute('SELECT 1')
+        cursor.fetchall()
         cursor.close()
         conn.close()
-        return jsonify({'status': 'healthy', 'database': 'MySQL connected'})
+        return jsonify({
+            'status': 'healthy',
+            'database': f'{storage.name} connected',
+            'pool': db_pool.stats(),
+            'concert_cache': concert_cache.stats(),
+            'token_cache': token_cache.stats(),
+            'table_versions': changes.stats(),
+            'password_hasher': password_hasher.stats(),
+            'transaction_writer': dict(transaction_writer.stats(),
+                                       unrecorded=len(unrecorded_transactions)),
+            'sales_rollup': sales.stats(),
+            'inventory': inventory.stats() if inventory is not None else None
+        })
     except Exception as e:
-        return jsonify({'status': 'unhealthy', 'error': str(e)}), 500
+        return jsonify({'status': 'unhealthy', 'error': str(e), 'pool': db_pool.stats()}), 500
 
 # Check session endpoint
 @app.route('/api/check-session', methods=['GET', 'POST'])
 def check_session():
     try:
         # Simple version - always return valid for now
-        print("✅ Check-session endpoint called")
         return jsonify({
             "status": "valid", 
             "message": "Session check working",
             "timestamp": str(datetime.now())
         })
     except Exception as e:
-        print(f"❌ Error in check-session: {e}")
+        log.exception("Error in check-session")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+LOGIN_QUERY = (
+    'SELECT id, username, email, password_hash, role, phone, join_date, 0 AS match_rank '
+    'FROM users WHERE email = %s '
+    'UNION ALL '
+    'SELECT id, username, email, password_hash, role, phone, join_date, 1 AS match_rank '
+    'FROM users WHERE username = %s '
+    'ORDER BY match_rank, id LIMIT 1'
+)
+
+def find_login_user(cursor, identifier):
+    """Look a user up by email, falling back to username, in one round trip.
+
+    Both branches are served by an index (the email UNIQUE key and
+    idx_users_username); an email match wins over a username match.
+    """
+    cursor.execute(LOGIN_QUERY, (identifier, identifier))
+    user = cursor.fetchone()
+    if user:
+        user.pop('match_rank', None)
+    return user
+
 # Login endpoint
 @app.route('/api/login', methods=['POST'])
+@limiter.limit('auth', AUTH_LIMIT)
 def login():
     data = request.json
     identifier = data.get('identifier', '').strip()
@@ -192,68 +539,316 @@ def login():
         return jsonify({'error': 'Database connection failed'}), 500
         
     cursor = conn.cursor(dictionary=True)
+    try:
+        user = find_login_user(cursor, identifier)
+    except Error as e:
+        log.error("Login database error", error=str(e))
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+    finally:
+        # Don't hold a pooled connection while the KDF runs
+        cursor.close()
+        conn.close()
     
     try:
-        # Try by email first
-        cursor.execute('SELECT * FROM users WHERE email = %s', (identifier,))
-        user = cursor.fetchone()
-        
-        # If not found by email, try by username
-        if not user:
-            cursor.execute('SELECT * FROM users WHERE username = %s', (identifier,))
-            user = cursor.fetchone()
-        
-        # DEBUG: Print untuk troubleshooting
-        print(f"🔍 Login attempt - User: {identifier}")
-        print(f"🔍 Found user: {user['email'] if user else 'None'}")
-        
-        # VERIFY PASSWORD - PLAINTEXT (NO HASHING)
-        if user and user['password_hash'] == password:  # ← LANGSUNG COMPARE PLAINTEXT
+        ok, rehash = password_hasher.verify(password, user['password_hash'] if user else None)
+        if ok:
+            if rehash:
+                upgrade_password_hash(user['id'], user['password_hash'], password)
             # Remove password from response
             user.pop('password_hash', None)
             
+            issued_at = int(time.time())
             token = jwt.encode(
-                {'user_id': user['id'], 'username': user['username']}, 
+                {
+                    'user_id': user['id'],
+                    'username': user['username'],
+                    'iat': issued_at,
+                    'exp': issued_at + TOKEN_TTL_SECONDS
+                }, 
                 SECRET_KEY, 
                 algorithm="HS256"
             )
             
-            print(f"✅ Login successful for: {user['email']}")
+            log.info("Login successful", user_id=user['id'])
             return jsonify({
                 'token': token, 
                 'user': user,
                 'message': 'Login successful'
             })
         else:
-            print(f"❌ Login failed - Password mismatch")
-            print(f"🔍 Stored: {user['password_hash'] if user else 'None'}")
-            print(f"🔍 Input: {password}")
+            log.info("Login failed", user_found=user is not None)
             return jsonify({'error': 'Invalid credentials'}), 401
-            
+    except HasherBusy:
+        return busy_response('Too many logins in progress, please retry')
+
+def upgrade_password_hash(user_id, old_hash, password):
+    """Re-store a legacy or outdated hash with the current KDF parameters.
+
+    Conditional on the old value so a concurrent password change wins.
+    """
+    try:
+        new_hash = password_hasher.hash(password)
+    except HasherBusy:
+        return  # try again on a later login
+    conn = get_db_connection()
+    if not conn:
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            'UPDATE users SET password_hash = %s WHERE id = %s AND password_hash = %s',
+            (new_hash, user_id, old_hash)
+        )
+        conn.commit()
+        log.info("Password hash upgraded", user_id=user_id, algorithm=password_hasher.algorithm)
     except Error as e:
-        print(f"❌ Database error: {e}")
-        return jsonify({'error': f'Database error: {str(e)}'}), 500
+        conn.rollback()
+        log.warning("Password hash upgrade failed", user_id=user_id, error=str(e))
+    finally:
+        cursor.close()
+        conn.close()
+# ==========================
+#   KEYSET PAGINATION
+# ==========================
+
+DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', 100))
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 1000))
+# Pages at least this large are streamed from the cursor instead of buffered
+STREAM_MIN_ROWS = int(os.getenv('STREAM_MIN_ROWS', 500))
+STREAM_FETCH_SIZE = int(os.getenv('STREAM_FETCH_SIZE', 200))
+USER_COLUMNS = ', '.join(User.FIELDS)
+CONCERT_COLUMNS = ', '.join(Concert.FIELDS)
+
+class QueryError(Exception):
+    """Invalid listing parameters (answered with 400)"""
+
+def encode_cursor(values):
+    """Opaque cursor holding the sort key of the last row on a page"""
+    raw = json.dumps(values, default=str, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise QueryError('Invalid cursor')
+
+def page_limit(args):
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise QueryError('limit must be an integer')
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise QueryError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+    return limit
+
+def _number_arg(args, name, cast=int):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return cast(value)
+    except ValueError:
+        raise QueryError(f'{name} must be a number')
+
+def _like_prefix(value):
+    # '!' rather than backslash: the same ESCAPE clause parses in MySQL and SQLite
+    escaped = value.replace('!', '!!').replace('%', '!%').replace('_', '!_')
+    return escaped + '%'
+
+def build_user_query(args, newest_first):
+    """SELECT for a page of users plus the params, honouring filters and cursor.
+
+    Ordered by (join_date, id) newest first for the admin list, or by id
+    for the plain listing, so every page is a single index range scan.
+    """
+    where, params = [], []
+    if args.get('role'):
+        where.append('role = %s')
+        params.append(args['role'])
+    if args.get('email_prefix'):
+        where.append("email LIKE %s ESCAPE '!'")
+        params.append(_like_prefix(args['email_prefix']))
+    if args.get('joined_from'):
+        where.append('join_date >= %s')
+        params.append(args['joined_from'])
+    if args.get('joined_to'):
+        where.append('join_date < %s')
+        params.append(args['joined_to'])
+
+    after = args.get('after')
+    if after:
+        key = decode_cursor(after)
+        if newest_first:
+            if not isinstance(key, list) or len(key) != 2:
+                raise QueryError('Invalid cursor')
+            where.append('(join_date < %s OR (join_date = %s AND id < %s))')
+            params.extend([key[0], key[0], key[1]])
+        else:
+            where.append('id > %s')
+            params.append(key)
+
+    sql = f'SELECT {USER_COLUMNS} FROM users'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += ' ORDER BY join_date DESC, id DESC' if newest_first else ' ORDER BY id'
+    sql += ' LIMIT %s'
+    return sql, params
+
+def build_concert_query(args):
+    """SELECT for a page of concerts ordered by (date, id)"""
+    where, params = [], []
+    if args.get('city'):
+        # There is no city column; venues carry the location
+        where.append("venue LIKE %s ESCAPE '!'")
+        params.append('%' + _like_prefix(args['city']))
+    if args.get('date_from'):
+        where.append('date >= %s')
+        params.append(args['date_from'])
+    if args.get('date_to'):
+        where.append('date <= %s')
+        params.append(args['date_to'])
+    price_min = _number_arg(args, 'price_min')
+    if price_min is not None:
+        where.append('price >= %s')
+        params.append(price_min)
+    price_max = _number_arg(args, 'price_max')
+    if price_max is not None:
+        where.append('price <= %s')
+        params.append(price_max)
+
+    after = args.get('after')
+    if after:
+        key = decode_cursor(after)
+        if not isinstance(key, list) or len(key) != 2:
+            raise QueryError('Invalid cursor')
+        where.append('(date > %s OR (date = %s AND id > %s))')
+        params.extend([key[0], key[0], key[1]])
+
+    sql = f'SELECT {CONCERT_COLUMNS} FROM concerts'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += ' ORDER BY date, id LIMIT %s'
+    return sql, params
+
+def fetch_page(sql, params, limit, model, sort_key):
+    """Run a keyset query and return ``(models, next_cursor)``"""
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError('Database connection failed')
+    cursor = conn.cursor()
+    try:
+        # One extra row tells us whether another page exists
+        cursor.execute(sql, (*params, limit + 1))
+        rows = list(map(model.from_row, cursor.fetchall()))
     finally:
         cursor.close()
         conn.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort_key(rows[-1]))
+    return rows, next_cursor
+
+def stream_page(sql, params, limit, model, sort_key):
+    """Like fetch_page, but the models are a generator of JSON chunks.
+
+    The next-page cursor has to go out in a header before the body, so
+    rows ``limit`` and ``limit + 1`` are probed first, in the same read
+    snapshot as the page itself. The page is then encoded
+    STREAM_FETCH_SIZE rows at a time straight off an unbuffered cursor;
+    the connection goes back to the pool when the response finishes.
+    """
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError('Database connection failed')
+    try:
+        cursor = conn.cursor()
+        try:
+            storage.begin_read(cursor)
+            cursor.execute(sql + ' OFFSET %s', (*params, 2, limit - 1))
+            probe = cursor.fetchall()
+        finally:
+            cursor.close()
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(sql, (*params, limit))
+    except BaseException:
+        conn.close()
+        raise
+
+    next_cursor = encode_cursor(sort_key(model.from_row(probe[0]))) if len(probe) == 2 else None
+    return iter_json_array(_fetch_batches(conn, cursor, model)), next_cursor
+
+def _fetch_batches(conn, cursor, model):
+    try:
+        while True:
+            rows = cursor.fetchmany(STREAM_FETCH_SIZE)
+            if not rows:
+                return
+            yield list(map(model.from_row, rows))
+    except Error as e:
+        # Headers are gone already; all we can do is end the body early
+        log.warning("Streamed listing aborted", error=str(e))
+    finally:
+        try:
+            cursor.close()
+        except Error:
+            pass  # unread rows when the client hung up; the pool discards it
+        conn.close()
+
+def _batched(rows, size=STREAM_FETCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+def iter_json_array(batches):
+    """Encode an iterable of model lists as one JSON array, a batch per chunk"""
+    yield b'['
+    separator = b''
+    for models in batches:
+        if models:
+            yield separator + dumps_records(models)[1:-1]
+            separator = b','
+    yield b']'
+
+def list_response(sql, params, limit, model, sort_key):
+    """A page of ``model`` rows: buffered when small, streamed when large"""
+    if limit < STREAM_MIN_ROWS:
+        rows, next_cursor = fetch_page(sql, params, limit, model, sort_key)
+        return page_response(iter_json_array([rows]), next_cursor)
+    return page_response(*stream_page(sql, params, limit, model, sort_key))
+
+def page_response(body, next_cursor):
+    response = Response(body, mimetype='application/json')
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+def _timestamp_key(value, row_id):
+    if isinstance(value, datetime):
+        # Keeps microseconds when the backend stores them (SQLite)
+        value = value.isoformat(sep=' ')
+    return [value, row_id]
+
+def _join_date_key(user):
+    return _timestamp_key(user.join_date, user.id)
+
 # User endpoints
 @app.route('/api/users', methods=['GET'])
 @token_required
+@conditional('users', private=True)
 def get_users():
-    conn = get_db_connection()
-    if not conn:
-        return jsonify({'error': 'Database connection failed'}), 500
-        
-    cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute('SELECT id, username, email, role, phone, join_date FROM users')
-        users = cursor.fetchall()
-        return jsonify(users)
+        limit = page_limit(request.args)
+        sql, params = build_user_query(request.args, newest_first=False)
+        return list_response(sql, params, limit, User, lambda user: user.id)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    except ConnectionError:
+        return jsonify({'error': 'Database connection failed'}), 500
     except Error as e:
         return jsonify({'error': f'Database error: {str(e)}'}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 @app.route('/api/users/<int:user_id>', methods=['GET'])
 @token_required
@@ -279,8 +874,15 @@ def get_user(user_id):
         conn.close()
 
 @app.route('/api/users', methods=['POST'])
+@limiter.limit('auth', AUTH_LIMIT)
 def create_user():
     data = request.json
+    try:
+        # Hash before borrowing a connection; the KDF is the slow part
+        password_hash = password_hasher.hash(data['password'])
+    except HasherBusy:
+        return busy_response('Too many registrations in progress, please retry')
+    
     conn = get_db_connection()
     if not conn:
         return jsonify({'error': 'Database connection failed'}), 500
@@ -293,16 +895,15 @@ def create_user():
         if existing:
             return jsonify({'error': 'Email already registered'}), 400
 
-        # PLAINTEXT PASSWORD - NO HASHING
-        password_hash = data['password']  # ← LANGSUNG SIMPAN PLAINTEXT
-        
         cursor.execute(
             'INSERT INTO users (username, email, password_hash, role, phone) VALUES (%s, %s, %s, %s, %s)',
             (data['username'], data['email'], password_hash, data.get('role', 'user'), 
              data.get('phone'))
         )
-        conn.commit()
         user_id = cursor.lastrowid
+        stats.bump(cursor, total_users=1)
+        changes.bump(cursor, 'users')
+        conn.commit()
         
         return jsonify({
             'id': user_id, 
@@ -318,25 +919,67 @@ def create_user():
         cursor.close()
         conn.close()
 
-# Concert endpoints
-@app.route('/api/concerts', methods=['GET'])
-def get_concerts():
+# Concert catalog cache - read constantly, written rarely
+concert_cache = VersionedCache(
+    ttl=int(os.getenv('CONCERT_CACHE_TTL', 30)),
+    stale_ttl=int(os.getenv('CONCERT_CACHE_STALE_TTL', 300))
+)
+changes.on_change('concerts', concert_cache.invalidate)
+
+def load_concerts():
+    """Read the full concert catalog (raises on failure).
+
+    Returns ``(concerts, validators)``; the validators are taken before the
+    query so a cached catalog never carries a newer ETag than its rows.
+    """
+    validators = changes.validators(('concerts',))
     conn = get_db_connection()
     if not conn:
-        return jsonify({'error': 'Database connection failed'}), 500
+        raise ConnectionError('Database connection failed')
         
-    cursor = conn.cursor(dictionary=True)
+    cursor = conn.cursor()
     try:
-        cursor.execute('SELECT * FROM concerts')
-        concerts = cursor.fetchall()
-        return jsonify(concerts)
-    except Error as e:
-        # Return empty array if concerts table doesn't exist yet
-        return jsonify([])
+        cursor.execute(f'SELECT {CONCERT_COLUMNS} FROM concerts')
+        return list(map(Concert.from_row, cursor.fetchall())), validators
     finally:
         cursor.close()
         conn.close()
 
+@conditional('concerts')
+def get_concert_page():
+    """Filtered / paginated listing, straight from an indexed query"""
+    try:
+        limit = page_limit(request.args)
+        sql, params = build_concert_query(request.args)
+        return list_response(sql, params, limit, Concert,
+                             lambda concert: [concert.date, concert.id])
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    except (Error, ConnectionError):
+        # Never an empty 200: conditional() would give it validators
+        return jsonify({'error': 'Database connection failed'}), 503
+
+# Concert endpoints
+@app.route('/api/concerts', methods=['GET'])
+def get_concerts():
+    if request.args:
+        return get_concert_page()
+
+    # Picks up a pending local write first (its on_change drops the cached copy)
+    changes.version('concerts')
+    try:
+        (concerts, validators), version = concert_cache.get('catalog', load_concerts)
+    except (Error, ConnectionError):
+        # A failure the gateway can tell apart, so it keeps serving its stale copy
+        return jsonify({'error': 'Database connection failed'}), 503
+    
+    if validators is not None and not_modified(*validators):
+        return with_validators(Response(status=304), validators)
+    # Encoded batch by batch from the cached rows, never as one big buffer
+    response = Response(iter_json_array(_batched(concerts)), mimetype='application/json')
+    response.headers['X-Catalog-Version'] = str(version)
+    return with_validators(response, validators) if validators is not None else response
+
 # Add sample concerts if needed
 @app.route('/api/init-concerts', methods=['POST'])
 def init_concerts():
@@ -357,7 +1000,10 @@ def init_concerts():
             'INSERT INTO concerts (name, artist, date, venue, price, available_tickets) VALUES (%s, %s, %s, %s, %s, %s)',
             concerts
         )
+        stats.bump(cursor, total_concerts=len(concerts))
+        changes.bump(cursor, 'concerts')
         conn.commit()
+        concert_cache.invalidate()
         return jsonify({'message': 'Sample concerts added successfully'})
     except Error as e:
         conn.rollback()
@@ -366,66 +1012,772 @@ def init_concerts():
         cursor.close()
         conn.close()
 
-# Admin endpoints
-@app.route('/api/admin/users', methods=['GET'])
+# ==========================
+#   TRANSACTIONS
+# ==========================
+
+TRANSACTION_COLUMNS = ', '.join(Transaction.FIELDS)
+TRANSACTION_INSERT = (
+    'INSERT INTO transactions (transaction_id, user_id, username, event_id, event_name, '
+    'amount, payment_method, status, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)'
+)
+TRANSACTION_WRITE_TIMEOUT = float(os.getenv('TRANSACTION_WRITE_TIMEOUT', 5))
+TRANSACTION_WRITE_RETRIES = int(os.getenv('TRANSACTION_WRITE_RETRIES', 3))
+
+def new_transaction(hold, event_name, price, payment_method=None):
+    """Transaction row for a confirmed hold; the hold id doubles as transaction id"""
+    return {
+        'transaction_id': hold['hold_id'],
+        'user_id': hold['user_id'],
+        'event_id': hold['concert_id'],
+        'event_name': event_name,
+        'quantity': hold['quantity'],
+        'amount': hold['quantity'] * price,
+        'payment_method': payment_method,
+        'status': 'completed',
+        'created_at': datetime.now()
+    }
+
+def insert_transactions(cursor, rows):
+    """Insert transaction rows and roll them up, inside the caller's database transaction"""
+    user_ids = sorted({row['user_id'] for row in rows})
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    cursor.execute(f'SELECT id, username FROM users WHERE id IN ({placeholders})', tuple(user_ids))
+    usernames = dict(cursor.fetchall())
+    cursor.executemany(TRANSACTION_INSERT, [
+        (row['transaction_id'], row['user_id'], usernames.get(row['user_id']), row['event_id'],
+         row['event_name'], row['amount'], row['payment_method'], row['status'], row['created_at'])
+        for row in rows
+    ])
+    sales.record(cursor, rows)
+    changes.bump(cursor, 'transactions')
+
+def write_transactions(rows):
+    """Commit a batch of transaction rows at once (the group-commit write path)"""
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError('Database connection failed')
+    cursor = conn.cursor()
+    try:
+        insert_transactions(cursor, rows)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+# Checkouts queue their transaction rows here; one thread commits whatever
+# piled up during the previous commit, so N buyers cost one log flush
+transaction_writer = GroupCommitWriter(
+    write_transactions,
+    max_batch=int(os.getenv('GROUP_COMMIT_MAX_BATCH', 500)),
+    max_wait=float(os.getenv('GROUP_COMMIT_MAX_WAIT_MS', 2)) / 1000,
+    max_pending=int(os.getenv('GROUP_COMMIT_MAX_PENDING', 10000)),
+    name='transaction-writer'
+)
+
+# Rows a checkout could not write even after retrying; the hold sweeper
+# keeps trying them so a sale record is never dropped
+unrecorded_transactions = deque()
+
+def _write_transaction(row):
+    """Commit one row on its own; a duplicate means an earlier attempt got through"""
+    try:
+        write_transactions([row])
+    except IntegrityError:
+        pass
+
+def record_transaction(row):
+    """Durably record a completed checkout; True once the row is committed.
+
+    Call it after giving the request's pooled connection back, since the
+    writer needs a connection of its own. Seats and the hold are already
+    committed by then, so a row that still cannot be written after
+    TRANSACTION_WRITE_RETRIES tries is queued for the hold sweeper and
+    False is returned for the caller to report.
+    """
+    try:
+        transaction_writer.write(row, timeout=TRANSACTION_WRITE_TIMEOUT)
+        return True
+    except WriterBusy:
+        pass  # Queue full: pay for a commit of our own rather than drop the row
+    except Exception as e:
+        log.warning("Group commit of transaction failed, retrying on its own",
+                    transaction_id=row['transaction_id'], error=str(e))
+
+    error = None
+    for attempt in range(TRANSACTION_WRITE_RETRIES):
+        try:
+            _write_transaction(row)
+            return True
+        except Exception as e:
+            error = e
+            time.sleep(0.05 * 2 ** attempt)
+    unrecorded_transactions.append(row)
+    log.error("Recording transaction failed, queued for retry",
+              transaction_id=row['transaction_id'], error=str(error),
+              queued=len(unrecorded_transactions))
+    return False
+
+def retry_unrecorded_transactions():
+    """Write queued transaction rows, oldest first; stops at the first failure"""
+    written = 0
+    while unrecorded_transactions:
+        row = unrecorded_transactions[0]
+        try:
+            _write_transaction(row)
+        except Exception as e:
+            log.warning("Transaction retry failed", transaction_id=row['transaction_id'],
+                        error=str(e), queued=len(unrecorded_transactions))
+            break
+        unrecorded_transactions.popleft()
+        written += 1
+    if written:
+        log.info("Recorded queued transactions", rows=written)
+    return written
+
+def purchase_response(body, status, transaction):
+    """Record a checkout's transaction row and report it if it is still pending"""
+    if transaction is not None and not record_transaction(transaction):
+        # The seats are sold; only the receipt is late
+        return jsonify(dict(body, transaction_pending=True)), 202
+    return jsonify(body), status
+
+def build_transaction_query(args):
+    """SELECT for a page of transactions, newest first.
+
+    Ordered by (created_at, id); with a status filter the page is a range
+    scan of idx_transactions_status_created, without one of
+    idx_transactions_created.
+    """
+    where, params = [], []
+    if args.get('status'):
+        where.append('status = %s')
+        params.append(args['status'])
+    user_id = _number_arg(args, 'user_id')
+    if user_id is not None:
+        where.append('user_id = %s')
+        params.append(user_id)
+    if args.get('created_from'):
+        where.append('created_at >= %s')
+        params.append(args['created_from'])
+    if args.get('created_to'):
+        where.append('created_at < %s')
+        params.append(args['created_to'])
+
+    after = args.get('after')
+    if after:
+        key = decode_cursor(after)
+        if not isinstance(key, list) or len(key) != 2:
+            raise QueryError('Invalid cursor')
+        where.append('(created_at < %s OR (created_at = %s AND id < %s))')
+        params.extend([key[0], key[0], key[1]])
+
+    sql = f'SELECT {TRANSACTION_COLUMNS} FROM transactions'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += ' ORDER BY created_at DESC, id DESC LIMIT %s'
+    return sql, params
+
+@app.route('/api/admin/transactions', methods=['GET'])
 @token_required
-def get_all_users():
-    """Get all users for admin panel"""
+@admin_required
+@conditional('transactions', private=True)
+def get_transactions():
+    """Completed checkouts for the admin panel (newest first, keyset paginated)"""
+    try:
+        limit = page_limit(request.args)
+        sql, params = build_transaction_query(request.args)
+        return list_response(sql, params, limit, Transaction,
+                             lambda tx: _timestamp_key(tx.created_at, tx.id))
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    except ConnectionError:
+        return jsonify({'error': 'Database connection failed'}), 500
+    except Error as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+
+# ==========================
+#   SALES ANALYTICS
+# ==========================
+
+ANALYTICS_DEFAULT_DAYS = int(os.getenv('ANALYTICS_DEFAULT_DAYS', 30))
+ANALYTICS_MAX_DAYS = int(os.getenv('ANALYTICS_MAX_DAYS', 366))
+
+def _date_arg(args, name, default):
+    value = args.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise QueryError(f'{name} must be a date (YYYY-MM-DD)')
+
+def analytics_range(args):
+    date_to = _date_arg(args, 'to', date.today())
+    date_from = _date_arg(args, 'from', date_to - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1))
+    if date_from > date_to:
+        raise QueryError('from must not be after to')
+    if (date_to - date_from).days >= ANALYTICS_MAX_DAYS:
+        raise QueryError(f'Date range must be at most {ANALYTICS_MAX_DAYS} days')
+    return date_from, date_to
+
+def _sales_totals(tickets=0, revenue=0, transactions=0):
+    return {'tickets': tickets, 'revenue': revenue, 'transactions': transactions}
+
+def _add_sales(totals, tickets, revenue, count):
+    totals['tickets'] += tickets
+    totals['revenue'] += revenue
+    totals['transactions'] += count
+
+@app.route('/api/admin/analytics/sales', methods=['GET'])
+@token_required
+@admin_required
+@conditional('transactions', extra=lambda: (date.today().toordinal(),), private=True)
+def get_sales_analytics():
+    """Tickets sold and revenue per day and per concert, from the sales_daily rollup.
+
+    Reads about one row per concert per day in the range, never the
+    transactions themselves. ``days`` covers every day of the range (zero
+    when nothing sold); each concert's ``daily`` lists its days with sales.
+    """
+    try:
+        date_from, date_to = analytics_range(request.args)
+        concert_id = _number_arg(request.args, 'concert_id')
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+
     conn = get_db_connection()
     if not conn:
         return jsonify({'error': 'Database connection failed'}), 500
-        
+    cursor = conn.cursor()
+    try:
+        rows = sales.query(cursor, date_from, date_to, concert_id)
+        concert_ids = sorted({row[1] for row in rows})
+        names = {}
+        if concert_ids:
+            placeholders = ', '.join(['%s'] * len(concert_ids))
+            cursor.execute(f'SELECT id, name FROM concerts WHERE id IN ({placeholders})',
+                           tuple(concert_ids))
+            names = dict(cursor.fetchall())
+    except Error as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+    days = {date_from + timedelta(days=i): _sales_totals()
+            for i in range((date_to - date_from).days + 1)}
+    concerts = {cid: dict(_sales_totals(), concert_id=cid, name=names.get(cid), daily=[])
+                for cid in concert_ids}
+    totals = _sales_totals()
+    for day, cid, tickets, revenue, count in rows:
+        _add_sales(days[day], tickets, revenue, count)
+        _add_sales(concerts[cid], tickets, revenue, count)
+        _add_sales(totals, tickets, revenue, count)
+        concerts[cid]['daily'].append(dict(_sales_totals(tickets, revenue, count),
+                                           date=day.isoformat()))
+    return jsonify({
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'totals': totals,
+        'days': [dict(values, date=day.isoformat()) for day, values in days.items()],
+        'concerts': list(concerts.values())
+    })
+
+# ==========================
+#   TICKET PURCHASE ENGINE
+# ==========================
+
+HOLD_TTL_SECONDS = int(os.getenv('HOLD_TTL_SECONDS', 600))
+HOLD_SWEEP_INTERVAL = int(os.getenv('HOLD_SWEEP_INTERVAL', 15))
+MAX_TICKETS_PER_ORDER = int(os.getenv('MAX_TICKETS_PER_ORDER', 10))
+
+HOLD_COLUMNS = 'hold_id, concert_id, user_id, quantity, status, expires_at, created_at'
+
+class PurchaseError(Exception):
+    """Business error raised by the purchase engine, carries an HTTP status"""
+    def __init__(self, message, status=409):
+        super().__init__(message)
+        self.status = status
+
+def _find_hold_by_key(cursor, user_id, idempotency_key):
+    cursor.execute(
+        f'SELECT {HOLD_COLUMNS} FROM ticket_holds WHERE user_id = %s AND idempotency_key = %s',
+        (user_id, idempotency_key)
+    )
+    return cursor.fetchone()
+
+def reserve_tickets(conn, concert_id, user_id, quantity, idempotency_key=None, confirm=False,
+                    payment_method=None):
+    """Atomically take seats from a concert and record a hold (or a purchase).
+
+    The decrement is a single conditional UPDATE, so concurrent buyers can
+    never drive available_tickets below zero. Replaying the same
+    idempotency key returns the original hold instead of booking again.
+    Returns ``(hold, replayed, transaction)``; for a new purchase
+    ``transaction`` is the row to hand to record_transaction() once the
+    connection is released, otherwise None.
+    """
+    if not isinstance(quantity, int) or not 1 <= quantity <= MAX_TICKETS_PER_ORDER:
+        raise PurchaseError(f'Quantity must be between 1 and {MAX_TICKETS_PER_ORDER}', 400)
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        if idempotency_key:
+            existing = _find_hold_by_key(cursor, user_id, idempotency_key)
+            if existing:
+                return existing, True, None
+
+        cursor.execute(
+            'UPDATE concerts SET available_tickets = available_tickets - %s '
+            'WHERE id = %s AND available_tickets >= %s',
+            (quantity, concert_id, quantity)
+        )
+        if cursor.rowcount != 1:
+            conn.rollback()
+            cursor.execute('SELECT available_tickets FROM concerts WHERE id = %s', (concert_id,))
+            concert = cursor.fetchone()
+            if not concert:
+                raise PurchaseError('Concert not found', 404)
+            raise PurchaseError('Not enough tickets available', 409)
+
+        cursor.execute('SELECT name, price FROM concerts WHERE id = %s', (concert_id,))
+        concert = cursor.fetchone()
+        price = concert['price']
+
+        now = datetime.now()
+        hold = {
+            'hold_id': uuid.uuid4().hex,
+            'concert_id': concert_id,
+            'user_id': user_id,
+            'quantity': quantity,
+            'status': 'confirmed' if confirm else 'held',
+            'expires_at': now + timedelta(seconds=HOLD_TTL_SECONDS),
+            'created_at': now
+        }
+        try:
+            cursor.execute(
+                'INSERT INTO ticket_holds (hold_id, concert_id, user_id, quantity, status, '
+                'idempotency_key, expires_at, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+                (hold['hold_id'], concert_id, user_id, quantity, hold['status'],
+                 idempotency_key, hold['expires_at'], hold['created_at'])
+            )
+        except IntegrityError:
+            # A concurrent retry with the same key won; undo our decrement
+            conn.rollback()
+            existing = _find_hold_by_key(cursor, user_id, idempotency_key)
+            if existing:
+                return existing, True, None
+            raise
+
+        if confirm:
+            stats.bump(cursor, total_tickets_sold=quantity, total_revenue=quantity * price)
+        else:
+            stats.bump(cursor, pending_transactions=1)
+        changes.bump(cursor, 'concerts', 'ticket_holds')
+        conn.commit()
+        transaction = new_transaction(hold, concert['name'], price, payment_method) if confirm else None
+        return hold, False, transaction
+    finally:
+        cursor.close()
+
+def _return_hold(cursor, hold, new_status):
+    """Move a held hold to a final state and give its seats back, exactly once"""
+    cursor.execute(
+        'UPDATE ticket_holds SET status = %s WHERE hold_id = %s AND status = %s',
+        (new_status, hold['hold_id'], 'held')
+    )
+    if cursor.rowcount != 1:
+        return False
+    cursor.execute(
+        'UPDATE concerts SET available_tickets = available_tickets + %s WHERE id = %s',
+        (hold['quantity'], hold['concert_id'])
+    )
+    stats.bump(cursor, pending_transactions=-1)
+    changes.bump(cursor, 'concerts', 'ticket_holds')
+    return True
+
+def confirm_hold(conn, hold_id, user_id, payment_method=None):
+    """Turn an unexpired hold into a purchase.
+
+    Returns ``(hold, transaction)``; ``transaction`` is the row to record
+    once the connection is released, or None if the hold was already
+    confirmed.
+    """
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            'UPDATE ticket_holds SET status = %s '
+            'WHERE hold_id = %s AND user_id = %s AND status = %s AND expires_at > %s',
+            ('confirmed', hold_id, user_id, 'held', datetime.now())
+        )
+        confirmed = cursor.rowcount == 1
+        if confirmed:
+            cursor.execute(
+                'SELECT h.quantity, c.name, c.price FROM ticket_holds h '
+                'JOIN concerts c ON c.id = h.concert_id WHERE h.hold_id = %s',
+                (hold_id,)
+            )
+            sale = cursor.fetchone()
+            stats.bump(cursor, total_tickets_sold=sale['quantity'],
+                       total_revenue=sale['quantity'] * sale['price'],
+                       pending_transactions=-1)
+            changes.bump(cursor, 'ticket_holds')
+        conn.commit()
+
+        cursor.execute(
+            f'SELECT {HOLD_COLUMNS} FROM ticket_holds WHERE hold_id = %s AND user_id = %s',
+            (hold_id, user_id)
+        )
+        hold = cursor.fetchone()
+        if not hold:
+            raise PurchaseError('Hold not found', 404)
+        if not confirmed and hold['status'] != 'confirmed':
+            status = 'expired' if hold['status'] == 'held' else hold['status']
+            raise PurchaseError(f'Hold is {status}', 410)
+        if confirmed:
+            return hold, new_transaction(hold, sale['name'], sale['price'], payment_method)
+        return hold, None
+    finally:
+        cursor.close()
+
+def release_hold(conn, hold_id, user_id):
+    """Cancel a hold and return its seats"""
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute(
-            'SELECT id, username, email, role, phone, join_date FROM users ORDER BY join_date DESC'
+            f'SELECT {HOLD_COLUMNS} FROM ticket_holds WHERE hold_id = %s AND user_id = %s',
+            (hold_id, user_id)
         )
-        users = cursor.fetchall()
-        return jsonify(users)
+        hold = cursor.fetchone()
+        if not hold:
+            raise PurchaseError('Hold not found', 404)
+        if not _return_hold(cursor, hold, 'released'):
+            conn.rollback()
+            raise PurchaseError(f"Hold is already {hold['status']}", 409)
+        conn.commit()
+        hold['status'] = 'released'
+        return hold
+    finally:
+        cursor.close()
+
+def release_expired_holds(conn, limit=500):
+    """Expire overdue holds and give their seats back; returns seats released"""
+    cursor = conn.cursor(dictionary=True)
+    released = 0
+    try:
+        cursor.execute(
+            'SELECT hold_id, concert_id, quantity FROM ticket_holds '
+            'WHERE status = %s AND expires_at <= %s LIMIT %s',
+            ('held', datetime.now(), limit)
+        )
+        for hold in cursor.fetchall():
+            if _return_hold(cursor, hold, 'expired'):
+                released += hold['quantity']
+        conn.commit()
+        return released
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def _hold_sweeper():
+    """Background loop that returns seats from expired holds and retries
+    transaction rows checkouts could not record"""
+    while True:
+        time.sleep(HOLD_SWEEP_INTERVAL)
+        retry_unrecorded_transactions()
+        conn = get_db_connection()
+        if not conn:
+            continue
+        try:
+            released = release_expired_holds(conn)
+            if released:
+                log.info("Released seats from expired holds", seats=released)
+        except Error as e:
+            log.error("Hold sweeper error", error=str(e))
+        finally:
+            conn.close()
+
+# In-memory inventory (INVENTORY_MODE=memory): holds live in this process and
+# confirmed sales are written behind to MySQL in batches. Single worker only.
+INVENTORY_MODE = os.getenv('INVENTORY_MODE', 'sql')
+
+def load_inventory_counts(concert_ids=None):
+    """Remaining seats per concert, as persisted in MySQL"""
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError('Database connection failed')
+    cursor = conn.cursor()
+    try:
+        if concert_ids is None:
+            cursor.execute('SELECT id, available_tickets FROM concerts')
+        else:
+            placeholders = ', '.join(['%s'] * len(concert_ids))
+            cursor.execute(
+                f'SELECT id, available_tickets FROM concerts WHERE id IN ({placeholders})',
+                tuple(concert_ids)
+            )
+        return {concert_id: available for concert_id, available in cursor.fetchall()}
+    finally:
+        cursor.close()
+        conn.close()
+
+def _write_sales(cursor, batch):
+    totals = {}
+    for sale in batch:
+        totals[sale['concert_id']] = totals.get(sale['concert_id'], 0) + sale['quantity']
+    placeholders = ', '.join(['%s'] * len(totals))
+    cursor.execute(
+        f'SELECT id, name, price FROM concerts WHERE id IN ({placeholders})', tuple(totals)
+    )
+    concerts = {concert_id: (name, price) for concert_id, name, price in cursor.fetchall()}
+    prices = {concert_id: price for concert_id, (_, price) in concerts.items()}
+    stats.bump(
+        cursor,
+        total_tickets_sold=sum(totals.values()),
+        total_revenue=sum(quantity * prices.get(concert_id, 0)
+                          for concert_id, quantity in totals.items())
+    )
+    cursor.executemany(
+        'UPDATE concerts SET available_tickets = available_tickets - %s WHERE id = %s',
+        [(quantity, concert_id) for concert_id, quantity in totals.items()]
+    )
+    changes.bump(cursor, 'concerts', 'ticket_holds')
+    cursor.executemany(
+        'INSERT INTO ticket_holds (hold_id, concert_id, user_id, quantity, status, '
+        'idempotency_key, expires_at, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+        [(sale['hold_id'], sale['concert_id'], sale['user_id'], sale['quantity'], 'confirmed',
+          sale['idempotency_key'], sale['expires_at'], sale['created_at']) for sale in batch]
+    )
+    insert_transactions(cursor, [
+        new_transaction(sale, *concerts.get(sale['concert_id'], (None, 0))) for sale in batch
+    ])
+
+def _persisted_hold_id(cursor, sale):
+    """hold_id of the ticket_holds row that clashes with ``sale``, if any"""
+    cursor.execute('SELECT hold_id FROM ticket_holds WHERE hold_id = %s', (sale['hold_id'],))
+    if cursor.fetchone():
+        return sale['hold_id']
+    if sale['idempotency_key']:
+        cursor.execute(
+            'SELECT hold_id FROM ticket_holds WHERE user_id = %s AND idempotency_key = %s',
+            (sale['user_id'], sale['idempotency_key'])
+        )
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+    return None
+
+def flush_sales(batch, settled):
+    """Persist a batch of confirmed in-memory sales in one transaction.
+
+    Every sale that is committed, or found already in the database, is
+    appended to ``settled`` as soon as that is known, so the caller can
+    re-queue just the remainder if this raises part way through.
+    """
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError('Database connection failed')
+    cursor = conn.cursor()
+    try:
+        try:
+            _write_sales(cursor, batch)
+            conn.commit()
+            settled.extend(batch)
+            return
+        except IntegrityError:
+            conn.rollback()
+
+        # An idempotency key was already persisted (e.g. replay after a
+        # restart); write one by one and hand duplicates' seats back
+        for sale in batch:
+            try:
+                _write_sales(cursor, [sale])
+                conn.commit()
+            except IntegrityError:
+                conn.rollback()
+                existing = _persisted_hold_id(cursor, sale)
+                if existing is None:
+                    raise
+                if existing != sale['hold_id']:
+                    # Another sale owns the key: these seats were never sold
+                    inventory.restock(sale['concert_id'], sale['quantity'])
+                    log.info("Dropped duplicate sale", hold_id=sale['hold_id'], existing=existing)
+            settled.append(sale)
+    finally:
+        cursor.close()
+        conn.close()
+
+inventory = None
+if INVENTORY_MODE == 'memory':
+    inventory = InventoryManager(
+        load_inventory_counts,
+        flush_sales,
+        shards=int(os.getenv('INVENTORY_SHARDS', 8)),
+        hold_ttl=HOLD_TTL_SECONDS,
+        flush_interval=float(os.getenv('INVENTORY_FLUSH_INTERVAL', 0.2))
+    )
+
+def _serialize_hold(hold):
+    return {
+        'hold_id': hold['hold_id'],
+        'concert_id': hold['concert_id'],
+        'quantity': hold['quantity'],
+        'status': hold['status'],
+        'expires_at': hold['expires_at'].isoformat() if hold['status'] == 'held' else None,
+        'created_at': hold['created_at'].isoformat()
+    }
+
+def _reserve_request(concert_id, confirm):
+    data = request.get_json(silent=True) or {}
+    idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+    quantity = data.get('quantity', 1)
+    payment_method = data.get('payment_method')
+
+    if inventory is not None:
+        if not isinstance(quantity, int) or not 1 <= quantity <= MAX_TICKETS_PER_ORDER:
+            return jsonify({'error': f'Quantity must be between 1 and {MAX_TICKETS_PER_ORDER}'}), 400
+        try:
+            hold, replayed = inventory.hold(
+                concert_id, request.user_id, quantity, idempotency_key, confirm=confirm
+            )
+        except InventoryError as e:
+            return jsonify({'error': str(e)}), e.status
+        except (Error, ConnectionError):
+            return jsonify({'error': 'Database connection failed'}), 503
+        return jsonify(_serialize_hold(hold)), 200 if replayed else 201
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 503
+    try:
+        try:
+            hold, replayed, transaction = reserve_tickets(
+                conn, concert_id, request.user_id, quantity, idempotency_key, confirm=confirm,
+                payment_method=payment_method
+            )
+        except PurchaseError as e:
+            if e.status != 409:
+                raise
+            # Sold out - reclaim expired holds once before turning the buyer away
+            if not release_expired_holds(conn):
+                raise
+            hold, replayed, transaction = reserve_tickets(
+                conn, concert_id, request.user_id, quantity, idempotency_key, confirm=confirm,
+                payment_method=payment_method
+            )
+    except PurchaseError as e:
+        return jsonify({'error': str(e)}), e.status
     except Error as e:
+        conn.rollback()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
     finally:
-        cursor.close()
         conn.close()
+    return purchase_response(_serialize_hold(hold), 200 if replayed else 201, transaction)
 
-@app.route('/api/admin/stats', methods=['GET'])
+@app.route('/api/concerts/<int:concert_id>/holds', methods=['POST'])
+@limiter.limit('checkout', CHECKOUT_LIMIT)
 @token_required
-def get_admin_stats():
-    """Get admin dashboard statistics"""
+def create_hold(concert_id):
+    """Reserve seats for HOLD_TTL_SECONDS"""
+    return _reserve_request(concert_id, confirm=False)
+
+@app.route('/api/concerts/<int:concert_id>/purchase', methods=['POST'])
+@limiter.limit('checkout', CHECKOUT_LIMIT)
+@token_required
+def purchase_tickets(concert_id):
+    """Reserve and confirm seats in one step"""
+    return _reserve_request(concert_id, confirm=True)
+
+@app.route('/api/holds/<hold_id>/confirm', methods=['POST'])
+@limiter.limit('checkout', CHECKOUT_LIMIT)
+@token_required
+def confirm_hold_endpoint(hold_id):
+    """Confirm a hold before it expires"""
+    if inventory is not None:
+        try:
+            return jsonify(_serialize_hold(inventory.confirm(hold_id, request.user_id)))
+        except InventoryError as e:
+            return jsonify({'error': str(e)}), e.status
+
     conn = get_db_connection()
     if not conn:
-        return jsonify({'error': 'Database connection failed'}), 500
-        
-    cursor = conn.cursor()
+        return jsonify({'error': 'Database connection failed'}), 503
     try:
-        # Total users count
-        cursor.execute('SELECT COUNT(*) FROM users')
-        total_users = cursor.fetchone()[0]
-        
-        # Total concerts count
-        cursor.execute('SELECT COUNT(*) FROM concerts')
-        total_concerts = cursor.fetchone()[0]
-        
-        # Recent users (last 7 days)
-        cursor.execute('SELECT COUNT(*) FROM users WHERE join_date >= DATE_SUB(NOW(), INTERVAL 7 DAY)')
-        recent_users = cursor.fetchone()[0]
-        
-        return jsonify({
-            'total_users': total_users,
-            'total_concerts': total_concerts,
-            'recent_users': recent_users,
-            'total_tickets_sold': 1200,  # Placeholder
-            'total_revenue': 850000000,  # Placeholder
-            'pending_transactions': 20   # Placeholder
-        })
+        payment_method = (request.get_json(silent=True) or {}).get('payment_method')
+        hold, transaction = confirm_hold(conn, hold_id, request.user_id, payment_method)
+    except PurchaseError as e:
+        return jsonify({'error': str(e)}), e.status
     except Error as e:
+        conn.rollback()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
     finally:
-        cursor.close()
         conn.close()
+    return purchase_response(_serialize_hold(hold), 200, transaction)
+
+@app.route('/api/holds/<hold_id>', methods=['DELETE'])
+@token_required
+def release_hold_endpoint(hold_id):
+    """Cancel a hold and return its seats"""
+    if inventory is not None:
+        try:
+            return jsonify(_serialize_hold(inventory.release(hold_id, request.user_id)))
+        except InventoryError as e:
+            return jsonify({'error': str(e)}), e.status
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 503
+    try:
+        return jsonify(_serialize_hold(release_hold(conn, hold_id, request.user_id)))
+    except PurchaseError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Error as e:
+        conn.rollback()
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+    finally:
+        conn.close()
+
+# Admin endpoints
+@app.route('/api/admin/users', methods=['GET'])
+@token_required
+@admin_required
+@conditional('users', private=True)
+def get_all_users():
+    """Get all users for admin panel (newest first, keyset paginated)"""
+    try:
+        limit = page_limit(request.args)
+        sql, params = build_user_query(request.args, newest_first=True)
+        return list_response(sql, params, limit, User, _join_date_key)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    except ConnectionError:
+        return jsonify({'error': 'Database connection failed'}), 500
+    except Error as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+
+@app.route('/api/admin/stats', methods=['GET'])
+@token_required
+@admin_required
+@conditional('users', 'concerts', 'ticket_holds',
+             extra=lambda: (stats.recent_users or 0,), private=True)
+def get_admin_stats():
+    """Get admin dashboard statistics from the precomputed counters"""
+    try:
+        return jsonify(stats.snapshot())
+    except ConnectionError:
+        return jsonify({'error': 'Database connection failed'}), 500
+    except Error as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
 
 @app.route('/api/admin/users/<int:user_id>', methods=['PUT'])
 @token_required
+@admin_required
 def update_user_role(user_id):
     """Update user role (admin/user)"""
     data = request.json
@@ -444,7 +1796,10 @@ def update_user_role(user_id):
             'UPDATE users SET role = %s WHERE id = %s',
             (new_role, user_id)
         )
+        if cursor.rowcount:
+            changes.bump(cursor, 'users')
         conn.commit()
+        token_cache.revoke_user(user_id)
         return jsonify({'message': f'User role updated to {new_role}'})
     except Error as e:
         conn.rollback()
@@ -455,6 +1810,7 @@ def update_user_role(user_id):
 
 @app.route('/api/admin/users/<int:user_id>', methods=['DELETE'])
 @token_required
+@admin_required
 def delete_user(user_id):
     """Delete user (admin only)"""
     conn = get_db_connection()
@@ -464,7 +1820,11 @@ def delete_user(user_id):
     cursor = conn.cursor()
     try:
         cursor.execute('DELETE FROM users WHERE id = %s', (user_id,))
+        if cursor.rowcount:
+            stats.bump(cursor, total_users=-1)
+            changes.bump(cursor, 'users')
         conn.commit()
+        token_cache.revoke_user(user_id)
         return jsonify({'message': 'User deleted successfully'})
     except Error as e:
         conn.rollback()
@@ -473,10 +1833,361 @@ def delete_user(user_id):
         cursor.close()
         conn.close()
 
+# ==========================
+#   BULK USER IMPORT / EXPORT
+# ==========================
+
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 500))
+IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', 1000))
+EXPORT_FETCH_SIZE = int(os.getenv('EXPORT_FETCH_SIZE', 1000))
+EXPORT_COLUMNS = ('id', 'username', 'email', 'role', 'phone', 'join_date')
+
+security = SecurityService()
+
+def _import_format(content_type):
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    return 'csv' if content_type in ('text/csv', 'application/csv') else 'ndjson'
+
+def read_import_rows(stream, fmt):
+    """Yield ``(line, row_or_None, error)`` from an NDJSON or CSV upload, lazily"""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError:
+            yield line, None, 'Invalid JSON'
+            continue
+        if not isinstance(row, dict):
+            yield line, None, 'Expected a JSON object'
+            continue
+        yield line, row, None
+
+def validate_import_row(row):
+    """Sanitized ``(username, email, password, role, phone)`` or raise ValueError"""
+    username = security.sanitize_input(str(row.get('username') or ''))
+    email = str(row.get('email') or '').strip().lower()
+    password = str(row.get('password') or '')
+    role = str(row.get('role') or 'user').strip()
+    phone = security.sanitize_input(str(row.get('phone') or '')) or None
+    if not username:
+        raise ValueError('username is required')
+    if not security.is_valid_email(email):
+        raise ValueError('Invalid email')
+    strong, message = security.is_password_strong(password)
+    if not strong:
+        raise ValueError(message)
+    if role not in ('admin', 'user'):
+        raise ValueError('Invalid role')
+    if phone and len(phone) > 20:
+        raise ValueError('phone is too long')
+    return username, email, password, role, phone
+
+USER_INSERT = ('INSERT INTO users (username, email, password_hash, role, phone) '
+               'VALUES (%s, %s, %s, %s, %s)')
+
+def import_user_batch(batch):
+    """Insert one batch of validated rows in one transaction.
+
+    ``batch`` is ``[(line, (username, email, password, role, phone))]``.
+    Emails already registered are reported, not inserted. Returns
+    ``(imported, errors)``.
+    """
+    errors = []
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError('Database connection failed')
+    cursor = conn.cursor()
+    try:
+        placeholders = ', '.join(['%s'] * len(batch))
+        cursor.execute(f'SELECT email FROM users WHERE email IN ({placeholders})',
+                       [fields[1] for _, fields in batch])
+        existing = {email for (email,) in cursor.fetchall()}
+        fresh = []
+        for line, fields in batch:
+            if fields[1] in existing:
+                errors.append({'line': line, 'email': fields[1], 'error': 'Email already registered'})
+            else:
+                fresh.append((line, fields))
+        if not fresh:
+            return 0, errors
+        conn.rollback()  # end the read snapshot; don't hold it while hashing
+
+        hashes = password_hasher.hash_many(fields[2] for _, fields in fresh)
+        rows = [(u, e, h, r, ph) for (_, (u, e, _p, r, ph)), h in zip(fresh, hashes)]
+        try:
+            cursor.executemany(USER_INSERT, rows)
+            stats.bump(cursor, total_users=len(rows))
+            changes.bump(cursor, 'users')
+            conn.commit()
+            return len(rows), errors
+        except IntegrityError:
+            conn.rollback()
+
+        # Someone registered one of these emails meanwhile: go row by row
+        imported = 0
+        for (line, fields), row in zip(fresh, rows):
+            try:
+                cursor.execute(USER_INSERT, row)
+                stats.bump(cursor, total_users=1)
+                changes.bump(cursor, 'users')
+                conn.commit()
+                imported += 1
+            except IntegrityError:
+                conn.rollback()
+                errors.append({'line': line, 'email': fields[1], 'error': 'Email already registered'})
+        return imported, errors
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+@app.route('/api/admin/users/import', methods=['POST'])
+@token_required
+@admin_required
+def import_users():
+    """Bulk-register users from an NDJSON (default) or CSV request body.
+
+    The body is read as a stream and committed in batches of
+    IMPORT_BATCH_SIZE, so a failure part way keeps the earlier batches.
+    The report lists per-line errors (up to IMPORT_MAX_ERRORS).
+    """
+    fmt = _import_format(request.content_type)
+    report = {'imported': 0, 'failed': 0, 'errors': [], 'batches': 0}
+    seen = set()
+    batch = []
+
+    def record(line, email, error):
+        report['failed'] += 1
+        if len(report['errors']) < IMPORT_MAX_ERRORS:
+            report['errors'].append({'line': line, 'email': email, 'error': error})
+
+    def flush():
+        imported, errors = import_user_batch(batch)
+        report['imported'] += imported
+        report['batches'] += 1
+        for error in errors:
+            record(error['line'], error['email'], error['error'])
+        batch.clear()
+
+    try:
+        for line, row, error in read_import_rows(request.stream, fmt):
+            if error:
+                record(line, None, error)
+                continue
+            try:
+                fields = validate_import_row(row)
+            except ValueError as e:
+                record(line, row.get('email'), str(e))
+                continue
+            if fields[1] in seen:
+                record(line, fields[1], 'Duplicate email in upload')
+                continue
+            seen.add(fields[1])
+            batch.append((line, fields))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        report['error'] = f'Unreadable upload: {e}'
+        return jsonify(report), 400
+    except HasherBusy:
+        report['error'] = 'Password hashing is overloaded, retry the remaining rows'
+        return jsonify(report), 503
+    except ConnectionError:
+        report['error'] = 'Database connection failed'
+        return jsonify(report), 500
+    except Error as e:
+        report['error'] = f'Database error: {str(e)}'
+        return jsonify(report), 500
+
+    if report['imported']:
+        stats.invalidate()
+    log.info("Bulk user import", imported=report['imported'], failed=report['failed'],
+             batches=report['batches'], format=fmt)
+    return jsonify(report), 200
+
+def _export_value(value):
+    return value.isoformat(sep=' ') if isinstance(value, datetime) else value
+
+def iter_user_export(fmt):
+    """Stream all users (without password hashes) in id order.
+
+    Rows come off an unbuffered cursor EXPORT_FETCH_SIZE at a time, so
+    memory stays flat however large the table is; the pooled connection
+    is held until the stream ends or the client goes away.
+    """
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError('Database connection failed')
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM users ORDER BY id")
+        if fmt == 'csv':
+            out = io.StringIO()
+            writer = csv.writer(out)
+            writer.writerow(EXPORT_COLUMNS)
+        while True:
+            rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+            if not rows:
+                break
+            if fmt == 'csv':
+                writer.writerows([_export_value(v) for v in row] for row in rows)
+                chunk = out.getvalue()
+                out.seek(0)
+                out.truncate()
+            else:
+                chunk = ''.join(
+                    json.dumps(dict(zip(EXPORT_COLUMNS, map(_export_value, row)))) + '\n'
+                    for row in rows
+                )
+            yield chunk.encode()
+        if fmt == 'csv' and out.tell():
+            yield out.getvalue().encode()
+    finally:
+        try:
+            cursor.close()
+        except Error:
+            pass  # rows left unread when the client hung up; the pool discards it
+        conn.close()
+
+@app.route('/api/admin/users/export', methods=['GET'])
+@token_required
+@admin_required
+def export_users():
+    """Stream every user as NDJSON (default) or CSV (?format=csv)"""
+    fmt = 'csv' if request.args.get('format') == 'csv' else 'ndjson'
+    stream = iter_user_export(fmt)
+    try:
+        first = next(stream, b'')  # surface connection errors as a status code
+    except ConnectionError:
+        return jsonify({'error': 'Database connection failed'}), 500
+    except Error as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = Response(itertools.chain([first], stream), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=users.{fmt}'
+    return response
+
+# ==========================
+#   STARTUP AND READINESS
+# ==========================
+
+ready = threading.Event()
+_start_lock = threading.Lock()
+_started = False
+READINESS_EXEMPT = {'liveness', 'readiness', 'health_check', 'metrics'}
+
+def startup():
+    """Wait for MySQL, initialize once, then start background workers"""
+    started = time.monotonic()
+    # Fork the hashing workers before more background threads exist
+    password_hasher.start()
+    atexit.register(password_hasher.shutdown)
+    wait_for_database()
+    while not init_database():
+        time.sleep(STARTUP_MAX_BACKOFF)
+    
+    stats.start()
+    changes.refresh()
+    changes.start()
+    transaction_writer.start()
+    sales.start()
+    atexit.register(transaction_writer.stop)
+    threading.Thread(target=_hold_sweeper, daemon=True, name='hold-sweeper').start()
+    if inventory is not None:
+        try:
+            log.info("In-memory inventory recovered", concerts=inventory.recover())
+        except (Error, ConnectionError) as e:
+            log.error("Inventory recovery failed, concerts will load on demand", error=str(e))
+        inventory.start()
+        atexit.register(inventory.stop)
+    
+    ready.set()
+    log.info("Database API ready", startup_s=round(time.monotonic() - started, 3))
+
+def start():
+    """Run startup() in a background thread, at most once per process"""
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=startup, daemon=True, name='startup').start()
+
+@app.before_request
+def reject_until_ready():
+    if not ready.is_set() and request.endpoint not in READINESS_EXEMPT:
+        response = jsonify({'error': 'Service is starting'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
+@app.route('/api/live', methods=['GET'])
+def liveness():
+    """Process is up and serving requests"""
+    return jsonify({'status': 'alive'})
+
+@app.route('/api/ready', methods=['GET'])
+def readiness():
+    """Startup finished and the database is reachable"""
+    if not ready.is_set():
+        return jsonify({'status': 'starting'}), 503
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'status': 'unavailable', 'pool': db_pool.stats()}), 503
+    conn.close()
+    return jsonify({'status': 'ready'})
+
+# ==========================
+#   METRICS
+# ==========================
+
+def collect_gauges():
+    """Point-in-time pool, cache and logging numbers for /metrics"""
+    gauges = [
+        ('db_pool_connections', 'Connection pool state',
+         {(('state', key),): value for key, value in db_pool.stats().items()}),
+        ('cache_events', 'Catalog and token cache counters',
+         {(('cache', name), ('event', key)): value
+          for name, cache in (('concerts', concert_cache), ('tokens', token_cache))
+          for key, value in cache.stats().items()}),
+        ('log_records_dropped', 'Log records dropped because the queue was full',
+         {(): DroppingQueueHandler.dropped}),
+        ('group_commit', 'Transaction group-commit writer counters',
+         {(('key', key),): value for key, value in transaction_writer.stats().items()}),
+        ('transactions_unrecorded', 'Completed checkouts whose transaction row awaits a retry',
+         {(): len(unrecorded_transactions)}),
+    ]
+    if inventory is not None:
+        gauges.append(('inventory', 'In-memory inventory counters',
+                       {(('key', key),): value for key, value in inventory.stats().items()}))
+    return gauges
+
+REGISTRY.add_collector(collect_gauges)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition"""
+    return metrics_response()
+
 if __name__ == '__main__':
-    print("🚀 Database API starting...")
-    print("📊 Database: MySQL")
-    print("🔐 Secret Key:", SECRET_KEY)
-    print("🏠 MySQL Host:", MYSQL_CONFIG['host'])
-    print("📁 MySQL Database:", MYSQL_CONFIG['database'])
-    app.run(debug=True, host='0.0.0.0', port=8000)
\ No newline at end of file
+    log.info("Database API starting", **storage.describe())
+    # The reloader's parent only watches files; its child process serves
+    if is_running_from_reloader():
+        start()
+    # HTTP/1.1 so the gateway's keep-alive session can reuse connections
+    WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+    app.run(debug=True, host='0.0.0.0', port=8000)
+else:
+    # Imported by a WSGI server (or the tests and benchmarks): this process serves
+    start()
\ No newline at end of file
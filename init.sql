@@ -10,7 +10,9 @@ CREATE TABLE IF NOT EXISTS users (
     password_hash TEXT NOT NULL,
     role VARCHAR(50) DEFAULT 'user',
     phone VARCHAR(20),
-    join_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    join_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_users_username (username),
+    INDEX idx_users_join_date (join_date)
 );
 
 -- Create concerts table
@@ -24,7 +26,68 @@ CREATE TABLE IF NOT EXISTS concerts (
     available_tickets INT NOT NULL
 );
 
--- Insert admin user dengan password plaintext
+-- Create ticket holds table (seat reservations and purchases)
+CREATE TABLE IF NOT EXISTS ticket_holds (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    hold_id VARCHAR(64) UNIQUE NOT NULL,
+    concert_id INT NOT NULL,
+    user_id INT NOT NULL,
+    quantity INT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'held',
+    idempotency_key VARCHAR(128),
+    expires_at DATETIME NOT NULL,
+    created_at DATETIME NOT NULL,
+    UNIQUE KEY uq_holds_idempotency (user_id, idempotency_key),
+    INDEX idx_holds_status_expires (status, expires_at)
+);
+
+-- Create stats counters table (sharded rows per statistic, seeded by the API)
+CREATE TABLE IF NOT EXISTS stats_counters (
+    name VARCHAR(64) NOT NULL,
+    shard INT NOT NULL,
+    value BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (name, shard)
+);
+
+-- Create table versions (sharded change counters behind ETag/Last-Modified, seeded by the API)
+CREATE TABLE IF NOT EXISTS table_versions (
+    name VARCHAR(64) NOT NULL,
+    shard INT NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (name, shard)
+);
+
+-- Create transactions table (one row per completed checkout, group-committed by the API)
+CREATE TABLE IF NOT EXISTS transactions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    transaction_id VARCHAR(64) UNIQUE NOT NULL,
+    user_id INT,
+    username VARCHAR(255),
+    event_id INT,
+    event_name VARCHAR(255),
+    amount BIGINT NOT NULL,
+    payment_method VARCHAR(50),
+    status VARCHAR(20) NOT NULL DEFAULT 'completed',
+    created_at DATETIME NOT NULL,
+    INDEX idx_transactions_status_created (status, created_at),
+    INDEX idx_transactions_created (created_at)
+);
+
+-- Create daily sales rollup (sharded rows per day and concert, maintained by the API)
+CREATE TABLE IF NOT EXISTS sales_daily (
+    day DATE NOT NULL,
+    concert_id INT NOT NULL,
+    shard INT NOT NULL,
+    tickets BIGINT NOT NULL DEFAULT 0,
+    revenue BIGINT NOT NULL DEFAULT 0,
+    transactions BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (day, concert_id, shard)
+);
+
+-- Insert admin user dengan password plaintext (di-rehash ke scrypt saat login pertama)
 INSERT IGNORE INTO users (username, email, password_hash, role) 
 VALUES ('System Admin', 'admin@guardiantix.com', 'admin123', 'admin');
 
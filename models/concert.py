@@ -1,4 +1,8 @@
 class Concert:
+    # Column order of the tuple rows from_row() accepts
+    FIELDS = ('id', 'name', 'artist', 'date', 'venue', 'price', 'available_tickets')
+    __slots__ = FIELDS
+
     def __init__(self, concert_data=None):
         if concert_data is None:
             concert_data = {}
@@ -8,4 +12,23 @@ class Concert:
         self.date = concert_data.get('date')
         self.venue = concert_data.get('venue')
         self.price = concert_data.get('price')
-        self.available_tickets = concert_data.get('available_tickets')
\ No newline at end of file
+        self.available_tickets = concert_data.get('available_tickets')
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a tuple row in FIELDS order, no intermediate dict"""
+        concert = cls.__new__(cls)
+        (concert.id, concert.name, concert.artist, concert.date, concert.venue,
+         concert.price, concert.available_tickets) = row
+        return concert
+
+    def to_record(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'artist': self.artist,
+            'date': self.date,
+            'venue': self.venue,
+            'price': self.price,
+            'available_tickets': self.available_tickets
+        }
@@ -1,2 +1,3 @@
 from .user import User
-from .concert import Concert
\ No newline at end of file
+from .concert import Concert
+from .transaction import Transaction
\ No newline at end of file
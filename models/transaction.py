@@ -0,0 +1,41 @@
+class Transaction:
+    # Column order of the tuple rows from_row() accepts
+    FIELDS = ('id', 'transaction_id', 'user_id', 'username', 'event_id', 'event_name',
+              'amount', 'payment_method', 'status', 'created_at')
+    __slots__ = FIELDS
+
+    def __init__(self, transaction_data=None):
+        if transaction_data is None:
+            transaction_data = {}
+        self.id = transaction_data.get('id')
+        self.transaction_id = transaction_data.get('transaction_id')
+        self.user_id = transaction_data.get('user_id')
+        self.username = transaction_data.get('username')
+        self.event_id = transaction_data.get('event_id')
+        self.event_name = transaction_data.get('event_name')
+        self.amount = transaction_data.get('amount')
+        self.payment_method = transaction_data.get('payment_method')
+        self.status = transaction_data.get('status')
+        self.created_at = transaction_data.get('created_at')
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a tuple row in FIELDS order, no intermediate dict"""
+        tx = cls.__new__(cls)
+        (tx.id, tx.transaction_id, tx.user_id, tx.username, tx.event_id, tx.event_name,
+         tx.amount, tx.payment_method, tx.status, tx.created_at) = row
+        return tx
+
+    def to_record(self):
+        return {
+            'id': self.id,
+            'transaction_id': self.transaction_id,
+            'user_id': self.user_id,
+            'username': self.username,
+            'event_id': self.event_id,
+            'event_name': self.event_name,
+            'amount': self.amount,
+            'payment_method': self.payment_method,
+            'status': self.status,
+            'created_at': self.created_at
+        }
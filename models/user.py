@@ -1,4 +1,8 @@
 class User:
+    # Column order of the tuple rows from_row() accepts
+    FIELDS = ('id', 'username', 'email', 'role', 'phone', 'join_date')
+    __slots__ = FIELDS
+
     def __init__(self, user_data=None):
         if user_data is None:
             user_data = {}
@@ -6,6 +10,15 @@ class User:
         self.username = user_data.get('username')
         self.email = user_data.get('email')
         self.role = user_data.get('role')
+        self.phone = user_data.get('phone')
+        self.join_date = user_data.get('join_date')
+    
+    @classmethod
+    def from_row(cls, row):
+        """Build from a tuple row in FIELDS order, no intermediate dict"""
+        user = cls.__new__(cls)
+        user.id, user.username, user.email, user.role, user.phone, user.join_date = row
+        return user
     
     def is_authenticated(self):
         return self.id is not None
@@ -19,4 +32,15 @@ class User:
             'username': self.username,
             'email': self.email,
             'role': self.role
-        }
\ No newline at end of file
+        }
+    
+    def to_record(self):
+        """Every column, as the API lists users"""
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'role': self.role,
+            'phone': self.phone,
+            'join_date': self.join_date
+        }
@@ -0,0 +1,189 @@
+"""Build fingerprinted, precompressed static assets into static/dist/.
+
+For every file under static/ (except dist/ itself):
+
+- the output name carries a content hash (``css/admin.3f2a9c1b7d4e.css``),
+  so it can be cached forever and a new deploy never serves stale files;
+- text assets (CSS, JS, SVG, ...) get ``.gz`` and, when the ``brotli``
+  package is installed, ``.br`` siblings at maximum compression, kept
+  only when smaller than the original;
+- JPEG/PNG images get resized WebP and JPEG (PNG when transparent)
+  variants at IMAGE_WIDTHS when Pillow is installed;
+- ``url(/static/...)`` references inside CSS are rewritten to the hashed
+  names (the widest variant for images), so stylesheets are hashed
+  after the images they point to.
+
+Everything is recorded in static/dist/manifest.json, which
+services.static_assets reads at startup. The output only depends on the
+input files, so rebuilding an unchanged tree gives identical names.
+
+    python scripts/build_assets.py [--static static] [--clean]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIST = 'dist'
+MANIFEST = 'manifest.json'
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.html', '.txt', '.map', '.ico'}
+RESIZABLE = {'.jpg', '.jpeg', '.png'}
+IMAGE_WIDTHS = (480, 960, 1600)
+IMAGE_QUALITY = 80
+CSS_URL = re.compile(r'''url\(\s*(['"]?)/static/([^'")?#]+)\1\s*\)''')
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def hashed_name(relpath, data, suffix=''):
+    root, ext = os.path.splitext(relpath)
+    return f'{root}{suffix}.{content_hash(data)}{ext}'
+
+
+def write(dist, relpath, data):
+    path = os.path.join(dist, relpath)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def compress(dist, relpath, data):
+    """Write .br / .gz siblings that beat the original; returns ``{encoding: size}``"""
+    encodings = {}
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data):
+            write(dist, relpath + '.br', compressed)
+            encodings['br'] = len(compressed)
+    # mtime=0 keeps the output byte-identical between builds
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < len(data):
+        write(dist, relpath + '.gz', compressed)
+        encodings['gzip'] = len(compressed)
+    return encodings
+
+
+def image_variants(dist, relpath, source):
+    """Resized WebP + JPEG/PNG copies of one image, widest first"""
+    from io import BytesIO
+
+    with Image.open(source) as image:
+        image.load()
+        transparent = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        fallback = 'png' if transparent else 'jpeg'
+        widths = [w for w in IMAGE_WIDTHS if w < image.width] or [image.width]
+        variants = []
+        for width in sorted(set(widths), reverse=True):
+            height = round(image.height * width / image.width)
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for fmt in ('webp', fallback):
+                frame = resized
+                if fmt == 'jpeg' and frame.mode not in ('RGB', 'L'):
+                    frame = frame.convert('RGB')
+                buffer = BytesIO()
+                options = {'optimize': True}
+                if fmt != 'png':
+                    options['quality'] = IMAGE_QUALITY
+                frame.save(buffer, format=fmt.upper(), **options)
+                data = buffer.getvalue()
+                root = os.path.splitext(relpath)[0]
+                ext = '.jpg' if fmt == 'jpeg' else f'.{fmt}'
+                name = hashed_name(root + ext, data, suffix=f'-{width}w')
+                write(dist, name, data)
+                variants.append({'path': name, 'width': width, 'height': height,
+                                 'type': f'image/{fmt}', 'bytes': len(data)})
+    return variants
+
+
+def rewrite_css(text, assets, variants):
+    def replace(match):
+        quote, target = match.group(1), match.group(2)
+        images = [v for v in variants.get(target, ()) if v['type'] != 'image/webp']
+        hashed = images[0]['path'] if images else assets.get(target)
+        if hashed is None:
+            return match.group(0)
+        return f'url({quote}/static/{DIST}/{hashed}{quote})'
+    return CSS_URL.sub(replace, text)
+
+
+def collect(static):
+    for dirpath, dirnames, filenames in os.walk(static):
+        if os.path.relpath(dirpath, static) == '.':
+            dirnames[:] = [d for d in dirnames if d != DIST]
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            yield os.path.relpath(path, static).replace(os.sep, '/'), path
+
+
+def build(static, clean=False):
+    dist = os.path.join(static, DIST)
+    if clean and os.path.isdir(dist):
+        shutil.rmtree(dist)
+    files = list(collect(static))
+    # Stylesheets last: they embed the hashed names of what they reference
+    files.sort(key=lambda item: item[0].endswith('.css'))
+
+    assets, encodings, variants = {}, {}, {}
+    original_bytes = shipped_bytes = 0
+    for relpath, path in files:
+        ext = os.path.splitext(relpath)[1].lower()
+        with open(path, 'rb') as f:
+            data = f.read()
+        if ext == '.css':
+            data = rewrite_css(data.decode('utf-8'), assets, variants).encode('utf-8')
+
+        name = hashed_name(relpath, data)
+        write(dist, name, data)
+        assets[relpath] = name
+        original_bytes += len(data)
+        shipped = len(data)
+
+        if ext in COMPRESSIBLE:
+            found = compress(dist, name, data)
+            if found:
+                encodings[name] = list(found)
+                shipped = min(found.values())
+        elif ext in RESIZABLE and Image is not None:
+            found = variants[relpath] = image_variants(dist, relpath, path)
+            # What a browser fetches by default: the widest variant
+            shipped = min([v['bytes'] for v in found if v['width'] == found[0]['width']] + [shipped])
+        shipped_bytes += shipped
+        print(f'{relpath:<40} {len(data):>9} -> {shipped:>9}  {name}')
+
+    manifest = {'assets': assets, 'encodings': encodings, 'variants': variants}
+    write(dist, MANIFEST, json.dumps(manifest, indent=2, sort_keys=True).encode())
+    print(f'\n{len(assets)} assets, {original_bytes} -> {shipped_bytes} bytes over the wire '
+          f'(brotli {"on" if brotli else "off"}, image variants {"on" if Image else "off"})')
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--static', default=os.path.join(ROOT, 'static'))
+    parser.add_argument('--clean', action='store_true', help='remove static/dist first')
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.static):
+        sys.exit(f'no such directory: {args.static}')
+    build(args.static, clean=args.clean)
+
+
+if __name__ == '__main__':
+    main()
@@ -62,11 +62,11 @@ class AuthService:
         if password != confirm_password:
             return {'success': False, 'error': 'Passwords do not match!'}
         
-        # PLAINTEXT PASSWORD - NO HASHING
+        # Dikirim plaintext ke database API, yang menyimpan hash scrypt
         response = self.db.register_user({
             'username': username,
             'email': email,
-            'password': password,  # ← PLAINTEXT!
+            'password': password,
             'role': 'user'
         })
 
@@ -0,0 +1,109 @@
+import threading
+import time
+
+
+class CacheEntry:
+    __slots__ = ('value', 'version', 'generation', 'loaded_at')
+
+    def __init__(self, value, version, generation, loaded_at):
+        self.value = value
+        self.version = version
+        self.generation = generation
+        self.loaded_at = loaded_at
+
+
+class VersionedCache:
+    """Read-through cache with TTL, explicit invalidation and stale-while-revalidate.
+
+    - fresh entries (younger than ``ttl``) are returned as is
+    - stale entries (younger than ``ttl + stale_ttl``) are returned immediately
+      while a single background thread reloads them
+    - invalidated or expired entries are reloaded synchronously; if that load
+      fails the last known value is served instead of raising
+
+    Every stored value gets a new ``version`` number so callers can tell
+    whether the data changed.
+    """
+
+    def __init__(self, ttl=30, stale_ttl=300):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._refreshing = set()
+        self._generation = 0
+        self._version = 0
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'load_errors': 0}
+
+    def get(self, key, loader):
+        """Return ``(value, version)`` for key, loading it through ``loader()``"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            current = entry is not None and entry.generation == self._generation
+            age = now - entry.loaded_at if entry else None
+
+            if current and age < self.ttl:
+                self._stats['hits'] += 1
+                return entry.value, entry.version
+
+            if current and age < self.ttl + self.stale_ttl:
+                self._stats['stale_hits'] += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(
+                        target=self._refresh, args=(key, loader), daemon=True
+                    ).start()
+                return entry.value, entry.version
+
+            self._stats['misses'] += 1
+
+        try:
+            return self._load(key, loader)
+        except Exception:
+            if entry is None:
+                raise
+            # Serve the last known value rather than failing the read
+            return entry.value, entry.version
+
+    def invalidate(self, key=None):
+        """Mark one key (or everything) as needing a reload"""
+        with self._lock:
+            if key is None:
+                self._generation += 1
+            else:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.generation = -1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, keys=len(self._entries), generation=self._generation)
+
+    def _load(self, key, loader):
+        with self._lock:
+            generation = self._generation
+        try:
+            value = loader()
+        except Exception:
+            with self._lock:
+                self._stats['load_errors'] += 1
+            raise
+
+        with self._lock:
+            self._version += 1
+            entry = CacheEntry(value, self._version, generation, time.monotonic())
+            # Keep the entry invalidated if a write raced with this load
+            if generation != self._generation:
+                entry.generation = -1
+            self._entries[key] = entry
+            return entry.value, entry.version
+
+    def _refresh(self, key, loader):
+        try:
+            self._load(key, loader)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
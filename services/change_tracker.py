@@ -0,0 +1,173 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from services.log_service import get_logger
+
+log = get_logger('change_tracker')
+
+
+def _as_datetime(value):
+    if isinstance(value, str):
+        # SQLite hands aggregates of DATETIME columns back as text
+        value = datetime.fromisoformat(value)
+    if value is None:
+        return None
+    # Stored as naive local time; HTTP dates are GMT
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+class ChangeTracker:
+    """Per-table change counters used as HTTP validators.
+
+    Writers call ``bump(cursor, *tables)`` inside their own transaction,
+    with a cursor from a pooled connection. It adds one to a random one of ``shards`` rows per table in
+    ``table_versions``, so concurrent purchases do not queue on one hot
+    row (same layout as ``stats_counters``). A table's version is the sum
+    of its shards and only ever grows, so it makes a cheap ETag, and the
+    newest ``updated_at`` is its Last-Modified.
+
+    Versions are re-read every ``refresh_interval`` seconds by a background
+    thread, so checking a conditional request is a dict lookup. After a
+    commit through this process the next lookup re-reads synchronously
+    until the change shows up (or ``settle`` seconds pass), so a client
+    never gets a 304 for a change it just made here. ``on_change``
+    callbacks run before a new version is published, which keeps
+    in-process caches from serving data older than the ETag.
+    """
+
+    def __init__(self, get_connection, tables, shards=8, refresh_interval=1.0, settle=5.0):
+        self._get_connection = get_connection
+        self.tables = tuple(tables)
+        self.shards = shards
+        self.refresh_interval = refresh_interval
+        self.settle = settle
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._versions = {}
+        self._pending = {}
+        self._last_refresh = 0.0
+        self._callbacks = {}
+        self._stats = {'refreshes': 0, 'forced_refreshes': 0, 'refresh_errors': 0}
+
+    def bump(self, cursor, *tables):
+        """Mark tables as changed as part of the caller's transaction.
+
+        Readers start re-reading only once that transaction commits; a
+        rolled back bump costs them nothing.
+        """
+        shard = random.randrange(self.shards)
+        now = datetime.now()
+        for table in tables:
+            cursor.execute(
+                'UPDATE table_versions SET version = version + 1, updated_at = %s '
+                'WHERE name = %s AND shard = %s',
+                (now, table, shard)
+            )
+        # Baseline from before the commit, so a refresh racing it still counts
+        with self._lock:
+            baselines = {table: self._versions.get(table, (None,))[0] for table in tables}
+        cursor.connection.after_commit(lambda: self._mark_pending(baselines))
+
+    def _mark_pending(self, baselines):
+        deadline = time.monotonic() + self.settle
+        with self._lock:
+            for table, baseline in baselines.items():
+                self._pending[table] = (baseline, deadline)
+
+    def ensure_seeded(self, cursor):
+        """Create missing counter rows; fresh counters start at the current epoch
+        so a rebuilt table never hands out an ETag a client already holds"""
+        cursor.execute('SELECT name, shard FROM table_versions')
+        existing = set(cursor.fetchall())
+        now = datetime.now()
+        start = int(time.time())
+        missing = [(table, shard, start if shard == 0 else 0, now)
+                   for table in self.tables for shard in range(self.shards)
+                   if (table, shard) not in existing]
+        if missing:
+            cursor.executemany(
+                'INSERT INTO table_versions (name, shard, version, updated_at) '
+                'VALUES (%s, %s, %s, %s)',
+                missing
+            )
+        return bool(missing)
+
+    def on_change(self, table, callback):
+        with self._lock:
+            self._callbacks.setdefault(table, []).append(callback)
+
+    def version(self, table):
+        """``(version, last_modified)`` of a table, or None if not known yet"""
+        with self._lock:
+            pending = table in self._pending
+        if pending:
+            self.refresh(since=time.monotonic())
+        with self._lock:
+            return self._versions.get(table)
+
+    def validators(self, tables, extra=()):
+        """``(etag, last_modified)`` covering several tables, or None"""
+        versions = [self.version(table) for table in tables]
+        if any(v is None for v in versions):
+            return None
+        etag = '.'.join([str(v[0]) for v in versions] + [str(e) for e in extra])
+        return etag, max(v[1] for v in versions)
+
+    def refresh(self, since=None):
+        """Re-read the versions; with ``since``, skip if a read started after it"""
+        with self._refresh_lock:
+            if since is not None:
+                if self._last_refresh >= since:
+                    return  # a caller queued ahead of us already re-read
+                self._stats['forced_refreshes'] += 1
+            started = time.monotonic()
+            conn = self._get_connection()
+            if not conn:
+                return
+            cursor = conn.cursor()
+            try:
+                cursor.execute(
+                    'SELECT name, SUM(version), MAX(updated_at) FROM table_versions GROUP BY name'
+                )
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+                conn.close()
+            self._stats['refreshes'] += 1
+            self._last_refresh = started
+
+            fresh = {name: (int(total or 0), _as_datetime(updated_at))
+                     for name, total, updated_at in rows}
+            with self._lock:
+                changed = [name for name, value in fresh.items()
+                           if self._versions.get(name, (None,))[0] != value[0]]
+                callbacks = [cb for name in changed for cb in self._callbacks.get(name, ())]
+            for callback in callbacks:
+                callback()
+
+            now = time.monotonic()
+            with self._lock:
+                self._versions.update(fresh)
+                for table, (baseline, deadline) in list(self._pending.items()):
+                    current = fresh.get(table, (None,))[0]
+                    if current != baseline or now >= deadline:
+                        del self._pending[table]
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending),
+                        versions={name: v[0] for name, v in self._versions.items()})
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True, name='change-tracker').start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                self._stats['refresh_errors'] += 1
+                log.error("Table version refresh failed", error=str(e))
@@ -0,0 +1,224 @@
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the acquire timeout"""
+
+
+class TimedCursor:
+    """Cursor proxy reporting every execute to ``on_query(sql, seconds, failed)``
+    (when given); ``connection`` is the pooled connection it belongs to"""
+
+    def __init__(self, raw, on_query, connection=None):
+        self._raw = raw
+        self._on_query = on_query
+        self.connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def execute(self, operation, *args, **kwargs):
+        return self._timed(self._raw.execute, operation, args, kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._timed(self._raw.executemany, operation, args, kwargs)
+
+    def _timed(self, call, operation, args, kwargs):
+        if self._on_query is None:
+            return call(operation, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            result = call(operation, *args, **kwargs)
+        except Exception:
+            self._on_query(operation, time.perf_counter() - started, True)
+            raise
+        self._on_query(operation, time.perf_counter() - started, False)
+        return result
+
+
+class PooledConnection:
+    """Proxy around a raw connection; close() returns it to the pool.
+
+    ``after_commit(callback)`` defers work until the current transaction
+    has committed; rollback() and close() drop the callbacks unrun.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._on_query = pool.on_query
+        self._after_commit = []
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._raw.cursor(*args, **kwargs), self._on_query, self)
+
+    def after_commit(self, callback):
+        self._after_commit.append(callback)
+
+    def commit(self):
+        self._raw.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def rollback(self):
+        self._after_commit = []
+        self._raw.rollback()
+
+    def close(self):
+        self._after_commit = []
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.release(self)
+
+
+class ConnectionPool:
+    """Bounded, thread-safe connection pool.
+
+    Connections are opened lazily up to ``max_size``. On checkout an idle
+    connection is health-checked (cheap ping after ``ping_interval`` idle
+    seconds) and recycled once it is older than ``max_lifetime``. When the
+    pool is exhausted ``acquire`` waits at most ``acquire_timeout`` seconds
+    and then raises ``PoolTimeout`` instead of blocking the worker.
+    ``on_query(sql, seconds, failed)``, if given, is called for every
+    statement executed through a pooled connection's cursors.
+    """
+
+    def __init__(self, connect, max_size=10, acquire_timeout=2.0,
+                 max_lifetime=1800, ping_interval=30, on_query=None):
+        self._connect = connect
+        self.on_query = on_query
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+
+        self._lock = threading.Condition(threading.Lock())
+        self._idle = []
+        self._size = 0
+        self._stats = {
+            'acquired': 0,
+            'created': 0,
+            'recycled': 0,
+            'failed_health_checks': 0,
+            'timeouts': 0,
+            'connect_errors': 0,
+        }
+
+    def acquire(self, timeout=None):
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeout(
+                            f'No database connection available after {timeout:.1f}s'
+                        )
+                    self._lock.wait(remaining)
+
+                if self._idle:
+                    conn = self._idle.pop()
+                else:
+                    conn = None
+                    self._size += 1
+
+            if conn is None:
+                return self._open()
+
+            if self._is_usable(conn):
+                conn.last_used = time.monotonic()
+                conn._pool = self
+                with self._lock:
+                    self._stats['acquired'] += 1
+                return conn
+
+            self._discard(conn)
+
+    def release(self, conn):
+        try:
+            # End any open transaction so the next borrower gets a fresh snapshot
+            conn._raw.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+
+        conn.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(conn)
+            self._lock.notify()
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self._stats,
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._size - len(self._idle),
+                max_size=self.max_size,
+            )
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for conn in idle:
+            self._close_raw(conn)
+
+    def _open(self):
+        try:
+            raw = self._connect()
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._stats['connect_errors'] += 1
+                self._lock.notify()
+            raise
+
+        conn = PooledConnection(self, raw)
+        with self._lock:
+            self._stats['created'] += 1
+            self._stats['acquired'] += 1
+        return conn
+
+    def _is_usable(self, conn):
+        now = time.monotonic()
+        if now - conn.created_at > self.max_lifetime:
+            with self._lock:
+                self._stats['recycled'] += 1
+            return False
+        if now - conn.last_used < self.ping_interval:
+            return True
+        try:
+            conn._raw.ping(reconnect=False)
+            return True
+        except Exception:
+            with self._lock:
+                self._stats['failed_health_checks'] += 1
+            return False
+
+    def _discard(self, conn):
+        self._close_raw(conn)
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+
+    @staticmethod
+    def _close_raw(conn):
+        try:
+            conn._raw.close()
+        except Exception:
+            pass
@@ -1,14 +1,88 @@
 import requests
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from flask import Response, has_request_context, request as client_request, stream_with_context
 import os
+import threading
+import time
+
+from services.log_service import get_logger
+from services.metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY, endpoint_label
+
+log = get_logger('database_service')
+
+RELAYED_HEADERS = ('Content-Disposition', 'X-Next-Cursor', 'X-Catalog-Version',
+                   'ETag', 'Last-Modified', 'Cache-Control')
+CONDITIONAL_HEADERS = ('If-None-Match', 'If-Modified-Since')
+
+def conditional_headers(incoming):
+    """The client's cache validators, to forward on a GET to the API"""
+    return {name: incoming[name] for name in CONDITIONAL_HEADERS if incoming.get(name)}
+
+def relay_response(upstream, chunk_size=64 * 1024):
+    """Pass a ``stream=True`` API response through to the client as bytes.
+
+    Nothing is parsed or re-encoded; chunks are forwarded as they arrive,
+    so memory does not grow with the size of the listing.
+    """
+    def chunks():
+        try:
+            yield from upstream.iter_content(chunk_size=chunk_size)
+        finally:
+            upstream.close()
+
+    result = Response(stream_with_context(chunks()), status=upstream.status_code,
+                      content_type=upstream.headers.get('Content-Type', 'application/json'))
+    for name in RELAYED_HEADERS:
+        if upstream.headers.get(name):
+            result.headers[name] = upstream.headers[name]
+    return result
 
 class DatabaseService:
-    def __init__(self, security_service=None):
+    def __init__(self, security_service=None, pool_size=None, timeout=None):
         self.api_url = os.getenv('DATABASE_API_URL', 'http://localhost:8000')
         self.security = security_service
+        self.pool_size = pool_size or int(os.getenv('DATABASE_API_POOL_SIZE', 10))
+        self.timeout = timeout or float(os.getenv('DATABASE_API_TIMEOUT', 10))
+        self._lock = threading.Lock()
+        self._session = None
+        self._pid = None
+    
+    @property
+    def session(self):
+        """Keep-alive session shared by every request thread of this worker.
+
+        The threaded server runs each request on a new thread, so the pooled
+        connections must outlive it; the adapter's pool is thread-safe and
+        holds up to ``pool_size`` idle connections. Rebuilt after a fork.
+        """
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    session = requests.Session()
+                    # Shared by all users: never carry one response's cookies into the next call
+                    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+                    self._pid = os.getpid()
+        return self._session
     
-    def request(self, method, endpoint, data=None, token=None):
+    def request(self, method, endpoint, data=None, token=None, timeout=None, params=None, headers=None,
+                body=None, stream=False):
+        """Call the database API; ``body`` sends raw bytes or an iterable (chunked)
+        instead of JSON and ``stream`` leaves the response body unread"""
         try:
-            headers = {'Authorization': f'Bearer {token}'} if token else {}
+            headers = dict(headers or {})
+            if has_request_context() and client_request.remote_addr:
+                # Lets the API rate-limit per end client rather than per gateway;
+                # the API reads the chain right to left, so spoofed hops stay ignored
+                forwarded = client_request.headers.get('X-Forwarded-For')
+                headers.setdefault('X-Forwarded-For', ', '.join(
+                    filter(None, (forwarded, client_request.remote_addr))))
+            if token:
+                headers['Authorization'] = f'Bearer {token}'
             
             # Sanitize data jika security_service available
             if data and self.security:
@@ -20,21 +94,31 @@ class DatabaseService:
                         sanitized_data[key] = value
                 data = sanitized_data
             
+            method = method.upper()
+            if method not in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE'):
+                return None
+            
             url = f"{self.api_url}{endpoint}"
-            print(f"🔗 API CALL: {method} {url}")  # Debug log
             
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=headers, timeout=10)
-            elif method.upper() == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=10)
-            else:
-                return None
+            started = time.perf_counter()
+            response = self.session.request(
+                method, url,
+                json=data if method != 'GET' and body is None else None,
+                data=body,
+                params=params,
+                headers=headers,
+                timeout=timeout or self.timeout,
+                stream=stream
+            )
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started,
+                                     'database_api', method, endpoint_label(endpoint))
                 
-            print(f"📡 RESPONSE: {response.status_code}")  # Debug log
+            log.debug("API call", method=method, endpoint=endpoint, status=response.status_code)
             return response
             
         except requests.exceptions.RequestException as e:
-            print(f"❌ Database API error: {e}")
+            UPSTREAM_ERRORS.inc('database_api', method, endpoint_label(endpoint))
+            log.warning("Database API error", method=method, endpoint=endpoint, error=str(e))
             return None
     
     def get_user_by_email(self, email, token=None):
@@ -42,15 +126,6 @@ class DatabaseService:
         if self.security:
             email = self.security.sanitize_input(email)
         response = self.request('GET', f'/api/users?email={email}', token=token)
-        
-        # Debug: Print response untuk troubleshooting
-        if response:
-            print(f"👤 User data response: {response.status_code}")
-            try:
-                print(f"📄 Response content: {response.json()}")
-            except:
-                print("📄 Response content: Unable to parse JSON")
-        
         return response
     
     def login_user(self, identifier, password):
@@ -65,11 +140,64 @@ class DatabaseService:
     def check_session(self, token):
         return self.request('GET', '/api/check-session', token=token)
     
-    def get_users(self, token):
-        return self.request('GET', '/api/admin/users', token=token)
+    def get_users(self, token, params=None, stream=False, headers=None):
+        """One page of users; pass limit/after and filters via params"""
+        return self.request('GET', '/api/admin/users', token=token, params=params, stream=stream,
+                            headers=headers)
+    
+    def get_concerts(self, token, params=None, stream=False, headers=None):
+        return self.request('GET', '/api/concerts', token=token, params=params, stream=stream,
+                            headers=headers)
+    
+    def get_transactions(self, token, params=None, stream=False, headers=None):
+        """One page of transactions, newest first; filter by status via params"""
+        return self.request('GET', '/api/admin/transactions', token=token, params=params,
+                            stream=stream, headers=headers)
+    
+    def get_sales_analytics(self, token, params=None, headers=None):
+        """Daily tickets/revenue per concert; ``from``/``to``/``concert_id`` via params"""
+        return self.request('GET', '/api/admin/analytics/sales', token=token, params=params,
+                            headers=headers)
+    
+    def import_users(self, token, body, content_type='application/x-ndjson'):
+        """Bulk-register users from NDJSON or CSV; ``body`` may be a file or generator"""
+        return self.request('POST', '/api/admin/users/import', token=token, body=body,
+                            headers={'Content-Type': content_type})
+    
+    def export_users(self, token, fmt='ndjson'):
+        """Streamed export of all users; iterate ``response.iter_content()``"""
+        return self.request('GET', '/api/admin/users/export', token=token,
+                            params={'format': fmt}, stream=True)
+    
+    def init_concerts(self, token):
+        return self.request('POST', '/api/init-concerts', token=token)
+    
+    def get_admin_stats(self, token, headers=None):
+        return self.request('GET', '/api/admin/stats', token=token, headers=headers)
+    
+    def update_user_role(self, user_id, role, token):
+        return self.request('PUT', f'/api/admin/users/{user_id}', {'role': role}, token=token)
+    
+    def delete_user(self, user_id, token):
+        return self.request('DELETE', f'/api/admin/users/{user_id}', token=token)
+    
+    def reserve_tickets(self, concert_id, quantity, token, idempotency_key=None):
+        return self.request('POST', f'/api/concerts/{concert_id}/holds', {'quantity': quantity},
+                            token=token, headers=self._idempotency(idempotency_key))
+    
+    def purchase_tickets(self, concert_id, quantity, token, idempotency_key=None,
+                         payment_method=None):
+        return self.request('POST', f'/api/concerts/{concert_id}/purchase',
+                            {'quantity': quantity, 'payment_method': payment_method},
+                            token=token, headers=self._idempotency(idempotency_key))
+    
+    def confirm_hold(self, hold_id, token, payment_method=None):
+        return self.request('POST', f'/api/holds/{hold_id}/confirm',
+                            {'payment_method': payment_method}, token=token)
     
-    def get_concerts(self, token):
-        return self.request('GET', '/api/concerts', token=token)
+    def release_hold(self, hold_id, token):
+        return self.request('DELETE', f'/api/holds/{hold_id}', token=token)
     
-    def get_admin_stats(self, token):
-        return self.request('GET', '/api/admin/stats', token=token)
\ No newline at end of file
+    @staticmethod
+    def _idempotency(key):
+        return {'Idempotency-Key': key} if key else None
@@ -0,0 +1,129 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from services.log_service import get_logger
+
+log = get_logger('group_commit')
+
+
+class WriterBusy(Exception):
+    """The group-commit queue is full"""
+
+
+class GroupCommitWriter:
+    """Bounded queue of rows written by one thread, many rows per commit.
+
+    ``submit(item)`` returns a Future that resolves once ``write_batch``
+    has committed the item, so callers still get a per-row durability
+    acknowledgement while the database sees one commit (one log flush)
+    for everything that queued up during the previous one. The writer
+    waits up to ``max_wait`` seconds after the first item for more to
+    arrive, and never takes more than ``max_batch`` at once.
+
+    ``write_batch(items)`` must write and commit the items in a single
+    transaction or raise. A failed batch is retried one item at a time so
+    a single bad row only fails its own caller. At most ``max_pending``
+    items may wait; beyond that ``submit`` raises ``WriterBusy`` at once.
+    """
+
+    def __init__(self, write_batch, max_batch=500, max_wait=0.002, max_pending=10000,
+                 name='group-commit'):
+        self._write_batch = write_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'submitted': 0, 'committed': 0, 'failed': 0, 'batches': 0,
+                       'retried_batches': 0, 'busy': 0, 'largest_batch': 0}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name=self.name)
+        self._thread.start()
+
+    def stop(self):
+        """Write everything still queued, then stop the thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._drain()
+
+    def submit(self, item):
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            self._stats['busy'] += 1
+            raise WriterBusy(f'{self.name} queue is full')
+        self._stats['submitted'] += 1
+        return future
+
+    def write(self, item, timeout=None):
+        """Submit and wait until the item is committed"""
+        return self.submit(item).result(timeout)
+
+    def stats(self):
+        return dict(self._stats, pending=self._queue.qsize(), max_pending=self.max_pending)
+
+    def _take_batch(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            self._write_batch(items)
+        except Exception as e:
+            if len(batch) == 1:
+                self._stats['failed'] += 1
+                batch[0][1].set_exception(e)
+                return
+            self._stats['retried_batches'] += 1
+            log.warning("Group commit failed, retrying rows one by one",
+                        writer=self.name, rows=len(batch), error=str(e))
+            for entry in batch:
+                self._commit([entry])
+            return
+        self._stats['batches'] += 1
+        self._stats['committed'] += len(batch)
+        self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+        for _, future in batch:
+            future.set_result(None)
+
+    def _drain(self):
+        while True:
+            try:
+                first = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._commit(self._take_batch(first))
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = self._take_batch(first)
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # Never leave a caller waiting on a future nobody will resolve
+                log.error("Group commit writer error", writer=self.name, error=str(e))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
@@ -1,3 +1,20 @@
 from .database_service import DatabaseService
 from .auth_service import AuthService
-from .security_service import SecurityService  # ← TAMBAH INI
\ No newline at end of file
+from .security_service import SecurityService  # ← TAMBAH INI
+from .connection_pool import ConnectionPool, PoolTimeout
+from .cache import VersionedCache
+from .inventory import InventoryManager, InventoryError
+from .stats_service import StatsService
+from .token_cache import TokenCache
+from .log_service import setup_logging, get_logger
+from .metrics import REGISTRY, instrument_app, metrics_response
+from .storage import create_backend, MySQLBackend, SQLiteBackend
+from .password_hasher import PasswordHasher, HasherBusy
+from .json_codec import JSONProvider, dumps
+from .change_tracker import ChangeTracker
+
+from .static_assets import AssetManifest
+from .page_cache import PageCache
+from .group_commit import GroupCommitWriter, WriterBusy
+from .sales_rollup import SalesRollup
+from .rate_limiter import RateLimiter, policy_from_env
\ No newline at end of file
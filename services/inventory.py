@@ -0,0 +1,294 @@
+import heapq
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+
+class InventoryError(Exception):
+    """Business error raised by the inventory manager, carries an HTTP status"""
+
+    def __init__(self, message, status=409):
+        super().__init__(message)
+        self.status = status
+
+
+class ShardedCounter:
+    """Seat counter split over independently locked shards.
+
+    Buyers start on a shard picked from their thread, so concurrent holds
+    on one hot concert rarely wait on the same lock. Only when no single
+    shard can cover a request are all shards locked (in order) together.
+    """
+
+    def __init__(self, total, shards=8):
+        self._locks = [threading.Lock() for _ in range(shards)]
+        base, extra = divmod(max(total, 0), shards)
+        self._counts = [base + (1 if i < extra else 0) for i in range(shards)]
+
+    def take(self, amount):
+        n = len(self._locks)
+        home = threading.get_ident() % n
+        for offset in range(n):
+            i = (home + offset) % n
+            with self._locks[i]:
+                if self._counts[i] >= amount:
+                    self._counts[i] -= amount
+                    return True
+        return self._take_spread(amount)
+
+    def give(self, amount):
+        i = threading.get_ident() % len(self._locks)
+        with self._locks[i]:
+            self._counts[i] += amount
+
+    def value(self):
+        return sum(self._counts)
+
+    def _take_spread(self, amount):
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            if sum(self._counts) < amount:
+                return False
+            for i, count in enumerate(self._counts):
+                used = min(count, amount)
+                self._counts[i] -= used
+                amount -= used
+                if not amount:
+                    break
+            return True
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+
+class InventoryManager:
+    """In-process owner of remaining seats with write-behind to the database.
+
+    Holds are granted and expired purely in memory. Confirmed sales are
+    queued and handed to ``flush_sales(batch, settled)`` in batches from a
+    background thread, so the database sees one transaction per batch
+    instead of one row lock per buyer. ``load_counts(concert_ids)`` is used
+    to recover the remaining seats from the database on startup and when
+    an unknown concert is requested. ``flush_sales`` appends every sale it
+    has committed (or found already persisted) to ``settled`` as it goes,
+    so a flush that fails half way re-queues only the rest.
+
+    The counts are only authoritative inside one process: run a single API
+    worker (or partition concerts across workers) when this is enabled.
+    """
+
+    def __init__(self, load_counts, flush_sales, shards=8, hold_ttl=600,
+                 flush_interval=0.2, batch_size=500):
+        self._load_counts = load_counts
+        self._flush_sales = flush_sales
+        self.shards = shards
+        self.hold_ttl = hold_ttl
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._counters = {}
+        self._counters_lock = threading.Lock()
+        self._holds = {}
+        self._by_key = {}
+        self._expiry = []
+        self._holds_lock = threading.Lock()
+        self._pending = []
+        self._pending_lock = threading.Condition(threading.Lock())
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'holds': 0, 'sold_out': 0, 'expired': 0, 'flushed': 0, 'flush_errors': 0}
+
+    def recover(self):
+        """Load remaining seats for every concert from the database"""
+        counts = self._load_counts(None)
+        with self._counters_lock:
+            self._counters = {cid: ShardedCounter(n, self.shards) for cid, n in counts.items()}
+        return len(counts)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name='inventory-flusher')
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._pending_lock:
+            self._pending_lock.notify()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+
+    def hold(self, concert_id, user_id, quantity, idempotency_key=None, confirm=False):
+        """Take seats and return ``(hold, replayed)``"""
+        if idempotency_key:
+            with self._holds_lock:
+                hold_id = self._by_key.get((user_id, idempotency_key))
+                if hold_id:
+                    return dict(self._holds[hold_id]), True
+
+        counter = self._counter(concert_id)
+        if not counter.take(quantity):
+            self._expire_due()
+            if not counter.take(quantity):
+                self._stats['sold_out'] += 1
+                raise InventoryError('Not enough tickets available', 409)
+
+        now = datetime.now()
+        hold = {
+            'hold_id': uuid.uuid4().hex,
+            'concert_id': concert_id,
+            'user_id': user_id,
+            'quantity': quantity,
+            'status': 'held',
+            'idempotency_key': idempotency_key,
+            'expires_at': now + timedelta(seconds=self.hold_ttl),
+            'created_at': now
+        }
+        with self._holds_lock:
+            if idempotency_key:
+                existing = self._by_key.get((user_id, idempotency_key))
+                if existing:
+                    # A concurrent retry with the same key won
+                    counter.give(quantity)
+                    return dict(self._holds[existing]), True
+                self._by_key[(user_id, idempotency_key)] = hold['hold_id']
+            self._holds[hold['hold_id']] = hold
+            heapq.heappush(self._expiry, (hold['expires_at'], hold['hold_id']))
+            self._stats['holds'] += 1
+
+        if confirm:
+            return self.confirm(hold['hold_id'], user_id), False
+        return dict(hold), False
+
+    def confirm(self, hold_id, user_id):
+        with self._holds_lock:
+            hold = self._own_hold(hold_id, user_id)
+            if hold['status'] == 'held' and hold['expires_at'] <= datetime.now():
+                self._expire_locked(hold)
+            if hold['status'] == 'confirmed':
+                return dict(hold)
+            if hold['status'] != 'held':
+                raise InventoryError(f"Hold is {hold['status']}", 410)
+            hold['status'] = 'confirmed'
+            sale = dict(hold)
+
+        with self._pending_lock:
+            self._pending.append(sale)
+            if len(self._pending) >= self.batch_size:
+                self._pending_lock.notify()
+        return dict(sale)
+
+    def release(self, hold_id, user_id):
+        with self._holds_lock:
+            hold = self._own_hold(hold_id, user_id)
+            if hold['status'] != 'held':
+                raise InventoryError(f"Hold is already {hold['status']}", 409)
+            hold['status'] = 'released'
+            self._counter(hold['concert_id']).give(hold['quantity'])
+            return dict(hold)
+
+    def restock(self, concert_id, quantity):
+        """Give seats back, e.g. when a queued sale could not be persisted"""
+        self._counter(concert_id).give(quantity)
+
+    def remaining(self, concert_id):
+        with self._counters_lock:
+            counter = self._counters.get(concert_id)
+        return counter.value() if counter else None
+
+    def flush(self):
+        """Write all queued sales now; returns the number persisted"""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        settled = []
+        try:
+            self._flush_sales(batch, settled)
+        except Exception:
+            # Re-queue only what was not committed; a retry must not see
+            # its own rows as someone else's duplicates
+            self._stats['flush_errors'] += 1
+            done = {sale['hold_id'] for sale in settled}
+            with self._pending_lock:
+                self._pending[:0] = [sale for sale in batch if sale['hold_id'] not in done]
+            self._stats['flushed'] += len(settled)
+            self._forget(settled)
+            raise
+        self._stats['flushed'] += len(batch)
+        self._forget(batch)
+        return len(batch)
+
+    def stats(self):
+        with self._pending_lock:
+            pending = len(self._pending)
+        with self._holds_lock:
+            active = sum(1 for hold in self._holds.values() if hold['status'] == 'held')
+        return dict(self._stats, pending_flush=pending, active_holds=active,
+                    concerts=len(self._counters))
+
+    def _counter(self, concert_id):
+        with self._counters_lock:
+            counter = self._counters.get(concert_id)
+        if counter is not None:
+            return counter
+
+        counts = self._load_counts([concert_id])
+        if concert_id not in counts:
+            raise InventoryError('Concert not found', 404)
+        with self._counters_lock:
+            return self._counters.setdefault(
+                concert_id, ShardedCounter(counts[concert_id], self.shards)
+            )
+
+    def _own_hold(self, hold_id, user_id):
+        hold = self._holds.get(hold_id)
+        if not hold or hold['user_id'] != user_id:
+            raise InventoryError('Hold not found', 404)
+        return hold
+
+    def _expire_locked(self, hold):
+        hold['status'] = 'expired'
+        self._counter(hold['concert_id']).give(hold['quantity'])
+        self._stats['expired'] += 1
+
+    def _expire_due(self):
+        now = datetime.now()
+        with self._holds_lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, hold_id = heapq.heappop(self._expiry)
+                hold = self._holds.get(hold_id)
+                if hold is None:
+                    continue
+                if hold['status'] == 'held':
+                    self._expire_locked(hold)
+                if hold['status'] != 'confirmed' or hold.get('flushed'):
+                    self._drop_locked(hold)
+
+    def _forget(self, batch):
+        """Drop flushed sales from memory; the database owns them now"""
+        with self._holds_lock:
+            for sale in batch:
+                hold = self._holds.get(sale['hold_id'])
+                if hold is None:
+                    continue
+                hold['flushed'] = True
+                if hold['expires_at'] <= datetime.now():
+                    self._drop_locked(hold)
+
+    def _drop_locked(self, hold):
+        self._holds.pop(hold['hold_id'], None)
+        if hold['idempotency_key']:
+            self._by_key.pop((hold['user_id'], hold['idempotency_key']), None)
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._pending_lock:
+                if len(self._pending) < self.batch_size:
+                    self._pending_lock.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                time.sleep(self.flush_interval)
+            self._expire_due()
@@ -0,0 +1,50 @@
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is the fallback
+    orjson = None
+
+# Same conversions as Flask's jsonify: HTTP dates, Decimal/UUID as strings
+_default = DefaultJSONProvider.default
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Compact, key-sorted JSON as bytes"""
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+else:
+    _encoder = json.JSONEncoder(default=_default, sort_keys=True, separators=(',', ':'))
+
+    def dumps(obj):
+        """Compact, key-sorted JSON as bytes"""
+        return _encoder.encode(obj).encode()
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def dumps_records(models):
+    """JSON array of ``model.to_record()`` for a batch of slotted models"""
+    return dumps([model.to_record() for model in models])
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask JSON provider encoding through :func:`dumps` (orjson when installed).
+
+    Output matches the default provider's compact form, so switching it
+    on changes speed, not responses.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if self._app.debug:
+            return super().response(obj)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
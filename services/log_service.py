@@ -0,0 +1,197 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import threading
+
+try:
+    from flask import has_request_context, request
+except ImportError:
+    has_request_context = request = None
+
+REDACTED = '[REDACTED]'
+SENSITIVE_KEYS = {'password', 'password_hash', 'token', 'authorization', 'secret', 'secret_key'}
+_BEARER = re.compile(r'(Bearer\s+)[A-Za-z0-9\-_.=]+')
+
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+_setup_lock = threading.Lock()
+_listener = None
+
+
+def redact(value, key=None):
+    """Recursively mask credentials in structured log fields"""
+    if key is not None and str(key).lower() in SENSITIVE_KEYS:
+        return REDACTED
+    if isinstance(value, dict):
+        return {k: redact(v, k) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    if isinstance(value, str):
+        return _BEARER.sub(r'\1' + REDACTED, value)
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, fields"""
+
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'service': self.service,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith('_'):
+                entry[key] = redact(value, key)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RouteSamplingFilter(logging.Filter):
+    """Keep only a fraction of sub-WARNING records per Flask route.
+
+    Rates come from ``LOG_SAMPLE_RATES``, e.g. ``/api/concerts=0.01,*=1``.
+    Warnings and errors are never sampled away.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self.default = rates.get('*', 1.0)
+
+    def filter(self, record):
+        route = _current_route()
+        if route is not None:
+            record.route = route
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(route, self.default)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never block a request on logging: drop records when the queue is full"""
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+    def prepare(self, record):
+        # Merge args now (they may be mutated later) but leave JSON
+        # encoding and redaction to the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _Listener(logging.handlers.QueueListener):
+    """Queue listener whose stop waits for room instead of failing on a full queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def _current_route():
+    if has_request_context is None or not has_request_context():
+        return None
+    rule = request.url_rule
+    return rule.rule if rule is not None else request.path
+
+
+def _parse_rates(spec):
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        route, _, rate = part.rpartition('=')
+        try:
+            rates[route or '*'] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+def setup_logging(service, level=None, stream=None):
+    """Route the ``guardiantix`` loggers through a queue to one writer thread.
+
+    Request threads only enqueue a record; formatting to JSON, redaction
+    and the blocking write to stdout happen on the listener thread.
+    """
+    global _listener
+    with _setup_lock:
+        root = logging.getLogger('guardiantix')
+        if _listener is not None:
+            return root
+
+        # Skip per-record caller/thread/process lookups on the request path
+        logging._srcfile = None
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+
+        level = level or os.getenv('LOG_LEVEL', 'INFO')
+        log_queue = queue.Queue(maxsize=int(os.getenv('LOG_QUEUE_SIZE', 10000)))
+
+        handler = DroppingQueueHandler(log_queue)
+        handler.addFilter(RouteSamplingFilter(_parse_rates(os.getenv('LOG_SAMPLE_RATES', ''))))
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter(service))
+
+        root.handlers[:] = [handler]
+        root.setLevel(level.upper())
+        root.propagate = False
+
+        # Werkzeug's per-request access log goes through the same queue
+        werkzeug = logging.getLogger('werkzeug')
+        werkzeug.handlers[:] = [handler]
+        werkzeug.propagate = False
+
+        _listener = _Listener(log_queue, output, respect_handler_level=False)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return root
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """``log.info('message', key=value)`` - keyword arguments become JSON fields"""
+
+    def process(self, msg, kwargs):
+        fields = {k: kwargs.pop(k) for k in list(kwargs)
+                  if k not in ('exc_info', 'stack_info', 'stacklevel', 'extra')}
+        extra = dict(kwargs.get('extra') or {}, **fields)
+        kwargs['extra'] = extra
+        return msg, kwargs
+
+
+def get_logger(name):
+    return StructuredLogger(logging.getLogger(f'guardiantix.{name}'), {})
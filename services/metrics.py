@@ -0,0 +1,248 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for values, total in items:
+            yield f'{self.name}{_format_labels(self.labels, values)} {_format_number(total)}'
+
+
+class Histogram:
+    """Bucketed latency distribution (cumulative buckets on render only)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *label_values):
+        return _Timer(self, label_values)
+
+    def samples(self):
+        with self._lock:
+            items = [(values, list(counts), total, count)
+                     for values, (counts, total, count) in self._series.items()]
+        for values, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket
+                le = f'le="{_format_number(bound)}"'
+                yield f'{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labels, values)} {_format_number(total)}'
+            yield f'{self.name}_count{_format_labels(self.labels, values)} {count}'
+
+
+class _Timer:
+    __slots__ = ('histogram', 'label_values', 'started')
+
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+
+
+class MetricsRegistry:
+    """Process-local metric registry rendered in the Prometheus text format.
+
+    Recording is a dict update under a per-metric lock, cheap enough to
+    leave on for every request. Each worker process keeps its own values;
+    Prometheus sums them across scrape targets.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help_text, labels, buckets)
+
+    def add_collector(self, collect):
+        """``collect()`` returns ``[(name, help, {((label, value), ...): number})]`` gauges"""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        for collect in collectors:
+            try:
+                gauges = collect()
+            except Exception:
+                continue
+            for name, help_text, values in gauges:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} gauge')
+                for labels, value in values.items():
+                    names = [k for k, _ in labels]
+                    label_values = [v for _, v in labels]
+                    lines.append(f'{name}{_format_labels(names, label_values)} {_format_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, cls, name, help_text, labels, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labels, *args)
+            return metric
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'HTTP requests by route, method and status', ('route', 'method', 'status'))
+HTTP_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route', ('route', 'method'))
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    'upstream_request_duration_seconds', 'Latency of calls to upstream services',
+    ('upstream', 'method', 'endpoint'))
+UPSTREAM_ERRORS = REGISTRY.counter(
+    'upstream_errors_total', 'Failed upstream calls (no response)', ('upstream', 'method', 'endpoint'))
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    'db_query_duration_seconds', 'Database statement latency', ('operation', 'table'))
+DB_QUERY_ERRORS = REGISTRY.counter(
+    'db_query_errors_total', 'Database statements that raised', ('operation', 'table'))
+FALLBACKS = REGISTRY.counter(
+    'fallback_responses_total', 'Responses served from placeholder or stale data', ('source',))
+RATE_LIMIT_DECISIONS = REGISTRY.counter(
+    'rate_limit_decisions_total', 'Admission control decisions by scope', ('scope', 'decision'))
+
+_ID_SEGMENT = re.compile(r'/(?:\d+|[0-9a-f]{32})(?=/|$)')
+_SQL_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE(?: IF NOT EXISTS)?)\s+`?(\w+)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def endpoint_label(endpoint):
+    """``/api/users/42?x=1`` -> ``/api/users/:id`` to keep label cardinality bounded"""
+    return _ID_SEGMENT.sub('/:id', endpoint.split('?', 1)[0])
+
+
+@lru_cache(maxsize=1024)
+def query_labels(sql):
+    """``(operation, table)`` of a SQL statement, e.g. ``('SELECT', 'users')``"""
+    stripped = sql.lstrip(' \t\n(')
+    operation = stripped.split(None, 1)[0].upper() if stripped else 'UNKNOWN'
+    match = _SQL_TABLE.search(stripped)
+    return operation, match.group(1).lower() if match else ''
+
+
+def observe_query(sql, seconds, failed=False):
+    """Connection pool hook: record one executed statement"""
+    labels = query_labels(sql) if isinstance(sql, str) else ('UNKNOWN', '')
+    DB_QUERY_LATENCY.observe(seconds, *labels)
+    if failed:
+        DB_QUERY_ERRORS.inc(*labels)
+
+
+def instrument_app(app, registry=REGISTRY):
+    """Count and time every request of a Flask app by its URL rule.
+
+    The start hook is put first so requests answered by another
+    ``before_request`` hook (e.g. a 503 while starting) are still measured.
+    Recording happens at teardown, which runs even when an exception
+    escapes the view or an ``after_request`` hook; such a request is
+    counted as a 500.
+    """
+    from flask import request
+
+    def start_timer():
+        request.environ['guardiantix.started'] = time.perf_counter()
+
+    def note_status(response):
+        request.environ['guardiantix.status'] = response.status_code
+        return response
+
+    def record(exc):
+        started = request.environ.pop('guardiantix.started', None)
+        status = request.environ.pop('guardiantix.status', 500)
+        if started is not None:
+            rule = request.url_rule
+            route = rule.rule if rule is not None else 'unmatched'
+            HTTP_LATENCY.observe(time.perf_counter() - started, route, request.method)
+            HTTP_REQUESTS.inc(route, request.method, str(500 if exc is not None else status))
+
+    app.before_request_funcs.setdefault(None, []).insert(0, start_timer)
+    # after_request hooks run last-registered first: this one sees the final status
+    app.after_request_funcs.setdefault(None, []).insert(0, note_status)
+    app.teardown_request(record)
+    return registry
+
+
+def metrics_response(registry=REGISTRY):
+    from flask import Response
+    return Response(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,76 @@
+import re
+import threading
+from collections import OrderedDict
+
+from flask import current_app, render_template, session
+from markupsafe import escape
+
+SENTINEL = '\x00page-cache:{}\x00'
+_SENTINEL = re.compile('\x00page-cache:(\\w+)\x00')
+
+
+class PageCache:
+    """Bounded LRU of rendered template shells.
+
+    ``render(template, personal, **context)`` renders the template once per
+    ``(template, context)`` with every ``personal`` variable replaced by a
+    sentinel, and caches the output split around those sentinels. Later
+    requests only join the pieces with the HTML-escaped values of the
+    current user, so a page view costs no Jinja work. Personal variables
+    must be printed as-is by the template (no filters, no tests beyond
+    truthiness); anything else belongs in ``context`` or client-side.
+
+    Pages are rendered normally, without caching, while flash messages are
+    pending (they live in the session and are consumed by the render) and
+    while templates auto-reload in debug mode. Entries belong to a
+    ``deploy_id``; ``invalidate(new_id)`` drops them all.
+    """
+
+    def __init__(self, max_entries=128, deploy_id=None):
+        self.max_entries = max_entries
+        self.deploy_id = deploy_id
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'bypasses': 0, 'evictions': 0}
+
+    def render(self, template, personal=None, **context):
+        personal = personal or {}
+        if '_flashes' in session or current_app.jinja_env.auto_reload:
+            with self._lock:
+                self._stats['bypasses'] += 1
+            return render_template(template, **personal, **context)
+
+        key = (self.deploy_id, template, tuple(sorted(personal)), tuple(sorted(context.items())))
+        with self._lock:
+            parts = self._entries.get(key)
+            if parts is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+            else:
+                self._stats['misses'] += 1
+
+        if parts is None:
+            shell = render_template(
+                template, **{name: SENTINEL.format(name) for name in personal}, **context
+            )
+            parts = _SENTINEL.split(shell)
+            with self._lock:
+                if key[0] == self.deploy_id:
+                    self._entries[key] = parts
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self._stats['evictions'] += 1
+
+        # split() alternates literal text and sentinel names
+        values = {name: str(escape(value)) for name, value in personal.items()}
+        return ''.join(values[part] if i % 2 else part for i, part in enumerate(parts))
+
+    def invalidate(self, deploy_id=None):
+        with self._lock:
+            if deploy_id is not None:
+                self.deploy_id = deploy_id
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
@@ -0,0 +1,235 @@
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import re
+import secrets
+import threading
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+SCRYPT = 'scrypt'
+PBKDF2 = 'pbkdf2_sha256'
+SHA256_HEX = re.compile(r'[0-9a-fA-F]{64}')
+
+
+class HasherBusy(Exception):
+    """Every hashing worker is taken and the wait queue is full"""
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode().rstrip('=')
+
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+def _derive(password, salt, algorithm, params):
+    if algorithm == SCRYPT:
+        n, r, p = params
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r + 1024 * 1024, dklen=32)
+    if algorithm == PBKDF2:
+        (iterations,) = params
+        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    raise ValueError(f'Unknown password hash algorithm: {algorithm}')
+
+
+def hash_password(password, algorithm=SCRYPT, params=(2 ** 14, 8, 1)):
+    """``scrypt$n$r$p$salt$hash`` or ``pbkdf2_sha256$iterations$salt$hash``"""
+    if not password:
+        raise ValueError("Password cannot be empty")
+    salt = secrets.token_bytes(16)
+    derived = _derive(password, salt, algorithm, params)
+    fields = [algorithm, *map(str, params), _b64(salt), _b64(derived)]
+    return '$'.join(fields)
+
+
+def parse_hash(stored):
+    """``(algorithm, params)`` of a stored hash, ``(None, ())`` for legacy formats"""
+    parts = (stored or '').split('$')
+    try:
+        if parts[0] == SCRYPT and len(parts) == 6:
+            return SCRYPT, tuple(int(v) for v in parts[1:4])
+        if parts[0] == PBKDF2 and len(parts) == 4:
+            return PBKDF2, (int(parts[1]),)
+    except ValueError:
+        pass
+    return None, ()
+
+
+def verify_password(password, stored):
+    """Check a password against a KDF hash or one of the legacy formats.
+
+    Legacy formats are plaintext (what the API used to store), the
+    unsalted SHA-256 hex of the old admin seed and SecurityService's
+    ``sha256$salt$hash``. A stored hex digest is only ever compared as a
+    digest, so knowing it is not enough to log in.
+    """
+    if not password or not stored:
+        return False
+    algorithm, params = parse_hash(stored)
+    if algorithm:
+        parts = stored.split('$')
+        derived = _derive(password, _unb64(parts[-2]), algorithm, params)
+        return hmac.compare_digest(derived, _unb64(parts[-1]))
+
+    parts = stored.split('$')
+    if len(parts) == 3 and parts[0] == 'sha256':
+        digest = hashlib.sha256((password + parts[1]).encode()).hexdigest()
+        return hmac.compare_digest(digest, parts[2])
+    if SHA256_HEX.fullmatch(stored):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored.lower())
+    return hmac.compare_digest(password.encode(), stored.encode())
+
+
+class PasswordHasher:
+    """KDF hashing on a bounded pool of worker processes.
+
+    A scrypt or PBKDF2 call holds a CPU core for tens of milliseconds, so
+    it runs in ``workers`` separate processes and request threads just
+    wait for the result, served first come first served. At most
+    ``max_pending`` calls may be queued or running; beyond that
+    ``HasherBusy`` is raised at once so a login burst sheds load instead
+    of piling up behind the KDF. ``workers=0`` hashes inline in the
+    calling thread.
+    """
+
+    def __init__(self, algorithm=SCRYPT, scrypt_n=2 ** 14, scrypt_r=8, scrypt_p=1,
+                 pbkdf2_iterations=600000, workers=None, max_pending=None):
+        self.algorithm = algorithm
+        if algorithm == SCRYPT:
+            self.params = (scrypt_n, scrypt_r, scrypt_p)
+        elif algorithm == PBKDF2:
+            self.params = (pbkdf2_iterations,)
+        else:
+            raise ValueError(f'Unknown password hash algorithm: {algorithm}')
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = max_pending or max(self.workers, 1) * 16
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._dummy_hash = None
+        self._stats = {'hashed': 0, 'verified': 0, 'rehash_needed': 0, 'busy': 0}
+
+    def start(self):
+        """Start the worker processes now rather than on the first login"""
+        self._dummy()
+        if self.workers:
+            executor = self._get_executor()
+            for future in [executor.submit(os.getpid) for _ in range(self.workers)]:
+                future.result()
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def hash(self, password):
+        result = self._run(hash_password, password, self.algorithm, self.params)
+        self._stats['hashed'] += 1
+        return result
+
+    def hash_many(self, passwords):
+        """Hash a batch spread over all workers (bulk imports); one pending slot"""
+        passwords = list(passwords)
+        if not self.workers:
+            return [hash_password(p, self.algorithm, self.params) for p in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        hashes = self._on_pool(lambda executor: list(executor.map(
+            hash_password, passwords, repeat(self.algorithm), repeat(self.params),
+            chunksize=chunksize
+        )))
+        self._stats['hashed'] += len(hashes)
+        return hashes
+
+    def verify(self, password, stored):
+        """``(ok, needs_rehash)`` for a login attempt.
+
+        Pass ``stored=None`` for an unknown account: the KDF still runs,
+        against a throwaway hash with the current parameters, so response
+        time does not reveal which accounts exist.
+        """
+        if stored is None:
+            self._run(verify_password, password, self._dummy())
+            self._stats['verified'] += 1
+            return False, False
+        ok = self._run(verify_password, password, stored)
+        self._stats['verified'] += 1
+        rehash = ok and self.needs_rehash(stored)
+        if rehash:
+            self._stats['rehash_needed'] += 1
+        return ok, rehash
+
+    def needs_rehash(self, stored):
+        return parse_hash(stored) != (self.algorithm, self.params)
+
+    def _dummy(self):
+        if self._dummy_hash is None:
+            self._dummy_hash = hash_password(secrets.token_hex(16), self.algorithm, self.params)
+        return self._dummy_hash
+
+    def stats(self):
+        with self._pending_lock:
+            pending = self._pending
+        return dict(self._stats, algorithm=self.algorithm, params=list(self.params),
+                    workers=self.workers, pending=pending, max_pending=self.max_pending)
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        return self._on_pool(lambda executor: executor.submit(func, *args).result())
+
+    def _on_pool(self, call):
+        """``call(executor)`` in one pending slot, retried once on a fresh pool"""
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                self._stats['busy'] += 1
+                raise HasherBusy('Password hashing is overloaded')
+            self._pending += 1
+        try:
+            executor = self._get_executor()
+            try:
+                return call(executor)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool once
+                self._discard(executor)
+                return call(self._get_executor())
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+
+    def _discard(self, executor):
+        """Drop a broken pool, unless another thread already replaced it"""
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # fork: workers must not re-import the app module (spawn would)
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('fork') if 'fork' in methods else None
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._executor
+
+
+def create_hasher():
+    """PasswordHasher configured from PASSWORD_HASH_* / SCRYPT_* / PBKDF2_* variables"""
+    workers = os.getenv('PASSWORD_HASH_WORKERS')
+    return PasswordHasher(
+        algorithm=os.getenv('PASSWORD_HASH_ALGORITHM', SCRYPT),
+        scrypt_n=int(os.getenv('SCRYPT_N', 2 ** 14)),
+        scrypt_r=int(os.getenv('SCRYPT_R', 8)),
+        scrypt_p=int(os.getenv('SCRYPT_P', 1)),
+        pbkdf2_iterations=int(os.getenv('PBKDF2_ITERATIONS', 600000)),
+        workers=int(workers) if workers else None,
+        max_pending=int(os.getenv('PASSWORD_HASH_MAX_PENDING', 0)) or None,
+    )
@@ -0,0 +1,169 @@
+import ipaddress
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from functools import wraps
+
+from flask import jsonify, request
+
+from services.log_service import get_logger
+from services.metrics import RATE_LIMIT_DECISIONS
+
+log = get_logger('rate_limiter')
+
+Policy = namedtuple('Policy', 'rate burst global_rate global_burst')
+Decision = namedtuple('Decision', 'allowed retry_after reason')
+
+
+def policy_from_env(prefix, rate, burst, global_rate, global_burst):
+    """Policy with per-client and global buckets, overridable as ``<prefix>_RATE`` etc."""
+    return Policy(
+        rate=float(os.getenv(f'{prefix}_RATE', rate)),
+        burst=float(os.getenv(f'{prefix}_BURST', burst)),
+        global_rate=float(os.getenv(f'{prefix}_GLOBAL_RATE', global_rate)),
+        global_burst=float(os.getenv(f'{prefix}_GLOBAL_BURST', global_burst)),
+    )
+
+
+class RateLimiter:
+    """Token-bucket admission control shared by every worker process.
+
+    Each scope has one bucket per client and one global bucket, refilled
+    at ``rate`` tokens per second up to ``burst``. A request takes a token
+    from both or from neither, and is turned away with 429 and a
+    Retry-After the moment either is empty, so a burst costs the server a
+    few microseconds per rejected request instead of a worker and a
+    database connection.
+
+    Buckets live in a small SQLite file (WAL, no fsync) that all workers
+    on the host open, so the limits hold for the whole service rather
+    than per process. A check is one short write transaction. If the file
+    is locked for longer than ``busy_timeout_ms`` the request is let
+    through: the limiter sheds load, it must never become the outage.
+
+    Clients are told apart by address. X-Forwarded-For is only believed
+    on requests from ``trusted_proxies`` (addresses or networks), since
+    anyone else could send a fresh one with every request.
+    """
+
+    def __init__(self, name, path=None, enabled=True, trusted_proxies=(), busy_timeout_ms=50,
+                 idle_ttl=3600, prune_every=1000):
+        self.path = path or os.path.join(tempfile.gettempdir(), f'guardiantix-ratelimit-{name}.db')
+        self.enabled = enabled
+        self.trusted_proxies = [ipaddress.ip_network(proxy.strip(), strict=False)
+                                for proxy in trusted_proxies if proxy.strip()]
+        self.busy_timeout_ms = busy_timeout_ms
+        self.idle_ttl = idle_ttl
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._checks = 0
+
+    def _connection(self):
+        """One connection per thread and per worker process"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL'
+                ') WITHOUT ROWID'
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def check(self, scope, client, policy):
+        """Take a token from the client's and the global bucket of ``scope``"""
+        buckets = (
+            (f'{scope}:client:{client}', policy.rate, policy.burst, 'rejected_client'),
+            (f'{scope}:global', policy.global_rate, policy.global_burst, 'rejected_global'),
+        )
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                levels = []
+                for key, rate, burst, reason in buckets:
+                    row = conn.execute(
+                        'SELECT tokens, updated FROM buckets WHERE key = ?', (key,)
+                    ).fetchone()
+                    tokens = burst if row is None else min(burst, row[0] + max(0.0, now - row[1]) * rate)
+                    if tokens < 1:
+                        conn.execute('ROLLBACK')
+                        return self._decide(scope, Decision(False, (1 - tokens) / rate, reason))
+                    levels.append((key, tokens - 1, now))
+                conn.executemany(
+                    'INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)', levels
+                )
+                conn.execute('COMMIT')
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            log.warning("Rate limiter unavailable, admitting request", scope=scope, error=str(e))
+            return self._decide(scope, Decision(True, 0, 'error'))
+
+        self._checks += 1
+        if self._checks % self.prune_every == 0:
+            self.prune()
+        return self._decide(scope, Decision(True, 0, 'admitted'))
+
+    def _decide(self, scope, decision):
+        RATE_LIMIT_DECISIONS.inc(scope, decision.reason)
+        return decision
+
+    def prune(self):
+        """Forget buckets idle long enough to have refilled completely"""
+        try:
+            self._connection().execute(
+                'DELETE FROM buckets WHERE updated < ?', (time.time() - self.idle_ttl,)
+            )
+        except sqlite3.Error as e:
+            log.warning("Rate limiter prune failed", error=str(e))
+
+    def _trusted(self, address):
+        try:
+            address = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_proxies)
+
+    def client_id(self):
+        """The caller's address; forwarded hops are read right to left, each
+        only if the hop after it is a trusted proxy"""
+        client = request.remote_addr or 'unknown'
+        if not self._trusted(client):
+            return client
+        for hop in reversed(request.headers.get('X-Forwarded-For', '').split(',')):
+            hop = hop.strip()
+            if not hop:
+                continue
+            client = hop
+            if not self._trusted(hop):
+                break
+        return client
+
+    def limit(self, scope, policy, methods=('POST',)):
+        """Decorator: answer 429 with Retry-After when ``scope`` is over capacity"""
+        def decorator(f):
+            @wraps(f)
+            def decorated(*args, **kwargs):
+                if self.enabled and request.method in methods:
+                    decision = self.check(scope, self.client_id(), policy)
+                    if not decision.allowed:
+                        response = jsonify({'error': 'Too many requests, please try again shortly'})
+                        response.status_code = 429
+                        response.headers['Retry-After'] = str(max(1, math.ceil(decision.retry_after)))
+                        return response
+                return f(*args, **kwargs)
+            return decorated
+        return decorator
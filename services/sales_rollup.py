@@ -0,0 +1,172 @@
+import random
+import threading
+import time
+from datetime import date, datetime
+
+from services.log_service import get_logger
+
+log = get_logger('sales_rollup')
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        # SQLite hands DATE columns and DATE() results back as text
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class SalesRollup:
+    """Tickets, revenue and transaction counts per (day, concert).
+
+    ``sales_daily`` is maintained incrementally: ``record(cursor, rows)``
+    runs inside the transaction that inserts the transaction rows, so the
+    rollup can never disagree with them. Each call adds to one random of
+    ``shards`` rows per (day, concert), so API workers selling the same
+    concert today do not queue on one hot row (same idea as
+    ``stats_counters``). ``compact()`` runs every ``compact_interval``
+    seconds and folds the shards of finished days into a single row, so a
+    date-range query reads about one row per concert per day, however
+    many transactions the range holds.
+    """
+
+    def __init__(self, get_connection, shards=4, compact_interval=3600):
+        self._get_connection = get_connection
+        self.shards = shards
+        self.compact_interval = compact_interval
+        self._stats = {'recorded': 0, 'compactions': 0, 'compacted_groups': 0,
+                       'compact_errors': 0}
+
+    def record(self, cursor, rows):
+        """Add transaction rows to the rollup as part of the caller's transaction"""
+        totals = {}
+        for row in rows:
+            key = (_as_date(row['created_at']), row['event_id'])
+            tickets, revenue, count = totals.get(key, (0, 0, 0))
+            totals[key] = (tickets + row['quantity'], revenue + row['amount'], count + 1)
+
+        shard = random.randrange(self.shards)
+        for (day, concert_id), sums in sorted(totals.items()):
+            self._add(cursor, day, concert_id, shard, *sums)
+        self._stats['recorded'] += len(rows)
+
+    def _add(self, cursor, day, concert_id, shard, tickets, revenue, count):
+        now = datetime.now()
+        cursor.execute(
+            'UPDATE sales_daily SET tickets = tickets + %s, revenue = revenue + %s, '
+            'transactions = transactions + %s, updated_at = %s '
+            'WHERE day = %s AND concert_id = %s AND shard = %s',
+            (tickets, revenue, count, now, day, concert_id, shard)
+        )
+        if cursor.rowcount == 0:
+            cursor.execute(
+                'INSERT INTO sales_daily (day, concert_id, shard, tickets, revenue, '
+                'transactions, updated_at) VALUES (%s, %s, %s, %s, %s, %s, %s)',
+                (day, concert_id, shard, tickets, revenue, count, now)
+            )
+
+    def ensure_seeded(self, cursor):
+        """Build the rollup from the transactions table if it is empty; True if
+        that found any sales"""
+        cursor.execute('SELECT COUNT(*) FROM sales_daily')
+        if cursor.fetchone()[0]:
+            return False
+        return self.rebuild(cursor) > 0
+
+    def rebuild(self, cursor):
+        """Recompute the whole rollup from ``transactions`` (caller commits).
+
+        Ticket counts come from the matching ticket holds, since a
+        transaction's id is the id of the hold it confirmed.
+        """
+        cursor.execute(
+            'SELECT DATE(t.created_at), t.event_id, COALESCE(SUM(h.quantity), 0), '
+            'SUM(t.amount), COUNT(*) FROM transactions t '
+            'LEFT JOIN ticket_holds h ON h.hold_id = t.transaction_id '
+            'WHERE t.event_id IS NOT NULL GROUP BY DATE(t.created_at), t.event_id'
+        )
+        rows = cursor.fetchall()
+        now = datetime.now()
+        cursor.execute('DELETE FROM sales_daily')
+        cursor.executemany(
+            'INSERT INTO sales_daily (day, concert_id, shard, tickets, revenue, transactions, '
+            'updated_at) VALUES (%s, %s, 0, %s, %s, %s, %s)',
+            [(_as_date(day), concert_id, int(tickets), int(revenue), count, now)
+             for day, concert_id, tickets, revenue, count in rows]
+        )
+        return len(rows)
+
+    def compact(self, before=None, limit=1000):
+        """Fold the shards of days before ``before`` (default today) into shard 0.
+
+        A shard row is only deleted if it still holds the values just read,
+        so a late ``record()`` into the same day is never lost.
+        """
+        before = before or date.today()
+        conn = self._get_connection()
+        if not conn:
+            return 0
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                'SELECT DISTINCT day, concert_id FROM sales_daily '
+                'WHERE day < %s AND shard > 0 LIMIT %s',
+                (before, limit)
+            )
+            groups = cursor.fetchall()
+            for day, concert_id in groups:
+                cursor.execute(
+                    'SELECT shard, tickets, revenue, transactions FROM sales_daily '
+                    'WHERE day = %s AND concert_id = %s AND shard > 0',
+                    (day, concert_id)
+                )
+                moved = [0, 0, 0]
+                for shard, tickets, revenue, count in cursor.fetchall():
+                    cursor.execute(
+                        'DELETE FROM sales_daily WHERE day = %s AND concert_id = %s AND shard = %s '
+                        'AND tickets = %s AND revenue = %s AND transactions = %s',
+                        (day, concert_id, shard, tickets, revenue, count)
+                    )
+                    if cursor.rowcount == 1:
+                        moved = [moved[0] + tickets, moved[1] + revenue, moved[2] + count]
+                self._add(cursor, day, concert_id, 0, *moved)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        self._stats['compactions'] += 1
+        self._stats['compacted_groups'] += len(groups)
+        return len(groups)
+
+    def query(self, cursor, date_from, date_to, concert_id=None):
+        """``[(day, concert_id, tickets, revenue, transactions)]`` for a date range"""
+        sql = ('SELECT day, concert_id, SUM(tickets), SUM(revenue), SUM(transactions) '
+               'FROM sales_daily WHERE day >= %s AND day <= %s')
+        params = [date_from, date_to]
+        if concert_id is not None:
+            sql += ' AND concert_id = %s'
+            params.append(concert_id)
+        cursor.execute(sql + ' GROUP BY day, concert_id ORDER BY day, concert_id', params)
+        return [(_as_date(day), cid, int(tickets), int(revenue), int(count))
+                for day, cid, tickets, revenue, count in cursor.fetchall()]
+
+    def stats(self):
+        return dict(self._stats)
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True, name='sales-compactor').start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.compact_interval)
+            try:
+                compacted = self.compact()
+                if compacted:
+                    log.info("Compacted daily sales rollup", groups=compacted)
+            except Exception as e:
+                self._stats['compact_errors'] += 1
+                log.error("Sales rollup compaction failed", error=str(e))
@@ -1,51 +1,28 @@
-import hashlib
-import secrets
 import re
 
+from services.log_service import get_logger
+from services.password_hasher import hash_password, verify_password
+
+log = get_logger('security_service')
+
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[A-Za-z]{2,}")
+
 class SecurityService:
     def __init__(self):
-        # Tidak perlu bcrypt, pakai built-in hashlib
-        print("🔒 Using built-in hashing (no bcrypt)")
+        # Tidak perlu bcrypt, pakai built-in hashlib (scrypt)
+        log.debug("Using hashlib scrypt for passwords")
     
     def hash_password(self, password):
-        """Hash password dengan SHA-256 + salt"""
-        if not password:
-            raise ValueError("Password cannot be empty")
-        
-        # Generate random salt
-        salt = secrets.token_hex(16)
-        # Hash password + salt
-        hashed = hashlib.sha256((password + salt).encode('utf-8')).hexdigest()
-        
-        # Format: algorithm$salt$hash
-        return f"sha256${salt}${hashed}"
+        """Hash password dengan scrypt + salt (format: scrypt$n$r$p$salt$hash)"""
+        return hash_password(password)
     
     def verify_password(self, password, hashed_password):
-        """Verify password dengan multiple algorithm support"""
+        """Verify password; also accepts legacy sha256$salt$hash and plaintext"""
         try:
-            if not password or not hashed_password:
-                return False
-            
-            # Check jika masih plaintext (existing users)
-            if not hashed_password.startswith('sha256$'):
-                # Fallback: compare plaintext untuk backward compatibility
-                return password == hashed_password
-            
-            # Extract salt dan hash dari stored password
-            parts = hashed_password.split('$')
-            if len(parts) == 3:
-                algorithm, salt, stored_hash = parts
-                if algorithm == 'sha256':
-                    # Hash input password dengan salt yang sama
-                    new_hash = hashlib.sha256((password + salt).encode('utf-8')).hexdigest()
-                    return new_hash == stored_hash
-            
-            return False
-            
+            return verify_password(password, hashed_password)
         except Exception as e:
-            print(f"Password verification error: {e}")
-            # Fallback ke plaintext comparison
-            return password == hashed_password
+            log.warning("Password verification error", error=str(e))
+            return False
     
     def sanitize_input(self, input_string):
         """Basic input sanitization untuk prevent injection"""
@@ -57,6 +34,10 @@ class SecurityService:
             sanitized = sanitized.replace(char, '')
         return sanitized.strip()
     
+    def is_valid_email(self, email):
+        """Cek format email sederhana (local@domain.tld)"""
+        return bool(email) and len(email) <= 255 and EMAIL_PATTERN.fullmatch(email) is not None
+    
     def is_password_strong(self, password):
         """Validasi kekuatan password"""
         if len(password) < 8:
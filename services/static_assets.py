@@ -0,0 +1,91 @@
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import abort, request, send_from_directory, url_for
+
+from services.log_service import get_logger
+
+log = get_logger('static_assets')
+
+DIST = 'dist'
+MANIFEST = 'manifest.json'
+# Preferred first when the client accepts both
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class AssetManifest:
+    """Fingerprinted assets written by scripts/build_assets.py.
+
+    ``url('css/admin.css')`` gives ``/static/dist/css/admin.<hash>.css``
+    when the file was built, and the plain ``/static/...`` URL otherwise,
+    so templates keep working on a checkout that never ran the build.
+    ``version`` fingerprints the manifest and so changes with every build.
+    ``send(name)`` serves a hashed file with a one-year immutable cache
+    header, picking the precompressed .br / .gz sibling the client accepts
+    instead of compressing per request.
+    """
+
+    def __init__(self, static_folder):
+        self.dist = os.path.join(static_folder, DIST)
+        self.assets = {}
+        self.encodings = {}
+        self.variants = {}
+        self.version = None
+        self._served = set()
+        self.load()
+
+    def load(self):
+        path = os.path.join(self.dist, MANIFEST)
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            log.info("No asset manifest, serving unhashed static files", path=path)
+            return False
+        manifest = json.loads(raw)
+        self.version = hashlib.sha256(raw).hexdigest()[:12]
+        self.assets = manifest.get('assets', {})
+        self.encodings = manifest.get('encodings', {})
+        self.variants = manifest.get('variants', {})
+        self._served = set(self.assets.values())
+        self._served.update(v['path'] for found in self.variants.values() for v in found)
+        log.info("Asset manifest loaded", assets=len(self.assets), path=path)
+        return True
+
+    def url(self, filename):
+        hashed = self.assets.get(filename)
+        if hashed is None:
+            return url_for('static', filename=filename)
+        return url_for('static', filename=f'{DIST}/{hashed}')
+
+    def srcset(self, filename, type=None):
+        """``srcset`` value for an image's resized variants, optionally one MIME type"""
+        return ', '.join(
+            f"{url_for('static', filename=DIST + '/' + v['path'])} {v['width']}w"
+            for v in self.variants.get(filename, ())
+            if type is None or v['type'] == type
+        )
+
+    def send(self, name):
+        if name not in self._served:
+            abort(404)
+        accepted = self.encodings.get(name, ())
+        encoding = request.accept_encodings.best_match(
+            [enc for enc, _ in ENCODINGS if enc in accepted]
+        ) if accepted else None
+        suffix = dict(ENCODINGS).get(encoding, '')
+        response = send_from_directory(
+            self.dist, name + suffix,
+            mimetype=mimetypes.guess_type(name)[0] or 'application/octet-stream',
+            max_age=IMMUTABLE_MAX_AGE
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if accepted:
+            response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
@@ -0,0 +1,174 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from services.log_service import get_logger
+
+log = get_logger('stats_service')
+
+STAT_NAMES = (
+    'total_users',
+    'total_concerts',
+    'recent_users',
+    'total_tickets_sold',
+    'total_revenue',
+    'pending_transactions',
+)
+
+
+class StatsService:
+    """Precomputed admin dashboard statistics.
+
+    Counters live in ``stats_counters`` as ``shards`` rows per name. Writers
+    call ``bump(cursor, ...)`` inside their own transaction and add to one
+    random shard, so concurrent purchases do not queue on a single hot
+    row. Reads sum the shards (a fixed number of rows) and are cached in
+    process for ``cache_ttl`` seconds. ``recent_users`` is a sliding window
+    and is recomputed every ``refresh_interval`` seconds instead.
+    """
+
+    def __init__(self, get_connection, shards=16, refresh_interval=60, cache_ttl=2,
+                 recent_days=7):
+        self._get_connection = get_connection
+        self.shards = shards
+        self.refresh_interval = refresh_interval
+        self.cache_ttl = cache_ttl
+        self.recent_days = recent_days
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._snapshot_at = 0
+        # Last sliding-window count this process wrote (part of the stats ETag)
+        self.recent_users = None
+
+    def bump(self, cursor, **deltas):
+        """Add deltas to the counters as part of the caller's transaction"""
+        shard = random.randrange(self.shards)
+        now = datetime.now()
+        for name, delta in deltas.items():
+            if delta:
+                cursor.execute(
+                    'UPDATE stats_counters SET value = value + %s, updated_at = %s '
+                    'WHERE name = %s AND shard = %s',
+                    (delta, now, name, shard)
+                )
+
+    def ensure_seeded(self, cursor):
+        """Build the counters from scratch if the table is empty"""
+        cursor.execute('SELECT COUNT(*) FROM stats_counters')
+        if cursor.fetchone()[0] < len(STAT_NAMES) * self.shards:
+            self.rebuild(cursor)
+            return True
+        return False
+
+    def rebuild(self, cursor):
+        """Recompute every counter from the source tables (caller commits)"""
+        totals = self._compute(cursor)
+        now = datetime.now()
+        cursor.execute('DELETE FROM stats_counters')
+        cursor.executemany(
+            'INSERT INTO stats_counters (name, shard, value, updated_at) VALUES (%s, %s, %s, %s)',
+            [(name, shard, totals[name] if shard == 0 else 0, now)
+             for name in STAT_NAMES for shard in range(self.shards)]
+        )
+        self.invalidate()
+
+    def refresh_recent_users(self):
+        conn = self._get_connection()
+        if not conn:
+            return
+        cursor = conn.cursor()
+        try:
+            cutoff = datetime.now() - timedelta(days=self.recent_days)
+            cursor.execute('SELECT COUNT(*) FROM users WHERE join_date >= %s', (cutoff,))
+            recent = cursor.fetchone()[0]
+            self.recent_users = recent
+            cursor.execute(
+                'UPDATE stats_counters SET value = CASE WHEN shard = 0 THEN %s ELSE 0 END, '
+                'updated_at = %s WHERE name = %s',
+                (recent, datetime.now(), 'recent_users')
+            )
+            conn.commit()
+            self.invalidate()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def snapshot(self):
+        """Current statistics plus an ``as_of`` freshness timestamp"""
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._snapshot_at < self.cache_ttl:
+                return self._snapshot
+
+        conn = self._get_connection()
+        if not conn:
+            raise ConnectionError('Database connection failed')
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                'SELECT name, SUM(value), MAX(updated_at) FROM stats_counters GROUP BY name'
+            )
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+
+        stats = {name: 0 for name in STAT_NAMES}
+        freshness = {}
+        for name, value, updated_at in rows:
+            stats[name] = int(value or 0)
+            freshness[name] = updated_at
+        stats['as_of'] = _isoformat(max(freshness.values(), default=None))
+        stats['recent_users_as_of'] = _isoformat(freshness.get('recent_users'))
+
+        with self._lock:
+            self._snapshot = stats
+            self._snapshot_at = time.monotonic()
+        return stats
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True, name='stats-refresher').start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh_recent_users()
+            except Exception as e:
+                log.error("Stats refresh failed", error=str(e))
+
+    def _compute(self, cursor):
+        cutoff = datetime.now() - timedelta(days=self.recent_days)
+        queries = {
+            'total_users': ('SELECT COUNT(*) FROM users', ()),
+            'total_concerts': ('SELECT COUNT(*) FROM concerts', ()),
+            'recent_users': ('SELECT COUNT(*) FROM users WHERE join_date >= %s', (cutoff,)),
+            'total_tickets_sold': (
+                'SELECT COALESCE(SUM(quantity), 0) FROM ticket_holds WHERE status = %s',
+                ('confirmed',)
+            ),
+            'total_revenue': (
+                'SELECT COALESCE(SUM(h.quantity * c.price), 0) FROM ticket_holds h '
+                'JOIN concerts c ON c.id = h.concert_id WHERE h.status = %s',
+                ('confirmed',)
+            ),
+            'pending_transactions': (
+                'SELECT COUNT(*) FROM ticket_holds WHERE status = %s', ('held',)
+            ),
+        }
+        totals = {}
+        for name, (sql, params) in queries.items():
+            cursor.execute(sql, params)
+            totals[name] = int(cursor.fetchone()[0] or 0)
+        return totals
+
+
+def _isoformat(value):
+    if isinstance(value, str):
+        # SQLite hands aggregates of DATETIME columns back as text
+        return value.replace(' ', 'T', 1)
+    return value.isoformat() if hasattr(value, 'isoformat') else value
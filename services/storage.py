@@ -0,0 +1,211 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+
+class MySQLBackend:
+    """MySQL through mysql.connector (the default, used by docker-compose)"""
+
+    name = 'mysql'
+
+    def __init__(self, config):
+        import mysql.connector
+        self._connector = mysql.connector
+        self.config = config
+        self.Error = mysql.connector.Error
+        self.IntegrityError = mysql.connector.IntegrityError
+
+    def connect(self):
+        return self._connector.connect(**self.config)
+
+    def describe(self):
+        return {'backend': self.name, 'host': self.config.get('host'),
+                'database': self.config.get('database')}
+
+    def acquire_lock(self, cursor, name, timeout):
+        """Cross-process named lock held by this connection"""
+        cursor.execute('SELECT GET_LOCK(%s, %s)', (name, timeout))
+        return cursor.fetchone()[0] == 1
+
+    def release_lock(self, cursor, name):
+        cursor.execute('SELECT RELEASE_LOCK(%s)', (name,))
+        cursor.fetchone()
+
+    def begin_read(self, cursor):
+        """Pin one snapshot for the following SELECTs (ended by rollback)"""
+        cursor.execute('START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY')
+
+    def index_exists(self, cursor, table, name):
+        cursor.execute(
+            'SELECT COUNT(*) FROM information_schema.statistics '
+            'WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s',
+            (table, name)
+        )
+        return cursor.fetchone()[0] > 0
+
+
+@lru_cache(maxsize=1024)
+def _translate(sql):
+    """MySQL-flavoured SQL as used by database_api -> SQLite"""
+    sql = sql.replace('%s', '?').replace('%%', '%')
+    return sql.replace('INT AUTO_INCREMENT PRIMARY KEY', 'INTEGER PRIMARY KEY AUTOINCREMENT')
+
+
+def _parse_datetime(value):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+class SQLiteCursor:
+    """DB-API cursor speaking the ``%s`` paramstyle, optionally returning dicts"""
+
+    def __init__(self, raw, dictionary=False):
+        self._raw = raw
+        self._dictionary = dictionary
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def execute(self, sql, params=()):
+        self._raw.execute(_translate(sql), params or ())
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._raw.executemany(_translate(sql), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._row(self._raw.fetchone())
+
+    def fetchmany(self, size=None):
+        rows = self._raw.fetchmany(size) if size else self._raw.fetchmany()
+        return [self._row(row) for row in rows]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._raw.fetchall()]
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip([column[0] for column in self._raw.description], row))
+
+
+class SQLiteConnection:
+    """sqlite3 connection with the mysql.connector surface database_api uses"""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self._raw.cursor(), dictionary)
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        self._raw.close()
+
+    def ping(self, reconnect=False):
+        self._raw.execute('SELECT 1').fetchone()
+
+    @property
+    def in_transaction(self):
+        return self._raw.in_transaction
+
+
+class SQLiteBackend:
+    """Embedded single-node storage in one SQLite file.
+
+    Tuned for many readers and one writer at a time: WAL journaling so
+    reads never wait for the writer, a busy timeout instead of instant
+    "database is locked" errors, and write transactions that start with
+    BEGIN IMMEDIATE so two writers queue on the lock up front rather than
+    deadlock while upgrading. Each pooled connection belongs to one
+    thread at a time and keeps its own compiled-statement cache.
+    """
+
+    name = 'sqlite'
+    Error = sqlite3.Error
+    IntegrityError = sqlite3.IntegrityError
+
+    def __init__(self, path, busy_timeout_ms=5000, cache_kib=20000, statement_cache=256):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_kib = cache_kib
+        self.statement_cache = statement_cache
+        self._wal_lock = threading.Lock()
+        self._wal_ready = False
+        sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+        sqlite3.register_converter('DATETIME', _parse_datetime)
+        sqlite3.register_converter('TIMESTAMP', _parse_datetime)
+
+    def connect(self):
+        raw = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level='IMMEDIATE',
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            cached_statements=self.statement_cache,
+        )
+        with self._wal_lock:
+            if not self._wal_ready:
+                # Persistent in the database file, only needs setting once
+                raw.execute('PRAGMA journal_mode=WAL')
+                self._wal_ready = True
+        raw.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        raw.execute('PRAGMA synchronous=NORMAL')
+        raw.execute(f'PRAGMA cache_size=-{int(self.cache_kib)}')
+        raw.execute('PRAGMA temp_store=MEMORY')
+        return SQLiteConnection(raw)
+
+    def describe(self):
+        return {'backend': self.name, 'path': self.path}
+
+    def acquire_lock(self, cursor, name, timeout):
+        """The database write lock doubles as the named lock (held until commit)"""
+        cursor.execute('BEGIN IMMEDIATE')
+        return True
+
+    def release_lock(self, cursor, name):
+        cursor.connection.rollback()
+
+    def begin_read(self, cursor):
+        """Deferred transaction: the SELECTs share one WAL snapshot, no write lock"""
+        cursor.execute('BEGIN')
+
+    def index_exists(self, cursor, table, name):
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND name = %s",
+            (table, name)
+        )
+        return cursor.fetchone()[0] > 0
+
+
+def create_backend(name=None, mysql_config=None):
+    """Backend selected by ``STORAGE_BACKEND`` (``mysql`` or ``sqlite``)"""
+    name = (name or os.getenv('STORAGE_BACKEND', 'mysql')).lower()
+    if name == 'sqlite':
+        return SQLiteBackend(
+            os.getenv('SQLITE_PATH', 'guardiantix.db'),
+            busy_timeout_ms=int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+            cache_kib=int(os.getenv('SQLITE_CACHE_KIB', 20000)),
+        )
+    if name == 'mysql':
+        return MySQLBackend(mysql_config or {})
+    raise ValueError(f'Unknown STORAGE_BACKEND: {name}')
@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """Bounded LRU of verified JWT claims keyed by a SHA-256 token digest.
+
+    An entry lives until the token's ``exp`` claim (capped at ``max_ttl``),
+    so a hit skips the HMAC verification entirely. ``revoke_user`` drops a
+    user's cached tokens and rejects every token issued to them before the
+    revocation; revocations are kept per process.
+    """
+
+    def __init__(self, max_size=10000, max_ttl=3600):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._by_user = {}
+        self._revoked_before = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'revoked': 0}
+
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token):
+        key = self.digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            claims, expires_at = entry
+            if expires_at <= now:
+                self._remove(key, claims)
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return claims
+
+    def put(self, token, claims):
+        now = time.time()
+        expires_at = min(claims.get('exp', now + self.max_ttl), now + self.max_ttl)
+        if expires_at <= now:
+            return
+        key = self.digest(token)
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            self._by_user.setdefault(claims.get('user_id'), set()).add(key)
+            while len(self._entries) > self.max_size:
+                old_key, (old_claims, _) = self._entries.popitem(last=False)
+                self._unindex(old_key, old_claims)
+                self._stats['evictions'] += 1
+
+    def is_revoked(self, claims):
+        with self._lock:
+            revoked_at = self._revoked_before.get(claims.get('user_id'))
+        if revoked_at is None:
+            return False
+        if claims.get('iat', 0) < revoked_at:
+            with self._lock:
+                self._stats['revoked'] += 1
+            return True
+        return False
+
+    def revoke_user(self, user_id):
+        """Forget cached tokens of a user and reject tokens issued before now"""
+        now = time.time()
+        with self._lock:
+            # Tokens older than max_ttl have expired anyway
+            for stale in [uid for uid, at in self._revoked_before.items() if at < now - self.max_ttl]:
+                del self._revoked_before[stale]
+            self._revoked_before[user_id] = now
+            for key in self._by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), max_size=self.max_size)
+
+    def _remove(self, key, claims):
+        self._entries.pop(key, None)
+        self._unindex(key, claims)
+
+    def _unindex(self, key, claims):
+        keys = self._by_user.get(claims.get('user_id'))
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[claims.get('user_id')]
@@ -5,12 +5,13 @@ document.addEventListener('DOMContentLoaded', function() {
 
 async function checkAuthAndInitialize() {
     try {
-        const response = await fetch('/api/auth/check');
+        // One round trip: auth, stats, users, events and transactions
+        const response = await fetch('/api/admin/dashboard');
         const data = await response.json();
         
         if (data.authenticated && data.user.role === 'admin') {
             initializeAdminPanel();
-            loadDashboardData();
+            renderDashboard(data);
         } else {
             window.location.href = '/login';
         }
@@ -20,6 +21,23 @@ async function checkAuthAndInitialize() {
     }
 }
 
+function renderDashboard(data) {
+    if (data.stats.data) {
+        updateDashboardStats(data.stats.data);
+    } else {
+        console.error('Error loading stats:', data.stats.error);
+    }
+    if (data.users.data) {
+        loadedUsers = data.users.data;
+        usersNextCursor = data.users.next_cursor || null;
+        renderUsersTable(loadedUsers);
+    }
+    if (data.concerts.data) {
+        renderEventsTable(data.concerts.data);
+    }
+    renderTransactionsTable(data.transactions.data || []);
+}
+
 function initializeAdminPanel() {
     document.body.style.opacity = '1';
     document.body.style.transition = 'opacity 0.5s ease';
@@ -86,12 +104,21 @@ function showSection(id) {
 }
 
 // ... sisa kode ...
-async function loadUsersData() {
+const USERS_PAGE_SIZE = 50;
+let loadedUsers = [];
+let usersNextCursor = null;
+
+async function loadUsersData(append = false) {
     try {
-        const response = await fetch('/api/admin/users');
+        const params = new URLSearchParams({ limit: USERS_PAGE_SIZE });
+        if (append && usersNextCursor) params.set('after', usersNextCursor);
+
+        const response = await fetch(`/api/admin/users?${params}`);
         if (response.ok) {
             const users = await response.json();
-            renderUsersTable(users);
+            loadedUsers = append ? loadedUsers.concat(users) : users;
+            usersNextCursor = response.headers.get('X-Next-Cursor');
+            renderUsersTable(loadedUsers);
         }
     } catch (error) {
         console.error('Error loading users:', error);
@@ -139,6 +166,9 @@ function renderUsersTable(users) {
     });
     
     tableHTML += `</table></div>`;
+    if (usersNextCursor) {
+        tableHTML += `<button class="btn-secondary" onclick="loadUsersData(true)" style="margin-top: 15px;">Load more</button>`;
+    }
     usersSection.innerHTML = tableHTML;
 }
 
@@ -227,17 +257,17 @@ function renderTransactionsTable(transactions) {
     } else {
         // Tampilan JIKA ADA DATA
         transactions.forEach(tx => {
-            const txDate = new Date(tx.date).toLocaleDateString();
-            const statusClass = tx.status === 'Completed' ? 'status-paid' : 'status-pending';
-            const priceFormatted = new Intl.NumberFormat('id-ID', { style: 'currency', currency: 'IDR', minimumFractionDigits: 0 }).format(tx.total_price);
+            const txDate = new Date(tx.created_at).toLocaleDateString();
+            const statusClass = tx.status === 'completed' ? 'status-paid' : 'status-pending';
+            const priceFormatted = new Intl.NumberFormat('id-ID', { style: 'currency', currency: 'IDR', minimumFractionDigits: 0 }).format(tx.amount);
 
             tableBodyHTML += `
                 <tr>
                     <td>${tx.id}</td>
-                    <td>${tx.buyer_name}</td>
-                    <td>${tx.ticket_type}</td>
+                    <td>${tx.username || '-'}</td>
+                    <td>${tx.event_name || '-'}</td>
                     <td>${priceFormatted}</td>
-                    <td>${tx.payment_method}</td>
+                    <td>${tx.payment_method || '-'}</td>
                     <td>${txDate}</td>
                     <td class="${statusClass}">${tx.status}</td>
                     <td>
@@ -160,16 +160,12 @@ class BookingModal {
 
   confirm(){
     if(this.selectedTicket && this.selectedConcert){
-      const ticketData = {
-        concert: this.selectedConcert.title,
-        artist: this.selectedConcert.artist,
-        city: this.selectedConcert.city,
-        date: this.selectedConcert.date,
-        venue: this.selectedConcert.venue,
+      const params = new URLSearchParams({
+        concert_id: this.selectedConcert.id,
         type: this.selectedTicket,
         price: this.getPrice(this.selectedTicket)
-      };
-      window.location.href = `./payment.html?data=${encodeURIComponent(JSON.stringify(ticketData))}`;
+      });
+      window.location.href = `/payment?${params}`;
     } else {
       alert('Please select a ticket type first.');
     }
@@ -6,6 +6,7 @@ class BookingModal {
         this.closeBtn = this.modal.querySelector(".close"); // tombol X di modal
         this.selectedType = null;
         this.selectedPrice = null;
+        this.concertId = null;
 
         // Tutup modal kalau klik tombol close
         this.closeBtn.onclick = () => {
@@ -20,7 +21,9 @@ class BookingModal {
         };
     }
 
-    open(city) {
+    open(city, concertId) {
+        this.concertId = concertId;
+
         // Set nama kota di modal (kalau ada elemen #modalCity)
         const citySpan = this.modal.querySelector("#modalCity");
         if (citySpan) {
@@ -52,7 +55,7 @@ class BookingModal {
         }
 
         // Redirect ke halaman payment dengan data di URL
-        const url = `/payment?type=${encodeURIComponent(this.selectedType)}&price=${encodeURIComponent(this.selectedPrice)}`;
+        const url = `/payment?concert_id=${this.concertId}&type=${encodeURIComponent(this.selectedType)}&price=${encodeURIComponent(this.selectedPrice)}`;
         window.location.href = url;
     }
 }
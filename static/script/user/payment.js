@@ -1,28 +1,95 @@
 class Payment {
+  constructor() {
+    this.params = new URLSearchParams(window.location.search);
+  }
+
+  showTicket() {
+    document.getElementById("ticketType").innerText = this.params.get("type") || "";
+    document.getElementById("ticketPrice").innerText = this.params.get("price") || "";
+  }
+
   chooseMethod(method) {
     const details = document.getElementById("paymentDetails");
-    details.innerHTML = "";
+    const confirmBtn = document.getElementById("confirmBtn");
 
     if (method === "QR") {
       details.innerHTML = `
-        <h3>📲 Pay with QRIS</h3>
-        <p>Scan the QR code below with your e-wallet app:</p>
-        <img src="/static/img/qris.png" alt="QRIS Payment" style="width:200px; margin-top:10px;">
+        <h3>Scan QR to Pay</h3>
+        <div class="qr-dummy">
+        █▀▀█ █▀▀ █▀▀█<br>
+        █▄▄█ █▀▀ █▄▄▀<br>
+        ▀░░▀ ▀▀▀ ▀░▀▀
+        </div>
+        <p style="margin-top:10px;">Use any supported e-wallet app to scan this magical QR.</p>
       `;
-    } else if (method === "VA") {
+      details.style.display = "block";
+      confirmBtn.disabled = false;
+    } else if (method === "Virtual Account") {
       details.innerHTML = `
-        <h3>🏦 Pay with Virtual Account</h3>
-        <p>Transfer to this VA number:</p>
-        <div class="va-box">1234 5678 9012 3456</div>
-        <small>Use your bank app or ATM to complete payment</small>
+        <h3>Virtual Account Number</h3>
+        <p>Bank: Guardian Bank</p>
+        <p>VA Number: <strong>1234-5678-9012-3456</strong></p>
       `;
+      details.style.display = "block";
+      confirmBtn.disabled = false;
+    } else {
+      details.innerHTML = "";
+      details.style.display = "none";
+      confirmBtn.disabled = true;
     }
   }
 
-  confirm() {
-    alert("✅ Payment completed successfully! Your ticket has been reserved.");
-    window.location.href = "/"; 
+  async confirm() {
+    const concertId = parseInt(this.params.get("concert_id"), 10);
+    const quantity = parseInt(this.params.get("quantity") || "1", 10);
+    const method = document.getElementById("method").value;
+    if (!method) {
+      alert("⚠️ Silakan pilih metode pembayaran terlebih dahulu!");
+      return;
+    }
+    if (!concertId) {
+      alert("⚠️ No concert selected.");
+      return;
+    }
+
+    // Reuse the same key on retries so a double click never books twice
+    const storageKey = `guardiantix_order_${concertId}_${quantity}`;
+    let idempotencyKey = sessionStorage.getItem(storageKey);
+    if (!idempotencyKey) {
+      idempotencyKey = crypto.randomUUID();
+      sessionStorage.setItem(storageKey, idempotencyKey);
+    }
+
+    try {
+      const response = await fetch("/api/tickets/purchase", {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "Idempotency-Key": idempotencyKey
+        },
+        body: JSON.stringify({
+          concert_id: concertId,
+          quantity: quantity,
+          payment_method: method
+        })
+      });
+      const result = await response.json();
+
+      if (response.ok) {
+        sessionStorage.removeItem(storageKey);
+        window.location.href = `/success?order=${encodeURIComponent(result.hold_id)}` +
+          `&method=${encodeURIComponent(method)}`;
+      } else if (response.status === 409) {
+        sessionStorage.removeItem(storageKey);
+        alert("❌ Sorry, not enough tickets left for this concert.");
+      } else {
+        alert(`❌ ${result.error || "Payment failed, please try again."}`);
+      }
+    } catch (error) {
+      alert("❌ Network error, please try again.");
+    }
   }
 }
 
 const payment = new Payment();
+document.addEventListener("DOMContentLoaded", () => payment.showTicket());
@@ -0,0 +1,50 @@
+"""Runs the database API in-process against a throwaway SQLite file."""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ['STORAGE_BACKEND'] = 'sqlite'
+os.environ['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='guardiantix-test-'), 'test.db')
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+os.environ.setdefault('SCRYPT_N', '1024')
+os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+PASSWORD = 'Test-Passw0rd!'
+
+
+@pytest.fixture(scope='session')
+def api():
+    import database_api
+    assert database_api.ready.wait(30), 'database API did not start'
+    return database_api
+
+
+@pytest.fixture(scope='session')
+def client(api):
+    return api.app.test_client()
+
+
+def login(client, identifier, password):
+    response = client.post('/api/login', json={'identifier': identifier, 'password': password})
+    assert response.status_code == 200, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+
+@pytest.fixture(scope='session')
+def admin_headers(client):
+    return login(client, 'admin@guardiantix.com', 'admin123')
+
+
+@pytest.fixture(scope='session')
+def user_headers(client):
+    response = client.post('/api/users', json={
+        'username': 'plain_user', 'email': 'plain@guardiantix.test', 'password': PASSWORD
+    })
+    assert response.status_code == 201, response.get_json()
+    return login(client, 'plain@guardiantix.test', PASSWORD)
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from conftest import PASSWORD
+
+IMPORT_BODY = json.dumps({'username': 'minted', 'email': 'minted@guardiantix.test',
+                          'password': PASSWORD, 'role': 'admin'})
+
+ADMIN_ROUTES = [
+    ('post', '/api/admin/users/import', {'data': IMPORT_BODY,
+                                         'content_type': 'application/x-ndjson'}),
+    ('get', '/api/admin/users/export', {}),
+    ('get', '/api/admin/transactions', {}),
+    ('get', '/api/admin/analytics/sales', {}),
+    ('get', '/api/admin/users', {}),
+    ('get', '/api/admin/stats', {}),
+    ('put', '/api/admin/users/1', {'json': {'role': 'user'}}),
+    ('delete', '/api/admin/users/1', {}),
+]
+
+
+@pytest.mark.parametrize('method, url, kwargs', ADMIN_ROUTES)
+def test_non_admin_is_forbidden(client, user_headers, method, url, kwargs):
+    response = getattr(client, method)(url, headers=user_headers, **kwargs)
+    assert response.status_code == 403
+    assert response.get_json() == {'error': 'Admin access required'}
+
+
+@pytest.mark.parametrize('method, url, kwargs', ADMIN_ROUTES)
+def test_missing_token_is_unauthorized(client, method, url, kwargs):
+    assert getattr(client, method)(url, **kwargs).status_code == 401
+
+
+def test_admin_can_export(client, admin_headers):
+    response = client.get('/api/admin/users/export', headers=admin_headers)
+    assert response.status_code == 200
+    emails = {json.loads(line)['email'] for line in response.get_data(as_text=True).splitlines()}
+    assert 'admin@guardiantix.com' in emails
+
+
+def test_non_admin_import_creates_nothing(client, admin_headers, user_headers):
+    client.post('/api/admin/users/import', headers=user_headers, data=IMPORT_BODY,
+                content_type='application/x-ndjson')
+    export = client.get('/api/admin/users/export', headers=admin_headers)
+    assert 'minted@guardiantix.test' not in export.get_data(as_text=True)
+
+
+def test_user_cannot_promote_themselves(client, admin_headers, user_headers):
+    user_id = client.post('/api/login', json={'identifier': 'plain@guardiantix.test',
+                                              'password': PASSWORD}).get_json()['user']['id']
+    response = client.put(f'/api/admin/users/{user_id}', headers=user_headers, json={'role': 'admin'})
+    assert response.status_code == 403
+    users = client.get('/api/admin/users', headers=admin_headers).get_json()
+    assert {user['id']: user['role'] for user in users}[user_id] == 'user'
@@ -0,0 +1,21 @@
+"""A database failure on the catalog must not look like an empty catalog."""
+import pytest
+
+
+@pytest.fixture
+def broken_database(api, monkeypatch):
+    monkeypatch.setattr(api, 'get_db_connection', lambda: None)
+
+
+def test_listing_failure_is_503_without_validators(client, broken_database):
+    response = client.get('/api/concerts?limit=5')
+    assert response.status_code == 503
+    assert response.get_json() == {'error': 'Database connection failed'}
+    assert 'ETag' not in response.headers
+
+
+def test_listing_succeeds_with_validators(client):
+    response = client.get('/api/concerts?limit=5')
+    assert response.status_code == 200
+    assert isinstance(response.get_json(), list)
+    assert 'ETag' in response.headers
@@ -0,0 +1,41 @@
+"""Request metrics must count requests that end in an unhandled exception."""
+import pytest
+from flask import Flask
+
+from services.metrics import HTTP_REQUESTS, instrument_app
+
+
+@pytest.mark.parametrize('propagate', [False, True])
+def test_unhandled_exception_is_counted_as_500(propagate):
+    app = Flask(f'metrics_{propagate}')
+    app.config['PROPAGATE_EXCEPTIONS'] = propagate
+    instrument_app(app)
+
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError('boom')
+
+    before = HTTP_REQUESTS.value('/boom', 'GET', '500')
+    try:
+        app.test_client().get('/boom')
+    except RuntimeError:
+        assert propagate
+    assert HTTP_REQUESTS.value('/boom', 'GET', '500') == before + 1
+
+
+def test_status_is_read_after_every_after_request_hook():
+    app = Flask('metrics_rewrite')
+    instrument_app(app)
+
+    @app.route('/created')
+    def created():
+        return '', 201
+
+    @app.after_request
+    def rewrite(response):
+        response.status_code = 202
+        return response
+
+    before = HTTP_REQUESTS.value('/created', 'GET', '202')
+    app.test_client().get('/created')
+    assert HTTP_REQUESTS.value('/created', 'GET', '202') == before + 1
@@ -0,0 +1,37 @@
+"""The hashing pool recovers when a worker process dies."""
+import os
+import signal
+import time
+
+import pytest
+
+from services.password_hasher import PasswordHasher, verify_password
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(scrypt_n=1024, workers=2)
+    hasher.start()
+    yield hasher
+    hasher.shutdown()
+
+
+def kill_a_worker(hasher):
+    pid = next(iter(hasher._executor._processes))
+    os.kill(pid, signal.SIGKILL)
+    deadline = time.monotonic() + 5
+    while not hasher._executor._broken and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert hasher._executor._broken
+
+
+def test_hash_recovers_from_a_dead_worker(hasher):
+    kill_a_worker(hasher)
+    assert verify_password('secret', hasher.hash('secret'))
+
+
+def test_hash_many_recovers_from_a_dead_worker(hasher):
+    kill_a_worker(hasher)
+    hashes = hasher.hash_many(['one', 'two', 'three'])
+    assert [verify_password(p, h) for p, h in zip(['one', 'two', 'three'], hashes)] == [True] * 3
+    assert hasher.stats()['pending'] == 0